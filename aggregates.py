@@ -0,0 +1,122 @@
+"""Sum/count cube of a statement by flow, month, weekday, category, merchant and size band"""
+import logging
+
+import pandas as pd
+
+from merchants import canonical_merchants, get_merchant_index
+from parse_cache import get_parse_cache
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ['flow', 'month', 'weekday', 'category', 'merchant', 'size_band']
+
+# Money in (positive amounts), money out (negative amounts) and zero-amount rows
+FLOWS = ['credit', 'debit', 'zero']
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Bands over the absolute amount in rupees, right edge inclusive
+SIZE_BINS = [0, 1000, 5000, 10000, float('inf')]
+SIZE_BANDS = ['Small (≤₹1,000)', 'Medium (₹1,001-₹5,000)', 'Large (₹5,001-₹10,000)', 'Very Large (>₹10,000)']
+LARGE_BANDS = SIZE_BANDS[2:]
+
+# Number of most recent transactions summed for SpendingCube.recent_spend
+RECENT_TRANSACTIONS = 10
+
+
+class SpendingCube:
+    """Sum/count cells of one statement plus the few facts that don't roll up; views return rupees"""
+
+    def __init__(self, cells, days, debit_days, recent_spend_paise):
+        self.cells = cells
+        # Distinct transaction dates, over all rows and over debits only
+        self.days = days
+        self.debit_days = debit_days
+        # Signed sum of the most recent RECENT_TRANSACTIONS debits
+        self.recent_spend = recent_spend_paise / 100
+
+    def __len__(self):
+        return len(self.cells)
+
+    def _select(self, flow):
+        if flow is None:
+            return self.cells
+        return self.cells[self.cells['flow'] == flow]
+
+    def rollup(self, by, flow=None):
+        """sum, count and mean per value of ``by`` (a dimension or list of them)"""
+        grouped = self._select(flow).groupby(by, observed=True)[['sum_paise', 'count']].sum()
+        grouped = grouped[grouped['count'] > 0]
+        result = pd.DataFrame({
+            'sum': grouped['sum_paise'] / 100,
+            'count': grouped['count'],
+        }, index=grouped.index)
+        result['mean'] = result['sum'] / result['count']
+        return result
+
+    def by_month(self, flow=None):
+        """rollup('month') in chronological order, labelled like 'April 2024'"""
+        monthly = self.rollup('month', flow)
+        monthly.index = monthly.index.strftime('%B %Y')
+        return monthly
+
+    def total(self, flow=None):
+        """Signed sum of the selected flow"""
+        return int(self._select(flow)['sum_paise'].sum()) / 100
+
+    def count(self, flow=None):
+        return int(self._select(flow)['count'].sum())
+
+    def mean(self, flow=None):
+        count = self.count(flow)
+        return self.total(flow) / count if count else 0.0
+
+    def count_in_bands(self, bands, flow=None):
+        cells = self._select(flow)
+        return int(cells.loc[cells['size_band'].isin(bands), 'count'].sum())
+
+
+def build_cube(df, username=None):
+    """Group a transaction_schema frame into a SpendingCube in a single pass"""
+    paise = df['amount_paise']
+    dates = df['date']
+
+    flow = pd.Series('zero', index=df.index, dtype=object)
+    flow[paise > 0] = 'credit'
+    flow[paise < 0] = 'debit'
+
+    keys = pd.DataFrame({
+        'flow': pd.Categorical(flow, categories=FLOWS),
+        'month': dates.dt.to_period('M'),
+        'weekday': pd.Categorical(dates.dt.day_name(), categories=WEEKDAYS),
+        'category': df['category'],
+        'merchant': canonical_merchants(df['description'], username),
+        'size_band': pd.cut((paise / 100).abs(), bins=SIZE_BINS, labels=SIZE_BANDS),
+        'sum_paise': paise,
+    }, index=df.index)
+
+    cells = (
+        keys.groupby(DIMENSIONS, observed=True, dropna=False)['sum_paise']
+        .agg(['sum', 'count'])
+        .rename(columns={'sum': 'sum_paise'})
+        .reset_index()
+    )
+
+    debits = keys[keys['flow'] == 'debit']
+    recent = pd.DataFrame({'date': dates[debits.index], 'paise': debits['sum_paise']})
+    recent = recent.sort_values('date', kind='stable')['paise'].tail(RECENT_TRANSACTIONS)
+
+    return SpendingCube(
+        cells,
+        days=dates.nunique(),
+        debit_days=dates[debits.index].nunique(),
+        recent_spend_paise=int(recent.sum()),
+    )
+
+
+def get_cube(df, cache_key=None, username=None):
+    """SpendingCube of ``df`` under ``username``'s merchant aliases, rebuilt only when the parse or they change"""
+    if cache_key is None:
+        return build_cube(df, username)
+    return get_parse_cache().derived(
+        cache_key, f"spending_cube-{get_merchant_index(username).version}", lambda: build_cube(df, username),
+    )
@@ -1,9 +1,8 @@
 import streamlit as st
-from statement_parser import StatementParser
 from auth import show_login_page, logout_user
 from platform_selector import PlatformSelector, check_platform_selected
 from platforms.router import route_to_platform
-import time
+from notices import flash, show_flash_notices
 
 # Must be the first Streamlit command
 st.set_page_config(
@@ -183,38 +182,10 @@ def show_footer():
                 st.rerun()
         
         with col2:
-            # Create placeholder for warning message
-            warning_placeholder = st.empty()
-            
             if st.button("🚪 Logout"):
-                # Show warning message
-                warning_placeholder.markdown(
-                    """
-                    <div class="warning-message">
-                        ⚠️ Warning: Your session data will be permanently deleted in 5 seconds!
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-                
-                # Wait for 5 seconds with countdown
-                for i in range(5, 0, -1):
-                    warning_placeholder.markdown(
-                        f"""
-                        <div class="warning-message">
-                            ⚠️ Warning: Your session data will be permanently deleted in {i} seconds!
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
-                    time.sleep(1)
-                
-                # Clear warning message
-                warning_placeholder.empty()
-                
-                # Perform logout
-                for key in list(st.session_state.keys()):
-                    del st.session_state[key]
+                # Log out right away; the notice is dismissed client-side
+                logout_user()
+                flash("⚠️ Your session data has been permanently deleted.", 'warning', seconds=5)
                 st.rerun()
         
         st.markdown("</div></div>", unsafe_allow_html=True)
@@ -310,6 +281,9 @@ def show_platform_selector_header():
         st.markdown('</div></div>', unsafe_allow_html=True)
 
 def main():
+    # Notices queued by the previous run (logout, support request, ...)
+    show_flash_notices()
+
     # Check if user is logged in
     if 'logged_in' not in st.session_state or not st.session_state.logged_in:
         show_login_page()
@@ -1,20 +1,28 @@
 import streamlit as st
 import sqlite3
-import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from logo import show_app_logo
+from db import get_database
+from credentials import hash_password, verify_password, run_hashing
+
+USERS_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS users
+       (username TEXT PRIMARY KEY, 
+        password TEXT NOT NULL,
+        email TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
+]
+
+# Stored password hashes by username, so repeated logins skip the lookup
+PASSWORD_CACHE_SIZE = 256
+_password_cache = OrderedDict()
+_password_cache_lock = threading.Lock()
 
 def init_auth_db():
-    """Initialize authentication database"""
-    conn = sqlite3.connect('auth.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users
-                 (username TEXT PRIMARY KEY, 
-                  password TEXT NOT NULL,
-                  email TEXT,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    conn.commit()
-    conn.close()
+    """Initialize authentication database (once per process)"""
+    get_database().ensure_schema('users', USERS_SCHEMA)
 
 def show_login_page():
     """Show the login page"""
@@ -111,27 +119,50 @@ def show_login_page():
 
 def register_user(username, password, email):
     """Register a new user"""
+    init_auth_db()
     try:
-        conn = sqlite3.connect('auth.db')
-        c = conn.cursor()
-        hashed_pw = hashlib.sha256(password.encode()).hexdigest()
-        c.execute("INSERT INTO users (username, password, email) VALUES (?, ?, ?)",
-                 (username, hashed_pw, email))
-        conn.commit()
-        conn.close()
+        hashed_pw = run_hashing(hash_password, password)
+        get_database().execute("INSERT INTO users (username, password, email) VALUES (?, ?, ?)",
+                               (username, hashed_pw, email))
         return True
     except sqlite3.IntegrityError:
         return False
 
 def check_credentials(username, password):
     """Check if username/password combination is valid"""
-    conn = sqlite3.connect('auth.db')
-    c = conn.cursor()
-    hashed_pw = hashlib.sha256(password.encode()).hexdigest()
-    c.execute("SELECT * FROM users WHERE username=? AND password=?", (username, hashed_pw))
-    result = c.fetchone()
-    conn.close()
-    return result is not None
+    init_auth_db()
+    stored = _stored_password(username)
+    matches, needs_rehash = run_hashing(verify_password, password, stored)
+    if matches and needs_rehash:
+        _upgrade_password(username, stored, password)
+    return matches
+
+def _stored_password(username):
+    """Stored password hash for ``username``, or None if there is no such user"""
+    with _password_cache_lock:
+        if username in _password_cache:
+            _password_cache.move_to_end(username)
+            return _password_cache[username]
+
+    row = get_database().fetchone("SELECT password FROM users WHERE username=?", (username,))
+    if row is None:
+        # Not cached: the user may register in another process
+        return None
+
+    with _password_cache_lock:
+        _password_cache[username] = row[0]
+        while len(_password_cache) > PASSWORD_CACHE_SIZE:
+            _password_cache.popitem(last=False)
+    return row[0]
+
+def _upgrade_password(username, old_hash, password):
+    """Re-hash a legacy or outdated password hash with the current scrypt cost"""
+    new_hash = run_hashing(hash_password, password)
+    # Only replace the hash that was verified, in case it changed meanwhile
+    get_database().execute("UPDATE users SET password=? WHERE username=? AND password=?",
+                           (new_hash, username, old_hash))
+    with _password_cache_lock:
+        _password_cache.pop(username, None)
 
 def logout_user():
     """Log out the current user"""
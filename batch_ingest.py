@@ -0,0 +1,129 @@
+"""Several statements parsed together into one deduplicated timeline.
+
+Every upload becomes its own batch parse job (see parse_jobs), so the files
+are parsed concurrently: PhonePe pages from all of them, and whole Paytm and
+SuperMoney files, share page_extractor's process pool. Each statement is
+parsed and cached on its own, so adding a thirteenth month to twelve only
+parses the new file.
+
+Statements of consecutive months, or of one account downloaded twice,
+overlap, so the merged frame is deduplicated:
+
+* rows with a transaction id (PhonePe's "Transaction ID : T...") keep the
+  first row per id;
+* rows without one are matched on (date, amount, description), and a row is
+  dropped only when an earlier statement already holds the same key. Two
+  identical payments within one statement are both kept.
+
+The merged frame is cached under a key built from its members' keys, so
+the dashboards' spending cube is memoised with it like a single parse.
+"""
+import copy
+import logging
+
+import pandas as pd
+import streamlit as st
+
+import parse_jobs
+import telemetry
+from parse_cache import get_parse_cache, content_key
+from transaction_schema import normalize_transactions, empty_transactions
+
+logger = logging.getLogger(__name__)
+
+# Columns identifying a transaction that has no id
+MATCH_COLUMNS = ['date', 'amount_paise', 'description']
+# Statements of any platform can be merged, so batch jobs skip the section check
+BATCH_SECTION = ''
+
+
+def merge_statements(frames):
+    """Merge parsed statements into one timeline, newest first.
+
+    Returns ``(merged, duplicates_removed)``. ``frames`` are in the
+    transaction_schema; frames holding only a failed parse's placeholder
+    are skipped.
+    """
+    frames = [df for df in frames if (df['amount_paise'] != 0).any()]
+    if not frames:
+        return empty_transactions(), 0
+
+    merged = pd.concat(
+        [df.assign(source=source) for source, df in enumerate(frames)],
+        ignore_index=True,
+    )
+    # Differing categories make concat fall back to object columns
+    merged['description'] = merged['description'].astype(object)
+    merged['transaction_id'] = merged['transaction_id'].where(merged['transaction_id'] != '', None)
+
+    has_id = merged['transaction_id'].notna()
+    with_id = merged[has_id].drop_duplicates(subset='transaction_id', keep='first')
+
+    without_id = merged[~has_id]
+    first_source = without_id.groupby(MATCH_COLUMNS, dropna=False)['source'].transform('min')
+    without_id = without_id[without_id['source'] == first_source]
+
+    kept = pd.concat([with_id, without_id]).sort_index()
+    duplicates = len(merged) - len(kept)
+
+    kept = kept.sort_values('date', ascending=False, kind='stable').drop(columns='source')
+    return normalize_transactions(kept.reset_index(drop=True)), duplicates
+
+
+def batch_key(parsers):
+    """Cache key of a merge, from its members' upload keys in upload order"""
+    members = '\n'.join(parser.cache_key or '' for parser in parsers)
+    return content_key(members.encode(), 'batch')
+
+
+def parse_uploads(uploaded_files, progress_text="Reading your statements..."):
+    """Parse several uploads in the background and merge them.
+
+    Returns ``(parser, df)`` like parse_jobs.parse_upload; ``parser`` stands
+    in for the whole batch. A single file is handled by parse_upload, which
+    keeps the wrong-section check.
+    """
+    if len(uploaded_files) == 1:
+        return parse_jobs.parse_upload(uploaded_files[0], progress_text)
+
+    jobs = [parse_jobs.submit(uploaded_file, BATCH_SECTION, batch=True) for uploaded_file in uploaded_files]
+
+    if not all(job.done() for job in jobs):
+        progress_bar = st.progress(0.0, text=progress_text)
+        while True:
+            pending = [job for job in jobs if not job.done()]
+            if not pending:
+                break
+            fraction = sum(1.0 if job.done() else job.fraction for job in jobs) / len(jobs)
+            progress_bar.progress(fraction, text=f"{len(jobs) - len(pending)} of {len(jobs)} statements read. {pending[0].status()}")
+            pending[0].wait(parse_jobs.POLL_SECONDS)
+        progress_bar.empty()
+
+    frames = []
+    for job in jobs:
+        for kind, message in job.messages:
+            getattr(st, kind)(f"{job.filename}: {message}")
+        try:
+            frames.append(job.result())
+        except Exception as e:
+            logger.error(f"Parse job for {job.filename} failed: {str(e)}")
+            st.error(f"{job.filename}: Error processing the statement: {str(e)}")
+
+    # Stand-in parser for the batch; a copy so the shared job's parser keeps its key
+    parser = copy.copy(jobs[0].parser)
+    parser.cache_key = batch_key(job.parser for job in jobs)
+    parser.telemetry = telemetry.combine(
+        (job.parser.telemetry for job in jobs), 'batch', files=', '.join(job.filename for job in jobs)
+    )
+
+    cache = get_parse_cache()
+    df = cache.get(parser.cache_key)
+    if df is None:
+        with telemetry.span('merge_statements', trace=parser.telemetry, rows=sum(len(frame) for frame in frames)):
+            df, duplicates = merge_statements(frames)
+        if len(df):
+            cache.put(parser.cache_key, df)
+        logger.info(f"Merged {len(jobs)} statements into {len(df)} transactions, {duplicates} duplicates removed")
+        if duplicates:
+            st.info(f"Merged {len(jobs)} statements into {len(df)} transactions ({duplicates} duplicates from overlapping statements removed).")
+    return parser, df
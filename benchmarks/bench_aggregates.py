@@ -0,0 +1,75 @@
+"""Dashboard aggregation cost: per-chart groupbys on the raw frame vs the cube.
+
+Usage: python benchmarks/bench_aggregates.py [rows]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aggregates  # noqa: E402
+import categorizer  # noqa: E402
+import page_extractor  # noqa: E402
+from transaction_schema import normalize_transactions  # noqa: E402
+from synthetic import phonepe_lines  # noqa: E402
+
+
+def statement_frame(rows):
+    transactions = page_extractor.parse_page_lines(1, phonepe_lines(rows))['transactions']
+    df = pd.DataFrame(transactions, columns=['date', 'amount', 'type', 'details', 'category', 'transaction_id'])
+    df['category'] = categorizer.categorize_series(df['details'])
+    return normalize_transactions(df)
+
+
+def raw_views(df):
+    """The groupbys the PhonePe dashboard ran against the frame on every rerun"""
+    spending = df[df['amount'] < 0]
+    spending.groupby(spending['date'].dt.strftime('%B %Y'))['amount'].sum()
+    spending.groupby('category', observed=True)['amount'].agg(['sum', 'count'])
+    spending.groupby('description', observed=True)['amount'].sum().nlargest(5)
+    spending.groupby('category', observed=True)['amount'].sum().nlargest(3)
+    spending.groupby(spending['date'].dt.day_name())['amount'].sum()
+    spending.sort_values('date').tail(10)['amount'].sum()
+    df.groupby(df['date'].dt.day_name()).agg({'amount': ['count', 'mean']})
+    pd.cut(df['amount'].abs(), bins=aggregates.SIZE_BINS, labels=aggregates.SIZE_BANDS).value_counts()
+    spending.groupby('category', observed=True).agg({'amount': ['sum', 'count', 'mean']})
+
+
+def cube_views(cube):
+    """The same views read from the cube"""
+    cube.by_month('debit')
+    cube.rollup('category', 'debit')
+    cube.rollup('merchant', 'debit')['sum'].nsmallest(5)
+    cube.rollup('weekday', 'debit')
+    cube.rollup('weekday')
+    cube.rollup('size_band')
+    cube.count_in_bands(aggregates.LARGE_BANDS, 'debit')
+
+
+def timed(fn, *args, repeat=10):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = statement_frame(rows)
+
+    build_seconds = timed(aggregates.build_cube, df)
+    cube = aggregates.build_cube(df)
+    raw_seconds = timed(raw_views, df)
+    view_seconds = timed(cube_views, cube)
+
+    print(f"rows: {len(df):,}, cube cells: {len(cube):,}")
+    print(f"raw groupbys per rerun:  {raw_seconds * 1000:8.1f} ms")
+    print(f"cube build (first run):  {build_seconds * 1000:8.1f} ms")
+    print(f"cube views per rerun:    {view_seconds * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
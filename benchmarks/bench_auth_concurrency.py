@@ -0,0 +1,126 @@
+"""Login throughput with N parallel sessions: connection-per-call vs the db pool.
+
+Each session thread calls check_credentials in a loop while one writer
+thread keeps registering users, as happens when people sign up while others
+log in. The legacy path reproduces the previous auth.py (a new connection,
+rollback journal, on every call).
+
+Usage: python benchmarks/bench_auth_concurrency.py [sessions] [seconds]
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+
+USERS = 500
+SCHEMA = '''CREATE TABLE IF NOT EXISTS users
+            (username TEXT PRIMARY KEY, password TEXT NOT NULL, email TEXT,
+             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)'''
+
+
+def hashed(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def legacy_backend(path):
+    def check(username, password):
+        conn = sqlite3.connect(path)
+        conn.execute(SCHEMA)  # init_auth_db ran on every login page render
+        conn.commit()
+        row = conn.execute("SELECT * FROM users WHERE username=? AND password=?", (username, hashed(password))).fetchone()
+        conn.close()
+        return row is not None
+
+    def register(username, password):
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("INSERT INTO users (username, password, email) VALUES (?, ?, ?)", (username, hashed(password), None))
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass  # "database is locked" under contention
+        finally:
+            conn.close()
+
+    return check, register
+
+
+def pooled_backend(path):
+    database = db.Database(path)
+    database.ensure_schema('users', [SCHEMA])
+
+    def check(username, password):
+        database.ensure_schema('users', [SCHEMA])
+        row = database.fetchone("SELECT 1 FROM users WHERE username=? AND password=?", (username, hashed(password)))
+        return row is not None
+
+    def register(username, password):
+        database.execute("INSERT INTO users (username, password, email) VALUES (?, ?, ?)", (username, hashed(password), None))
+
+    return check, register
+
+
+def seed(path):
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    conn.executemany(
+        "INSERT INTO users (username, password, email) VALUES (?, ?, ?)",
+        [(f"user{i}", hashed(f"pw{i}"), None) for i in range(USERS)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(backend, sessions, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'auth.db')
+        seed(path)
+        check, register = backend(path)
+        stop = threading.Event()
+        logins = [0] * sessions
+        failures = []
+
+        def session(slot):
+            i = slot
+            while not stop.is_set():
+                try:
+                    if not check(f"user{i % USERS}", f"pw{i % USERS}"):
+                        failures.append(i)
+                    logins[slot] += 1
+                except sqlite3.OperationalError as e:
+                    failures.append(str(e))
+                i += sessions
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                register(f"new{i}", "pw")
+                i += 1
+
+        threads = [threading.Thread(target=session, args=(slot,)) for slot in range(sessions)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return sum(logins) / seconds, len(failures)
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    for name, backend in [('connection per call', legacy_backend), ('pooled WAL', pooled_backend)]:
+        rate, failures = run(backend, sessions, seconds)
+        print(f"{name:<22}{sessions:>3} sessions {rate:>10,.0f} logins/s  {failures} failed")
+
+
+if __name__ == '__main__':
+    main()
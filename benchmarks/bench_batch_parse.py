@@ -0,0 +1,89 @@
+"""Batch upload throughput: statements per second against worker processes.
+
+Parses a batch of synthetic Paytm statements through parse_jobs the way
+batch_ingest does, once per worker count (STATEMENT_PARSER_WORKERS) in a
+fresh process so caches start cold (worker processes are started before
+timing, as a running server has them), and once on the single-upload job
+pool, which parses every file on a thread. Also times a single upload
+submitted while the batch runs, which waits for nothing but its own parse.
+
+Usage: python benchmarks/bench_batch_parse.py [files] [pages_per_file] [max_workers]
+"""
+import io
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def uploads(files, pages):
+    from synthetic import statement
+    pdf_bytes, _ = statement('paytm', pages=pages)
+    result = []
+    for i in range(files):
+        # A trailing comment makes each file's content, and so its job, distinct
+        upload = io.BytesIO(pdf_bytes + f"\n%batch {i}\n".encode())
+        upload.name = f"paytm_{i}.pdf"
+        result.append(upload)
+    return result
+
+
+def run(files, pages, batch):
+    """Print seconds for the batch and for a single upload submitted during it"""
+    import page_extractor
+    import parse_jobs
+    batch_uploads = uploads(files, pages)
+    single = uploads(files + 1, 1)[-1]
+    if batch:
+        # Start the workers and their imports first; that is paid once per server
+        workers = page_extractor.resolve_worker_count()
+        pool = page_extractor._get_pool(workers)
+        for future in [pool.submit(exec, 'import statement_parser') for _ in range(workers)]:
+            future.result()
+
+    start = time.perf_counter()
+    jobs = [parse_jobs.submit(upload, '', batch=batch) for upload in batch_uploads]
+    single_job = parse_jobs.submit(single, 'paytm')
+    single_job.wait()
+    single_seconds = time.perf_counter() - start
+    for job in jobs:
+        job.result()
+    print(f"{time.perf_counter() - start:.3f} {single_seconds:.3f}")
+
+
+def measure(files, pages, workers, batch):
+    env = dict(os.environ, STATEMENT_PARSER_WORKERS=str(workers))
+    env.pop('STATEMENT_CACHE_DIR', None)
+    output = subprocess.run(
+        [sys.executable, __file__, '--run', str(files), str(pages), '1' if batch else '0'],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(output[-2]), float(output[-1])
+
+
+def main():
+    if sys.argv[1:2] == ['--run']:
+        files, pages, batch = (int(arg) for arg in sys.argv[2:5])
+        run(files, pages, bool(batch))
+        return
+
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+    print(f"{files} Paytm statements of {pages} pages, {os.cpu_count()} CPUs")
+
+    print(f"  {'parsed on':<24}{'batch s':>9}{'files/s':>9}{'single upload s':>17}")
+    seconds, single = measure(files, pages, 1, batch=False)
+    print(f"  {'single-upload pool':<24}{seconds:>9.2f}{files / seconds:>9.2f}{single:>17.2f}")
+    workers = 1
+    while workers <= max_workers:
+        seconds, single = measure(files, pages, workers, batch=True)
+        print(f"  {f'{workers} worker processes':<24}{seconds:>9.2f}{files / seconds:>9.2f}{single:>17.2f}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
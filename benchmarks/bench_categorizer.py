@@ -0,0 +1,72 @@
+"""Benchmark batch categorisation against the original per-row categoriser.
+
+Usage: python benchmarks/bench_categorizer.py [rows]
+"""
+import os
+import re
+import sys
+import time
+import random
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import categorizer  # noqa: E402
+
+MERCHANTS = [
+    'Swiggy', 'Zomato', 'Cafe Coffee Day', 'Hotel Annapurna', 'Fresh Supermarket', 'Amazon Pay',
+    'Flipkart', 'Myntra Fashion', 'D Mart', 'Uber India', 'Ola Cabs', 'Indian Oil Petrol',
+    'Airtel Prepaid Recharge', 'Jio Fiber Broadband', 'BESCOM Electricity Bill', 'Gas Agency',
+    'Transfer to Ravi', 'Received from Anilshetty', 'Salary ACME', 'House Rent', 'Bajaj EMI',
+    'LIC Insurance', 'Apollo Hospital', 'City College Fees', 'Ramesh Kumar', '******9754',
+]
+
+
+def legacy_categorize(details):
+    """The per-row categoriser this benchmark replaced, kept as the reference"""
+    details = details.lower()
+    for category, data in categorizer.CATEGORIES.items():
+        if any(keyword in details for keyword in data['keywords']):
+            for sub_cat, sub_keywords in data['sub_categories'].items():
+                if any(keyword in details for keyword in sub_keywords):
+                    return f"{category} - {sub_cat}"
+            return category
+    for pattern, category in [(p.pattern, c) for p, c in categorizer.NLP_PATTERNS]:
+        if re.search(pattern, details.lower()):
+            return category
+    return 'Others'
+
+
+def synthetic_descriptions(rows, seed=42):
+    random.seed(seed)
+    prefixes = ['Paid to', 'Received from', 'Payment to', '']
+    return pd.Series([
+        f"{random.choice(prefixes)} {random.choice(MERCHANTS)} {random.randint(1, 500)}rs".strip()
+        for _ in range(rows)
+    ])
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    descriptions = synthetic_descriptions(rows)
+
+    start = time.perf_counter()
+    legacy = descriptions.map(legacy_categorize)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = categorizer.categorize_series(descriptions)
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = int((legacy != batch).sum())
+    print(f"rows:        {rows:,}")
+    print(f"per-row:     {legacy_seconds:.3f}s ({rows / legacy_seconds:,.0f} rows/s)")
+    print(f"batch:       {batch_seconds:.3f}s ({rows / batch_seconds:,.0f} rows/s)")
+    print(f"speedup:     {legacy_seconds / batch_seconds:.1f}x")
+    print(f"mismatches:  {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Login throughput at each scrypt cost, against the legacy SHA-256 check.
+
+Every login verifies through credentials.run_hashing, i.e. on the hashing
+thread pool, from N concurrent session threads.
+
+Usage: python benchmarks/bench_credentials.py [sessions] [seconds_per_cost]
+"""
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import credentials  # noqa: E402
+
+COSTS = [(2 ** 12, 8, 1), (2 ** 13, 8, 1), (2 ** 14, 8, 1), (2 ** 15, 8, 1), (2 ** 16, 8, 1)]
+
+
+def legacy_verify(password, stored):
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored), False
+
+
+def throughput(verify, stored, sessions, seconds):
+    stop = threading.Event()
+    logins = [0] * sessions
+
+    def session(slot):
+        while not stop.is_set():
+            matches, _ = credentials.run_hashing(verify, 'correct horse', stored)
+            assert matches
+            logins[slot] += 1
+
+    threads = [threading.Thread(target=session, args=(slot,)) for slot in range(sessions)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(logins) / seconds
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    print(f"{sessions} sessions, {os.environ.get('AUTH_HASH_WORKERS', credentials.DEFAULT_HASH_WORKERS)} hashing workers")
+
+    stored = hashlib.sha256(b'correct horse').hexdigest()
+    print(f"{'legacy sha256':<24}{'-':>10}{throughput(legacy_verify, stored, sessions, seconds):>14,.0f} logins/s")
+
+    for cost in COSTS:
+        n, r, p = cost
+        stored = credentials.hash_password('correct horse', cost)
+
+        def verify(password, stored, cost=cost):
+            return credentials.verify_password(password, stored, cost)
+
+        rate = throughput(verify, stored, sessions, seconds)
+        memory_mb = 128 * n * r / (1024 * 1024)
+        print(f"{f'scrypt n=2^{n.bit_length() - 1} r={r} p={p}':<24}{memory_mb:>8.0f}MB{rate:>14,.0f} logins/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Dashboard figure cost per rerun: built every time vs memoised by figures.get_figure.
+
+Builds the PhonePe dashboard's figures (category bar and pie, spending
+trend, category treemap, weekday frequency, size distribution) from the
+spending cube of statements of growing length, first on a cold cache and
+then as a rerun would, and reports the size of their JSON, which stays
+flat because every trace is built from the cube's roll-ups.
+
+Usage: python benchmarks/bench_figures.py [max_rows]
+"""
+import io
+import os
+import sys
+import time
+
+import plotly.io as pio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_aggregates import statement_frame  # noqa: E402
+from parse_cache import get_parse_cache, content_key  # noqa: E402
+from figures import get_figure  # noqa: E402
+from time_rollups import get_rollups  # noqa: E402
+from platforms import phonepe  # noqa: E402
+from statement_parser import StatementParser  # noqa: E402
+
+RERUNS = 10
+
+
+def dashboard_figures(parser, df):
+    """Every figure the PhonePe dashboard shows, through the figure cache"""
+    cube = parser.spending_cube(df)
+    key = parser.cache_key
+    spending = get_rollups(df, key).rollup('Month')['spent']
+    category_spending = cube.rollup('category', 'debit')[['sum', 'count']]
+    daily_stats = cube.rollup('weekday')[['count', 'mean']].round(2)
+    daily_stats.columns = ['Number of Transactions', 'Average Amount']
+    size_dist = cube.rollup('size_band')['count'].sort_values(ascending=False, kind='stable')
+    return list(parser.generate_spending_chart(df)) + [
+        get_figure(
+            key, 'phonepe-spending-trend', lambda: phonepe.spending_trend_figure(spending, 'Month'), granularity='Month',
+        ),
+        get_figure(key, 'phonepe-category-treemap', lambda: phonepe.category_treemap_figure(category_spending)),
+        get_figure(key, 'phonepe-weekday-frequency', lambda: phonepe.weekday_frequency_figure(daily_stats)),
+        get_figure(key, 'phonepe-size-distribution', lambda: phonepe.size_distribution_figure(size_dist)),
+    ]
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sizes = [size for size in (1_000, 10_000, 100_000) if size <= max_rows]
+
+    print(f"{'rows':>9}{'cold ms':>10}{'rerun ms':>10}{'figure JSON':>14}")
+    for rows in sizes:
+        df = statement_frame(rows)
+        upload = io.BytesIO(b'')
+        upload.name = 'benchmark.pdf'
+        parser = StatementParser(upload, selected_platform='')
+        parser.cache_key = content_key(str(rows).encode(), 'bench-figures')
+        get_parse_cache().put(parser.cache_key, df)
+
+        start = time.perf_counter()
+        figures = dashboard_figures(parser, df)
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(RERUNS):
+            dashboard_figures(parser, df)
+        rerun_ms = (time.perf_counter() - start) / RERUNS * 1000
+
+        json_kb = sum(len(pio.to_json(figure, validate=False)) for figure in figures) / 1024
+        print(f"{rows:>9,}{cold_ms:>10.1f}{rerun_ms:>10.2f}{json_kb:>11,.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
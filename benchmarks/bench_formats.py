@@ -0,0 +1,48 @@
+"""Micro-benchmark of each platform grammar in formats, in lines/second.
+
+Usage: python benchmarks/bench_formats.py [transactions]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import page_extractor  # noqa: E402
+import transaction_stream  # noqa: E402
+from formats import SUPERMONEY  # noqa: E402
+from synthetic import phonepe_lines, paytm_lines, supermoney_lines  # noqa: E402
+
+
+def parse_phonepe(lines):
+    return len(page_extractor.parse_page_lines(1, lines)['transactions'])
+
+
+def parse_paytm(lines):
+    return sum(1 for _ in transaction_stream.iter_paytm_records((1, line) for line in lines))
+
+
+def parse_supermoney(lines):
+    # SuperMoney has no line parser yet; time its date and amount patterns
+    return sum(1 for line in lines if SUPERMONEY.date.search(line) and SUPERMONEY.amount.search(line))
+
+
+GRAMMARS = [
+    ('phonepe', phonepe_lines, parse_phonepe),
+    ('paytm', paytm_lines, parse_paytm),
+    ('supermoney', supermoney_lines, parse_supermoney),
+]
+
+
+def main():
+    transactions = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    for name, generate, parse in GRAMMARS:
+        lines = generate(transactions)
+        start = time.perf_counter()
+        found = parse(lines)
+        seconds = time.perf_counter() - start
+        print(f"{name:<11} {len(lines):>9,} lines  {found:>8,} txns  {len(lines) / seconds:>12,.0f} lines/s")
+
+
+if __name__ == '__main__':
+    main()
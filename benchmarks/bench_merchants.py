@@ -0,0 +1,59 @@
+"""Merchant canonicalisation: group counts and cost for PhonePe- and Paytm-shaped descriptions.
+
+Builds description columns of growing length from the synthetic PhonePe
+and Paytm statements (Paytm's join a transaction's three lines, time, UPI
+ID and reference number included, as its parser buffers them), and reports
+the distinct raw descriptions against the distinct canonical merchants,
+the time to canonicalise every row one by one, and merchants.canonical_merchants
+on a cold merchant index and again on a warm one.
+
+Usage: python benchmarks/bench_merchants.py [max_rows]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import merchants  # noqa: E402
+from bench_aggregates import statement_frame  # noqa: E402
+from synthetic import paytm_lines  # noqa: E402
+
+
+def paytm_descriptions(rows):
+    lines = paytm_lines(rows)[3:]
+    return pd.Series([' '.join(lines[i:i + 3]) for i in range(0, len(lines), 3)], dtype='category')
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, (time.perf_counter() - start) * 1000
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sizes = [size for size in (1_000, 10_000, 100_000) if size <= max_rows]
+
+    print(f"{'':>8}{'rows':>9}{'raw':>9}{'merchants':>11}{'per row ms':>12}{'cold ms':>9}{'warm ms':>9}")
+    for rows in sizes:
+        for name, descriptions in (
+            ('phonepe', statement_frame(rows)['description']),
+            ('paytm', paytm_descriptions(rows)),
+        ):
+            index = merchants.MerchantIndex()
+            _, per_row_ms = timed(lambda: [index._canonical(d) for d in descriptions.astype(object)])
+
+            merchants._indexes.clear()
+            names, cold_ms = timed(merchants.canonical_merchants, descriptions)
+            _, warm_ms = timed(merchants.canonical_merchants, descriptions)
+            print(
+                f"{name:>8}{len(descriptions):>9,}{len(descriptions.cat.categories):>9,}"
+                f"{len(names.cat.categories):>11,}{per_row_ms:>12.1f}{cold_ms:>9.1f}{warm_ms:>9.1f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Rows/second and accuracy of page_extractor's 'words' and 'layout' modes.
+
+Parses a table-shaped synthetic PhonePe statement (105 pages by default,
+like the sample export) inline in one process with each mode and scores the
+records against the generator's ground truth:
+
+* recall: expected transactions found with the right id, date and amount;
+* precision: records that are real transactions;
+* clean details: records whose details are exactly the "Paid to ..." text.
+
+The line-shaped statement, which has no table columns, is parsed too, to
+show ``words`` falling back to layout text without losing rows.
+
+Usage: python benchmarks/bench_page_extraction.py [pages]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import page_extractor  # noqa: E402
+from pdf_documents import PdfDocuments  # noqa: E402
+from synthetic import phonepe_lines, phonepe_table_pdf, statement_pdf  # noqa: E402
+
+PER_PAGE = 10
+
+
+def run(pdf_bytes, mode):
+    """(seconds, transactions) for one inline parse of every page"""
+    os.environ['STATEMENT_EXTRACTION_MODE'] = mode
+    start = time.perf_counter()
+    with PdfDocuments(pdf_bytes) as documents:
+        results = page_extractor.extract_pages(documents, max_workers=1)
+    transactions, _ = page_extractor.merge_page_results(results)
+    return time.perf_counter() - start, transactions
+
+
+def score(transactions, expected):
+    """(recall, precision, clean details share) against the ground truth"""
+    by_id = {transaction_id: (day, float(amount), details) for transaction_id, day, amount, details in expected}
+    correct = clean = 0
+    for txn in transactions:
+        truth = by_id.get(txn['transaction_id'])
+        if truth is None or (txn['date'].date(), round(txn['amount'], 2)) != truth[:2]:
+            continue
+        correct += 1
+        clean += txn['details'] == truth[2]
+    return correct / len(expected), correct / max(len(transactions), 1), clean / max(len(transactions), 1)
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 105
+    table_pdf, expected = phonepe_table_pdf(pages * PER_PAGE, per_page=PER_PAGE)
+    lines_pdf = statement_pdf(phonepe_lines(pages * PER_PAGE))
+
+    print(f"{'statement':<10}{'mode':<8}{'seconds':>9}{'rows/s':>9}{'recall':>9}{'precision':>11}{'clean details':>15}")
+    for name, pdf_bytes in [('table', table_pdf), ('lines', lines_pdf)]:
+        for mode in page_extractor.EXTRACTION_MODES:
+            seconds, transactions = run(pdf_bytes, mode)
+            rate = f"{len(transactions) / seconds:>9,.0f}"
+            if name == 'table':
+                recall, precision, clean = score(transactions, expected)
+                print(f"{name:<10}{mode:<8}{seconds:>9.2f}{rate}{recall:>9.1%}{precision:>11.1%}{clean:>15.1%}")
+            else:
+                print(f"{name:<10}{mode:<8}{seconds:>9.2f}{rate}{len(transactions):>9} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Recurring-payment detection time as the ledger grows.
+
+Plants a monthly subscription, a monthly EMI and a weekly payment in
+synthetic statements of growing length (up to 1M rows by default), times
+recurring.detect_recurring over each and checks the planted payments are
+found.
+
+Usage: python benchmarks/bench_recurring.py [max_rows]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import recurring  # noqa: E402
+from bench_aggregates import statement_frame  # noqa: E402
+from transaction_schema import normalize_transactions  # noqa: E402
+
+BASE_ROWS = 20_000
+PLANTED = {
+    'Streamflix': ('Paid to Streamflix DEBIT INR', 'M', -499.0),
+    'Home Loan EMI': ('Paid to Home Loan EMI DEBIT INR', 'M', -18500.0),
+    'Daily Dairy': ('Paid to Daily Dairy DEBIT INR', 'W', -210.0),
+}
+
+
+def planted_payments(start, end):
+    rows = []
+    for description, freq, amount in PLANTED.values():
+        for day in pd.date_range(start, end, freq='MS' if freq == 'M' else 'W-MON'):
+            rows.append({'date': day, 'amount': amount, 'description': description, 'category': 'Others'})
+    return pd.DataFrame(rows)
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = [size for size in (10_000, 100_000, 1_000_000) if size <= max_rows]
+    base = statement_frame(BASE_ROWS)
+
+    print(f"{'rows':>10}{'ms':>10}{'found':>8}  planted found")
+    for rows in sizes:
+        df = pd.concat([base] * -(-rows // len(base)), ignore_index=True).iloc[:rows]
+        df = normalize_transactions(pd.concat(
+            [df, planted_payments(df['date'].min(), df['date'].max())], ignore_index=True,
+        ))
+        start = time.perf_counter()
+        found = recurring.detect_recurring(df)
+        ms = (time.perf_counter() - start) * 1000
+        planted = {name.lower() for name in PLANTED} & set(found['merchant'].str.lower())
+        print(f"{len(df):>10,}{ms:>10.1f}{len(found):>8}  {len(planted)} of {len(PLANTED)}")
+
+
+if __name__ == '__main__':
+    main()
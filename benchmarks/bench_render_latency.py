@@ -0,0 +1,104 @@
+"""Render latency of the Streamlit pages, and a check that nothing sleeps.
+
+Runs the PhonePe page on a loss-making statement (which shows the net-loss
+warning) and the logout button through streamlit.testing's AppTest, records
+every time.sleep() made from this repository's code during those runs, and
+exits non-zero if any run stalls past the budget or sleeps at all.
+
+Usage: python benchmarks/bench_render_latency.py [transactions] [budget_seconds]
+"""
+import inspect
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from synthetic import phonepe_lines, statement_pdf  # noqa: E402
+
+PAGE_SCRIPT = """
+import io
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+
+with open({pdf_path!r}, 'rb') as f:
+    upload = io.BytesIO(f.read())
+upload.name = 'phonepe_statement.pdf'
+st.file_uploader = lambda *args, **kwargs: [upload] if kwargs.get('accept_multiple_files') else upload
+
+from platforms.phonepe import show_phonepe_page
+show_phonepe_page('benchmark')
+"""
+
+_real_sleep = time.sleep
+slept = []
+
+
+def _recording_sleep(seconds):
+    caller = inspect.stack()[1].filename
+    if os.path.abspath(caller).startswith(ROOT + os.sep) and 'benchmarks' not in caller:
+        slept.append((os.path.relpath(caller, ROOT), seconds))
+    _real_sleep(seconds)
+
+
+def timed_run(app_test):
+    start = time.perf_counter()
+    app_test.run()
+    return time.perf_counter() - start
+
+
+def main():
+    transactions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    time.sleep = _recording_sleep
+    # Keep the login and ledger schema setup away from the checked-in auth.db
+    db_dir = tempfile.TemporaryDirectory()
+    os.environ['STATEMENT_DB_PATH'] = os.path.join(db_dir.name, 'auth.db')
+
+    # Mostly debits, so the net-loss warning is shown
+    lines = phonepe_lines(transactions)
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+        f.write(statement_pdf(lines))
+        pdf_path = f.name
+
+    results = []
+    try:
+        page = AppTest.from_string(PAGE_SCRIPT.format(root=ROOT, pdf_path=pdf_path), default_timeout=300)
+        results.append(('phonepe page, first run (parse)', timed_run(page), False))
+        results.append(('phonepe page, rerun (cached)', timed_run(page), True))
+        if page.exception:
+            print(f"page raised: {page.exception[0].value}")
+            return 1
+
+        app = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=60)
+        app.session_state['logged_in'] = True
+        app.session_state['username'] = 'benchmark'
+        timed_run(app)
+        app.button(key='logout_button').click()
+        results.append(('logout click', timed_run(app), True))
+        if 'logged_in' in app.session_state:
+            print("logout did not clear the session")
+            return 1
+    finally:
+        os.unlink(pdf_path)
+        db_dir.cleanup()
+        time.sleep = _real_sleep
+
+    failed = bool(slept)
+    for name, seconds, budgeted in results:
+        stalled = budgeted and seconds > budget
+        failed = failed or stalled
+        print(f"{name:<36}{seconds * 1000:>10.0f} ms{'  STALL' if stalled else ''}")
+    print(f"time.sleep calls from app code: {len(slept)} ({sum(s for _, s in slept):.1f} s)")
+    for caller, seconds in slept:
+        print(f"  {caller}: {seconds}s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Memory and groupby cost of the legacy object layout vs transaction_schema.
+
+Usage: python benchmarks/bench_schema_memory.py [rows]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import categorizer  # noqa: E402
+import page_extractor  # noqa: E402
+from transaction_schema import normalize_transactions, memory_report  # noqa: E402
+from synthetic import phonepe_lines  # noqa: E402
+
+
+def legacy_frame(rows):
+    """A PhonePe frame as the parser produced it before the typed schema"""
+    transactions = page_extractor.parse_page_lines(1, phonepe_lines(rows))['transactions']
+    df = pd.DataFrame(transactions, columns=['date', 'amount', 'type', 'details', 'category', 'transaction_id'])
+    df['category'] = categorizer.categorize_series(df['details'])
+    return df.astype({'type': object, 'details': object, 'category': object, 'transaction_id': object})
+
+
+def category_analysis(df):
+    """The groupby behind show_category_analysis"""
+    return df[df['amount'] < 0].groupby('category', observed=True).agg({'amount': ['sum', 'count', 'mean']})
+
+
+def timed(fn, df, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(df)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    legacy = legacy_frame(rows)
+    typed = normalize_transactions(legacy)
+
+    legacy_memory = memory_report(legacy)
+    typed_memory = memory_report(typed)
+    print(f"{'column':<16}{'legacy bytes':>16}{'typed bytes':>16}")
+    for column in ['date', 'amount', 'amount_paise', 'type', 'details', 'description', 'category', 'transaction_id', 'total']:
+        if column in legacy_memory or column in typed_memory:
+            print(f"{column:<16}{legacy_memory.get(column, 0):>16,}{typed_memory.get(column, 0):>16,}")
+    print(f"memory ratio:   {typed_memory['total'] / legacy_memory['total']:.2f}")
+
+    legacy_seconds = timed(category_analysis, legacy)
+    typed_seconds = timed(category_analysis, typed)
+    print(f"category groupby: legacy {legacy_seconds * 1000:.1f} ms, typed {typed_seconds * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
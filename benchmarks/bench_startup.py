@@ -0,0 +1,78 @@
+"""Cold-start report: what importing app.py loads, and login page render time.
+
+Each measurement runs in a fresh interpreter. The import report comes from
+``python -X importtime`` and lists the slowest top-level packages by self
+time, plus whether the heavy PDF/plotting/data libraries were loaded at all.
+The login page time is the first AppTest run of app.py in a new process.
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ['pandas', 'numpy', 'plotly', 'pdfplumber', 'pdfminer', 'PyPDF2', 'fitz', 'pymupdf', 'pyarrow']
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+LOGIN_RENDER = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file('app.py', default_timeout=120)
+app.run()
+assert not app.exception, app.exception
+print(time.perf_counter() - start)
+"""
+
+
+def run_python(*args):
+    # Keep the login page's schema setup away from the checked-in auth.db
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, STATEMENT_DB_PATH=os.path.join(tmp, 'auth.db'))
+        return subprocess.run(
+            [sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+
+
+def import_report():
+    """(total seconds, {package: self seconds}) for ``import app``"""
+    stderr = run_python('-X', 'importtime', '-c', 'import app').stderr
+    per_package = defaultdict(float)
+    total = 0.0
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        per_package[name.split('.')[0]] += int(self_us) / 1e6
+        if name == 'app':
+            total = int(cumulative_us) / 1e6
+    return total, per_package
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    totals = []
+    for _ in range(runs):
+        total, per_package = import_report()
+        totals.append(total)
+    print(f"import app: {min(totals) * 1000:.0f} ms (best of {runs})")
+    print("slowest packages (self time):")
+    for package, seconds in sorted(per_package.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {package:<24}{seconds * 1000:>8.0f} ms")
+    loaded = [package for package in HEAVY if package in per_package]
+    print(f"heavy libraries loaded at startup: {', '.join(loaded) or 'none'}")
+
+    renders = [float(run_python('-c', LOGIN_RENDER).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    print(f"login page first render (fresh process): {min(renders) * 1000:.0f} ms (best of {runs})")
+
+
+if __name__ == '__main__':
+    main()
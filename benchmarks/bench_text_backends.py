@@ -0,0 +1,64 @@
+"""Raw text extraction speed per backend, and what the fitz-first policy costs.
+
+For a 105-page PhonePe statement (table- and line-shaped) and a Paytm
+statement of the same length, times every page through each backend alone,
+then through PdfDocuments.page_text with the default backend order and the
+format's quality check (plain PyMuPDF text, then row-sorted PyMuPDF text,
+then pdfplumber), counting the pages that fell back to pdfplumber.
+
+Usage: python benchmarks/bench_text_backends.py [pages]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from formats import PHONEPE, PAYTM  # noqa: E402
+from pdf_documents import PdfDocuments, text_quality_check  # noqa: E402
+from synthetic import phonepe_lines, phonepe_table_pdf, paytm_lines, statement_pdf  # noqa: E402
+
+# Transactions per page of each synthetic shape
+TABLE_PER_PAGE = 10
+LINES_PER_PAGE = 13
+
+SINGLE_BACKENDS = [
+    ('fitz', lambda documents, page_num: documents.fitz_page_text(page_num)),
+    ('fitz sorted', lambda documents, page_num: documents.fitz_page_text(page_num, sort=True)),
+    ('pdfplumber', lambda documents, page_num: documents.plumber_page_text(page_num)),
+    ('PyPDF2', lambda documents, page_num: documents.pypdf_page_text(page_num)),
+]
+
+
+def time_pages(pdf_bytes, extract):
+    """(seconds, timings) to extract every page with a fresh set of handles"""
+    start = time.perf_counter()
+    with PdfDocuments(pdf_bytes) as documents:
+        for page_num in range(1, documents.page_count + 1):
+            extract(documents, page_num)
+    return time.perf_counter() - start, documents.timings
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 105
+    statements = [
+        ('phonepe table', phonepe_table_pdf(pages * TABLE_PER_PAGE, per_page=TABLE_PER_PAGE)[0], PHONEPE),
+        ('phonepe lines', statement_pdf(phonepe_lines(pages * LINES_PER_PAGE)), PHONEPE),
+        ('paytm lines', statement_pdf(paytm_lines(pages * LINES_PER_PAGE)), PAYTM),
+    ]
+
+    for name, pdf_bytes, statement_format in statements:
+        print(f"{name}:")
+        for backend, extract in SINGLE_BACKENDS:
+            seconds, _ = time_pages(pdf_bytes, extract)
+            print(f"  {backend:<22}{seconds:>7.2f} s{pages / seconds:>9.0f} pages/s")
+
+        check = text_quality_check(statement_format)
+        seconds, timings = time_pages(pdf_bytes, lambda documents, page_num: documents.page_text(page_num, check))
+        fallbacks = timings.calls['pdfplumber'] - (1 if timings.calls['pdfplumber'] else 0)
+        print(f"  {'fitz + quality check':<22}{seconds:>7.2f} s{pages / seconds:>9.0f} pages/s"
+              f"  ({fallbacks} pages fell back to pdfplumber)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Time rollups: the daily scan, each zoom level, and extending with new rows.
+
+Builds TimeRollups over a synthetic statement (1M rows by default), times
+every granularity derived from the daily totals, and compares extending the
+rollups with the latest month's rows against rebuilding from all of them.
+
+Usage: python benchmarks/bench_time_rollups.py [rows]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time_rollups  # noqa: E402
+from bench_aggregates import statement_frame  # noqa: E402
+
+# Rows parsed from the PDF text generator, repeated to reach the target
+BASE_ROWS = 20_000
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, (time.perf_counter() - start) * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    base = statement_frame(min(rows, BASE_ROWS))
+    df = pd.concat([base] * -(-rows // len(base)), ignore_index=True).iloc[:rows]
+
+    rollups, scan_ms = timed(time_rollups.TimeRollups.from_frame, df)
+    print(f"{len(df):,} rows over {len(rollups.daily):,} days")
+    print(f"  daily scan          {scan_ms:>8.1f} ms")
+    for granularity in time_rollups.GRANULARITIES:
+        level, level_ms = timed(rollups.rollup, granularity)
+        _, cached_ms = timed(rollups.rollup, granularity)
+        print(f"  {granularity:<8}{len(level):>6} buckets {level_ms:>7.2f} ms, then {cached_ms:.3f} ms")
+
+    last_month = df['date'] >= df['date'].max() - pd.Timedelta(days=30)
+    older, newer = df[~last_month], df[last_month]
+    previous = time_rollups.TimeRollups.from_frame(older)
+    _, extend_ms = timed(previous.extend, newer)
+    _, rebuild_ms = timed(time_rollups.TimeRollups.from_frame, df)
+    print(f"  add {len(newer):,} new rows: extend {extend_ms:.1f} ms, rebuild {rebuild_ms:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Arrow payload and query time of the transaction table per rerun.
+
+For statements of growing length, compares what ``st.dataframe(df)`` sent
+on every rerun (the whole frame as Arrow IPC) with one page of
+transaction_table, and times a filtered, sorted page query with the sort
+order already memoised.
+
+Usage: python benchmarks/bench_transaction_table.py [max_rows]
+"""
+import os
+import sys
+import time
+
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transaction_table  # noqa: E402
+from bench_aggregates import statement_frame  # noqa: E402
+
+REPEATS = 20
+
+
+def arrow_bytes(df):
+    """Size of ``df`` serialised as an Arrow IPC stream, as Streamlit sends it"""
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sizes = [size for size in (1_000, 10_000, 100_000, 1_000_000) if size <= max_rows]
+    page_size = transaction_table.DEFAULT_PAGE_SIZE
+
+    print(f"{'rows':>9}{'full frame':>14}{'one page':>12}{'query ms':>11}")
+    for rows in sizes:
+        df = statement_frame(rows)
+        order = transaction_table.sort_order(df, 'Amount: high to low')
+        categories = list(df['category'].cat.categories[:3])
+
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            mask = transaction_table.filter_mask(df, categories=categories, amount_range=(100, 5000))
+            positions = transaction_table.matching_positions(order, mask)
+            page = transaction_table.page_rows(df, positions, 2, page_size)
+        query_ms = (time.perf_counter() - start) / REPEATS * 1000
+
+        columns = [column for column in transaction_table.DISPLAY_COLUMNS if column in df.columns]
+        full_kb = arrow_bytes(df) / 1024
+        page_kb = arrow_bytes(page[columns]) / 1024
+        print(f"{rows:>9,}{full_kb:>11,.0f} KB{page_kb:>9,.1f} KB{query_ms:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
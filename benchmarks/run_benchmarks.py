@@ -0,0 +1,241 @@
+"""Benchmark suite: every platform's pipeline, stage by stage, into a JSON file.
+
+For each platform a synthetic statement is generated (see synthetic.statement)
+and, in a fresh process so peak RSS is the platform's own, these stages are
+timed separately:
+
+* extract: page content from the PDF backends (word boxes for PhonePe, raw
+  text for Paytm and SuperMoney), reported in pages/s;
+* parse: page content to the parser's DataFrame, in rows/s;
+* categorize: categorizer.categorize_series over the descriptions;
+* aggregate: normalising into the schema, building the spending cube and
+  reading the dashboard views from it;
+* end_to_end: StatementParser.parse() on a cold cache, inline.
+
+Page extraction runs inline (one process), so the numbers are per core.
+Results, with the git commit and Python version, are written to
+``benchmarks/results/<timestamp>.json``; ``--baseline`` prints each metric's
+change against an earlier results file so regressions are visible.
+
+Usage: python benchmarks/run_benchmarks.py [--pages 105] [--transactions N]
+           [--platforms phonepe,paytm,supermoney] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import io
+import json
+import os
+import platform as python_platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARKS)
+sys.path.insert(0, ROOT)
+
+PLATFORMS = ['phonepe', 'paytm', 'supermoney']
+RESULTS_DIR = os.path.join(BENCHMARKS, 'results')
+# Metrics where a higher number is better; everything else is a time or a size
+HIGHER_IS_BETTER = ('pages_per_second', 'rows_per_second')
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - start
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def extract_stage(platform, documents):
+    """Per-page content as the platform's parser reads it"""
+    from formats import PAYTM, SUPERMONEY
+    from pdf_documents import text_quality_check
+
+    pages = range(1, documents.page_count + 1)
+    if platform == 'phonepe':
+        return [documents.plumber_page_words(page_num, x_tolerance=2, y_tolerance=2) for page_num in pages]
+    check = text_quality_check(PAYTM if platform == 'paytm' else SUPERMONEY)
+    return [documents.page_text(page_num, check) for page_num in pages]
+
+
+def parse_stage(platform, pages, parser):
+    """The parser's DataFrame from extracted page content"""
+    import pandas as pd
+
+    import page_extractor
+    import transaction_stream
+
+    if platform == 'phonepe':
+        results = [page_extractor.parse_page_words(page_num, words) for page_num, words in enumerate(pages, 1)]
+        transactions, _ = page_extractor.merge_page_results([result for result in results if result is not None])
+        return pd.DataFrame(transactions, columns=['date', 'amount', 'type', 'details', 'transaction_id'])
+    if platform == 'paytm':
+        lines = transaction_stream.iter_lines(enumerate(pages, 1))
+        return parser._build_paytm_frame(transaction_stream.iter_paytm_records(lines))
+    return parser._parse_supermoney_pdf(''.join(text + '\n' for text in pages))
+
+
+def run_platform(platform, pages, transactions):
+    """Time every stage for one platform; runs in its own process"""
+    from synthetic import statement
+
+    os.environ.setdefault('STATEMENT_PARSER_WORKERS', '1')
+    import aggregates
+    import categorizer
+    from parse_cache import get_parse_cache
+    from pdf_documents import PdfDocuments
+    from statement_parser import StatementParser
+    from transaction_schema import normalize_transactions
+
+    pdf_bytes, transactions = statement(platform, pages=pages, transactions=transactions)
+    upload = io.BytesIO(pdf_bytes)
+    upload.name = f"{platform}_statement.pdf"
+    parser = StatementParser(upload, selected_platform='')
+    parser.messages = []
+
+    with PdfDocuments(pdf_bytes) as documents:
+        page_count = documents.page_count
+        page_content, extract_seconds = timed(extract_stage, platform, documents)
+    df, parse_seconds = timed(parse_stage, platform, page_content, parser)
+    description = df['details'] if 'details' in df.columns else df['description']
+    _, categorize_seconds = timed(categorizer.categorize_series, description)
+
+    def aggregate(df):
+        if 'category' not in df.columns:
+            df = df.assign(category=categorizer.categorize_series(description))
+        cube = aggregates.build_cube(normalize_transactions(df))
+        for dimension in aggregates.DIMENSIONS:
+            cube.rollup(dimension, flow='debit')
+        cube.by_month('debit')
+        return cube
+    _, aggregate_seconds = timed(aggregate, df)
+
+    get_parse_cache().clear()
+    parsed, end_to_end_seconds = timed(parser.parse)
+    rows = len(df)
+
+    def rate(count, seconds):
+        return round(count / seconds, 1) if seconds else None
+
+    return {
+        'platform': platform,
+        'pages': page_count,
+        'transactions': transactions,
+        'rows_parsed': rows,
+        'rows_end_to_end': len(parsed),
+        'stages': {
+            'extract': {'seconds': round(extract_seconds, 4), 'pages_per_second': rate(page_count, extract_seconds)},
+            'parse': {'seconds': round(parse_seconds, 4), 'rows_per_second': rate(rows, parse_seconds)},
+            'categorize': {'seconds': round(categorize_seconds, 4), 'rows_per_second': rate(rows, categorize_seconds)},
+            'aggregate': {'seconds': round(aggregate_seconds, 4), 'rows_per_second': rate(rows, aggregate_seconds)},
+            'end_to_end': {
+                'seconds': round(end_to_end_seconds, 4),
+                'pages_per_second': rate(page_count, end_to_end_seconds),
+                'rows_per_second': rate(len(parsed), end_to_end_seconds),
+            },
+        },
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def run_in_subprocess(platform, pages, transactions):
+    command = [sys.executable, os.path.abspath(__file__), '--worker', platform]
+    if pages:
+        command += ['--pages', str(pages)]
+    if transactions:
+        command += ['--transactions', str(transactions)]
+    output = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(result):
+    """{'stage.metric': value} of one platform's result"""
+    metrics = {'peak_rss_mb': result['peak_rss_mb']}
+    for stage, values in result['stages'].items():
+        for metric, value in values.items():
+            metrics[f"{stage}.{metric}"] = value
+    return metrics
+
+
+def compare(results, baseline):
+    """Print every metric's change against a baseline results file"""
+    previous = {result['platform']: flatten(result) for result in baseline['platforms']}
+    print(f"\nchange against {baseline.get('commit') or 'baseline'} ({baseline.get('created')}):")
+    for result in results['platforms']:
+        before = previous.get(result['platform'])
+        if before is None:
+            continue
+        for metric, value in flatten(result).items():
+            old = before.get(metric)
+            if not old or value is None:
+                continue
+            change = (value - old) / old
+            worse = change < 0 if metric.endswith(HIGHER_IS_BETTER) else change > 0
+            flag = '  REGRESSION' if worse and abs(change) > 0.1 else ''
+            print(f"  {result['platform']:<11}{metric:<34}{old:>10} -> {value:<10}{change:>+8.1%}{flag}")
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments.add_argument('--pages', type=int, default=None, help="pages per statement (default 105)")
+    arguments.add_argument('--transactions', type=int, default=None, help="transactions per statement")
+    arguments.add_argument('--platforms', default=','.join(PLATFORMS))
+    arguments.add_argument('--output', default=None, help="results file (default benchmarks/results/<timestamp>.json)")
+    arguments.add_argument('--baseline', default=None, help="earlier results file to compare against")
+    arguments.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+    options = arguments.parse_args()
+
+    if options.worker:
+        print(json.dumps(run_platform(options.worker, options.pages, options.transactions)))
+        return
+
+    pages = options.pages or (None if options.transactions else 105)
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': python_platform.python_version(),
+        'machine': python_platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': {'pages': pages, 'transactions': options.transactions},
+        'platforms': [],
+    }
+    for platform in options.platforms.split(','):
+        result = run_in_subprocess(platform, pages, options.transactions)
+        results['platforms'].append(result)
+        stages = result['stages']
+        print(f"{platform:<11}{result['pages']:>5} pages {result['rows_parsed']:>6} rows  "
+              f"extract {stages['extract']['pages_per_second']:>7} pages/s  "
+              f"parse {stages['parse']['rows_per_second']:>9} rows/s  "
+              f"end-to-end {stages['end_to_end']['seconds']:>6}s  peak RSS {result['peak_rss_mb']} MB")
+
+    output = options.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {os.path.relpath(output)}")
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""Synthetic statement content shaped like real PhonePe, Paytm and SuperMoney exports"""
+import math
+import random
+from datetime import date, timedelta
+
+MERCHANTS = [
+    'Swiggy', 'Zomato', 'Cafe Coffee Day', 'Fresh Supermarket', 'Amazon Pay', 'Flipkart',
+    'D Mart', 'Uber India', 'Ola Cabs', 'Indian Oil Petrol', 'Airtel Prepaid', 'Jio Recharge',
+    'BESCOM Electricity', 'Anilshetty', 'Harsha', 'Ravi Kumar', 'Netflix', 'Bajaj Finance EMI',
+]
+
+
+def phonepe_lines(transactions, seed=1, start=date(2023, 4, 1)):
+    """Lines of a PhonePe "Transaction Statement", three per transaction"""
+    rng = random.Random(seed)
+    lines = [
+        "Transaction Statement for +910000000000",
+        f"{start.strftime('%b %d, %Y')} - {(start + timedelta(days=365)).strftime('%b %d, %Y')}",
+        "Date Transaction Details Type Amount",
+    ]
+    day = start
+    for i in range(transactions):
+        txn_type = rng.choice(['CREDIT', 'DEBIT', 'DEBIT'])
+        verb = 'Received from' if txn_type == 'CREDIT' else 'Paid to'
+        lines.append(
+            f"{day.strftime('%b %d, %Y')} {verb} {rng.choice(MERCHANTS)} {txn_type} INR {rng.randint(10, 9999)}.00"
+        )
+        lines.append(f"{rng.randint(1, 12):02d}:{rng.randint(0, 59):02d} AM Transaction ID : T{23040109484697 + i:020d}")
+        lines.append(f"UTR No : {300000000000 + i}")
+        if i % 3 == 2:
+            day += timedelta(days=1)
+    return lines
+
+
+def paytm_lines(transactions, seed=2, start=date(2024, 1, 1)):
+    """Lines of a Paytm UPI statement, three per transaction"""
+    rng = random.Random(seed)
+    lines = [
+        "Paytm UPI Statement for 9999999999",
+        "Rs.12,345.00 + Rs.6,789.00",
+        "Date & Time Transaction Details Notes & Tags Your Account Amount",
+    ]
+    day = start
+    for i in range(transactions):
+        merchant = rng.choice(MERCHANTS)
+        sign = rng.choice(['+', '-', '-'])
+        lines.append(f"{day.day} {day.strftime('%b')} Paid to {merchant} {sign} Rs.{rng.randint(1, 9999):,}.{rng.randint(0, 99):02d}")
+        lines.append(f"{rng.randint(1, 12)}:{rng.randint(0, 59):02d} AM UPI ID: {merchant.lower().replace(' ', '')}@paytm")
+        lines.append(f"UPI Ref No: {400000000000 + i}")
+        if i % 4 == 3:
+            day += timedelta(days=1)
+    return lines
+
+
+def supermoney_lines(transactions, seed=3, start=date(2024, 3, 1)):
+    """Lines of a SuperMoney statement, one per transaction"""
+    rng = random.Random(seed)
+    lines = ["SuperMoney Account Statement", "Date Description Amount"]
+    day = start
+    for i in range(transactions):
+        lines.append(f"{day.strftime('%d/%m/%Y')} {rng.choice(MERCHANTS)} INR {rng.randint(1, 9999):,}.00")
+        if i % 5 == 4:
+            day += timedelta(days=1)
+    return lines
+
+
+def statement_pdf(lines, lines_per_page=40, pages=None):
+    """Render statement lines into PDF bytes, one text line per row.
+
+    With ``pages`` the lines are spread evenly over exactly that many pages.
+    """
+    import fitz
+
+    if pages:
+        bounds = [round(i * len(lines) / pages) for i in range(pages + 1)]
+    else:
+        bounds = list(range(0, len(lines), lines_per_page)) + [len(lines)]
+    document = fitz.open()
+    # Taller pages than A4 when more lines are asked for than fit
+    height = max(842, 40 + max(b - a for a, b in zip(bounds, bounds[1:])) * 16 + 40)
+    for start, stop in zip(bounds, bounds[1:]):
+        page = document.new_page(height=height)
+        y = 40
+        for line in lines[start:stop]:
+            page.insert_text((40, y), line, fontsize=9)
+            y += 16
+    pdf_bytes = document.tobytes()
+    document.close()
+    return pdf_bytes
+
+
+# Left edges of the PhonePe transaction table's columns, in points
+PHONEPE_COLUMNS = {'date': 40, 'details': 130, 'type': 420, 'amount': 480}
+
+
+def phonepe_table_pdf(transactions, seed=1, start=date(2023, 4, 1), per_page=10):
+    """A PhonePe statement laid out as a table, like the real export.
+
+    Returns ``(pdf_bytes, expected)`` where ``expected`` lists each
+    transaction's ``(transaction_id, date, signed_amount, details)``.
+    """
+    import fitz
+
+    rng = random.Random(seed)
+    columns = PHONEPE_COLUMNS
+    document = fitz.open()
+    height = max(842, 115 + per_page * 64 + 40)
+    expected = []
+    day = start
+    page = None
+    for i in range(transactions):
+        if i % per_page == 0:
+            page = document.new_page(height=height)
+            page.insert_text((40, 40), "Transaction Statement for +910000000000", fontsize=11)
+            page.insert_text((40, 58), f"{start.strftime('%b %d, %Y')} - {(start + timedelta(days=365)).strftime('%b %d, %Y')}", fontsize=9)
+            for column, label in [('date', 'Date'), ('details', 'Transaction Details'), ('type', 'Type'), ('amount', 'Amount')]:
+                page.insert_text((columns[column], 90), label, fontsize=9)
+            y = 115
+
+        txn_type = rng.choice(['CREDIT', 'DEBIT', 'DEBIT'])
+        verb = 'Received from' if txn_type == 'CREDIT' else 'Paid to'
+        amount = rng.randint(10, 99999)
+        transaction_id = f"T{23040109484697 + i:020d}"
+        page.insert_text((columns['date'], y), day.strftime('%b %d, %Y'), fontsize=9)
+        details = f"{verb} {rng.choice(MERCHANTS)}"
+        page.insert_text((columns['details'], y), details, fontsize=9)
+        page.insert_text((columns['type'], y), txn_type, fontsize=9)
+        page.insert_text((columns['amount'], y), f"INR {amount:,}.00", fontsize=9)
+        page.insert_text((columns['date'], y + 12), f"{rng.randint(1, 12):02d}:{rng.randint(0, 59):02d} AM", fontsize=8)
+        page.insert_text((columns['details'], y + 12), f"Transaction ID : {transaction_id}", fontsize=8)
+        page.insert_text((columns['details'], y + 24), f"UTR No : {300000000000 + i}", fontsize=8)
+        page.insert_text((columns['details'], y + 36), f"{'Credited to' if txn_type == 'CREDIT' else 'Paid by'} XXXXXX{rng.randint(1000, 9999)}", fontsize=8)
+        expected.append((transaction_id, day, -amount if txn_type == 'DEBIT' else amount, details))
+        y += 64
+        if i % 3 == 2:
+            day += timedelta(days=1)
+
+    pdf_bytes = document.tobytes()
+    document.close()
+    return pdf_bytes, expected
+
+
+LINE_GENERATORS = {
+    'phonepe': phonepe_lines,
+    'paytm': paytm_lines,
+    'supermoney': supermoney_lines,
+}
+
+# Transactions on a page of each platform's export
+TRANSACTIONS_PER_PAGE = {'phonepe': 10, 'paytm': 13, 'supermoney': 38}
+# Text lines per transaction in the line-shaped exports
+LINES_PER_TRANSACTION = {'paytm': 3, 'supermoney': 1}
+
+
+def statement(platform, pages=None, transactions=None):
+    """``(pdf_bytes, transactions)`` of a synthetic statement for ``platform``.
+
+    Give ``pages``, ``transactions`` or both; with both, transactions are
+    spread evenly over the pages. PhonePe statements are laid out as a table
+    like the real export, the others one line per row.
+    """
+    per_page = TRANSACTIONS_PER_PAGE[platform]
+    if transactions is None:
+        transactions = (pages or 1) * per_page
+    elif pages:
+        per_page = max(1, math.ceil(transactions / pages))
+
+    if platform == 'phonepe':
+        return phonepe_table_pdf(transactions, per_page=per_page)[0], transactions
+    lines = LINE_GENERATORS[platform](transactions)
+    return statement_pdf(lines, lines_per_page=per_page * LINES_PER_TRANSACTION[platform], pages=pages), transactions
@@ -0,0 +1,159 @@
+"""Keyword and pattern based transaction categorisation.
+
+All category keywords are compiled once into a single alternation regex.
+``categorize_series`` lower-cases and de-duplicates a whole description
+column, finds every keyword in each distinct description in one vectorised
+``str.findall`` pass, falls back to the precompiled patterns for the rest,
+and maps the labels back onto the rows.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Advanced category mapping with sub-categories. Order matters: the first
+# category with a matching keyword wins, then its first matching sub-category.
+CATEGORIES = {
+    'Food & Dining': {
+        'keywords': ['swiggy', 'zomato', 'restaurant', 'food', 'dining', 'cafe', 'hotel', 'milk', 'burger', 'pizza'],
+        'sub_categories': {
+            'Restaurant': ['restaurant', 'dining', 'cafe'],
+            'Food Delivery': ['swiggy', 'zomato'],
+            'Groceries': ['grocery', 'supermarket', 'market', 'vegetables', 'fruits']
+        }
+    },
+    'Shopping': {
+        'keywords': ['amazon', 'flipkart', 'myntra', 'retail', 'mart', 'shop', 'store', 'market'],
+        'sub_categories': {
+            'Online Shopping': ['amazon', 'flipkart', 'myntra'],
+            'Retail': ['retail', 'mart', 'store'],
+            'Fashion': ['clothing', 'apparel', 'fashion']
+        }
+    },
+    'Transportation': {
+        'keywords': ['uber', 'ola', 'petrol', 'fuel', 'metro', 'bus', 'train', 'transport'],
+        'sub_categories': {
+            'Ride Sharing': ['uber', 'ola'],
+            'Fuel': ['petrol', 'fuel', 'gas'],
+            'Public Transport': ['metro', 'bus', 'train']
+        }
+    },
+    'Bills & Utilities': {
+        'keywords': ['airtel', 'jio', 'vodafone', 'electricity', 'water', 'gas', 'bill', 'recharge'],
+        'sub_categories': {
+            'Mobile': ['airtel', 'jio', 'vodafone', 'phone'],
+            'Utilities': ['electricity', 'water', 'gas'],
+            'Internet': ['broadband', 'wifi', 'internet']
+        }
+    }
+}
+
+# Common transaction patterns for descriptions no keyword matched, in priority order
+NLP_PATTERNS = [
+    (re.compile(r'\d+\s*rs'), 'Payment'),
+    (re.compile(r'transfer\s+to'), 'Transfer'),
+    (re.compile(r'received\s+from'), 'Income'),
+    (re.compile(r'salary'), 'Income - Salary'),
+    (re.compile(r'rent'), 'Housing - Rent'),
+    (re.compile(r'emi'), 'Finance - EMI'),
+    (re.compile(r'investment'), 'Investment'),
+    (re.compile(r'insurance'), 'Insurance'),
+    (re.compile(r'medical|health|hospital'), 'Healthcare'),
+    (re.compile(r'education|school|college'), 'Education'),
+]
+
+
+def _build_keyword_index():
+    keywords = set()
+    for data in CATEGORIES.values():
+        keywords.update(data['keywords'])
+        for sub_keywords in data['sub_categories'].values():
+            keywords.update(sub_keywords)
+
+    # A zero-width lookahead reports a match at every start position. With the
+    # alternatives longest-first, the one reported at a position is the longest
+    # keyword starting there; any other keyword starting there is a prefix of
+    # it, so each match expands to itself plus its keyword prefixes.
+    ordered = sorted(keywords, key=lambda kw: (-len(kw), kw))
+    pattern = re.compile('(?=(' + '|'.join(re.escape(kw) for kw in ordered) + '))')
+    prefix_closure = {
+        kw: frozenset(other for other in keywords if kw.startswith(other))
+        for kw in keywords
+    }
+
+    rules = [
+        (category, frozenset(data['keywords']),
+         [(sub_cat, frozenset(sub_keywords)) for sub_cat, sub_keywords in data['sub_categories'].items()])
+        for category, data in CATEGORIES.items()
+    ]
+    return pattern, prefix_closure, rules
+
+
+KEYWORD_PATTERN, _PREFIX_CLOSURE, _RULES = _build_keyword_index()
+
+
+def _keyword_label(matches):
+    """Category label for the keywords found in a description, or None"""
+    found = set()
+    for keyword in matches:
+        found.update(_PREFIX_CLOSURE[keyword])
+
+    if found:
+        for category, keywords, sub_categories in _RULES:
+            if found & keywords:
+                for sub_cat, sub_keywords in sub_categories:
+                    if found & sub_keywords:
+                        return f"{category} - {sub_cat}"
+                return category
+    return None
+
+
+def predict_category(details):
+    """Pattern-based category for a description no keyword matched"""
+    return _predict_lowered(details.lower())
+
+
+def _predict_lowered(details):
+    for pattern, category in NLP_PATTERNS:
+        if pattern.search(details):
+            return category
+    return 'Others'
+
+
+def categorize(details):
+    """Category label for a single transaction description"""
+    details = details.lower()
+    return _keyword_label(KEYWORD_PATTERN.findall(details)) or _predict_lowered(details)
+
+
+def categorize_series(descriptions):
+    """Category labels for a whole description column, aligned to its index"""
+    lowered = descriptions.astype(object).str.lower()
+    codes, uniques = pd.factorize(lowered)
+    if len(uniques) == 0:
+        return pd.Series('Others', index=descriptions.index, dtype=object)
+    unique_details = pd.Series(uniques, dtype=object)
+
+    # Keywords contain neither digits nor spaces, so blanking digit runs keeps
+    # every keyword hit while collapsing descriptions that only differ in
+    # amounts or reference numbers.
+    keyword_text = unique_details.str.replace(r'\d+', ' ', regex=True)
+    key_codes, key_uniques = pd.factorize(keyword_text)
+    key_matches = pd.Series(key_uniques, dtype=object).str.findall(KEYWORD_PATTERN)
+    key_labels = np.array([_keyword_label(found) for found in key_matches], dtype=object)
+    labels = pd.Series(key_labels[key_codes], dtype=object)
+
+    # Pattern fallback for the rest, one vectorised pass per pattern in priority order
+    remaining = labels.isna()
+    for pattern, category in NLP_PATTERNS:
+        if not remaining.any():
+            break
+        hits = unique_details[remaining].str.contains(pattern)
+        hit_index = hits.index[hits.to_numpy(dtype=bool)]
+        labels[hit_index] = category
+        remaining[hit_index] = False
+    labels[remaining] = 'Others'
+
+    # factorize marks missing descriptions with -1, which picks the trailing 'Others'
+    lookup = np.append(labels.to_numpy(dtype=object), 'Others')
+    return pd.Series(lookup[codes], index=descriptions.index)
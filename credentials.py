@@ -0,0 +1,117 @@
+"""Password hashing and verification.
+
+Passwords are hashed with scrypt, a memory-hard KDF, and stored as
+``scrypt$n$r$p$salt$hash`` (salt and hash base64) so the cost can be raised
+later without invalidating existing hashes. The cost is read from
+``AUTH_SCRYPT_N`` / ``AUTH_SCRYPT_R`` / ``AUTH_SCRYPT_P``.
+
+Unsalted SHA-256 hex digests written by earlier versions still verify and
+are reported as needing a rehash, as are scrypt hashes made with a different
+cost. Every comparison uses ``hmac.compare_digest``.
+
+Hashing runs on a small thread pool (``AUTH_HASH_WORKERS``). The caller
+still waits for its hash; the pool only bounds how many hashes, each
+needing 128 * n * r bytes, run at once across sessions. hashlib.scrypt
+releases the GIL, so those hashes don't stall other script threads.
+"""
+import os
+import hmac
+import base64
+import hashlib
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEME = 'scrypt'
+DEFAULT_N = 2 ** 14
+DEFAULT_R = 8
+DEFAULT_P = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+DEFAULT_HASH_WORKERS = 4
+
+
+def scrypt_cost():
+    """(n, r, p) for new hashes, from the environment"""
+    return (
+        int(os.environ.get('AUTH_SCRYPT_N', DEFAULT_N)),
+        int(os.environ.get('AUTH_SCRYPT_R', DEFAULT_R)),
+        int(os.environ.get('AUTH_SCRYPT_P', DEFAULT_P)),
+    )
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=128 * n * r * (p + 1) + 1024 * 1024, dklen=KEY_BYTES,
+    )
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def hash_password(password, cost=None):
+    """Salted scrypt hash of ``password`` in the stored string format"""
+    n, r, p = cost or scrypt_cost()
+    salt = secrets.token_bytes(SALT_BYTES)
+    return f"{SCHEME}${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+def _is_legacy(stored):
+    return len(stored) == 64 and all(c in '0123456789abcdef' for c in stored)
+
+
+def verify_password(password, stored, cost=None):
+    """Return ``(matches, needs_rehash)`` for ``password`` against a stored hash.
+
+    ``stored`` is None for an unknown user; a dummy hash is verified instead
+    so the answer takes as long as for a real account.
+    """
+    if stored is None:
+        verify_password(password, _dummy_hash(cost), cost)
+        return False, False
+
+    if _is_legacy(stored):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        matches = hmac.compare_digest(legacy, stored)
+        return matches, matches
+
+    try:
+        scheme, n, r, p, salt, expected = stored.split('$')
+        if scheme != SCHEME:
+            return False, False
+        n, r, p = int(n), int(r), int(p)
+        derived = _scrypt(password, base64.b64decode(salt), n, r, p)
+        matches = hmac.compare_digest(derived, base64.b64decode(expected))
+    except ValueError:
+        return False, False
+    return matches, matches and (n, r, p) != tuple(cost or scrypt_cost())
+
+
+_dummy_hashes = {}
+
+
+def _dummy_hash(cost=None):
+    cost = tuple(cost or scrypt_cost())
+    if cost not in _dummy_hashes:
+        _dummy_hashes[cost] = hash_password(secrets.token_hex(16), cost)
+    return _dummy_hashes[cost]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(os.environ.get('AUTH_HASH_WORKERS', DEFAULT_HASH_WORKERS))
+            _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='auth-hash')
+        return _executor
+
+
+def run_hashing(fn, *args):
+    """Run ``fn(*args)`` on the hashing pool, blocking until it returns its result"""
+    return _get_executor().submit(fn, *args).result()
@@ -0,0 +1,137 @@
+"""Pooled SQLite access for auth and other per-user data.
+
+Connections are opened once per pool slot and reused, so each call skips
+connection setup and sqlite3's per-connection statement cache keeps the
+compiled form of every query. The database runs in WAL mode, so logins
+(readers) don't wait on a registration (writer). Schemas are created once
+per process rather than on every render.
+
+The database is ``auth.db`` next to the app, as an absolute path so it
+doesn't depend on the working directory; ``STATEMENT_DB_PATH`` overrides it.
+"""
+import os
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent / 'auth.db'
+DEFAULT_POOL_SIZE = 8
+BUSY_TIMEOUT_SECONDS = 5.0
+# Compiled statements kept per connection
+STATEMENT_CACHE_SIZE = 128
+
+
+class Database:
+    """A fixed-size pool of WAL-mode connections to one SQLite file"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, pool_size=DEFAULT_POOL_SIZE):
+        self.path = str(Path(path).resolve())
+        self.pool_size = pool_size
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._schemas = set()
+        self._schema_lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(BUSY_TIMEOUT_SECONDS * 1000)}")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.pool_size:
+                self._opened += 1
+                open_new = True
+            else:
+                open_new = False
+        if open_new:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success and rolls back on error"""
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def execute(self, sql, params=()):
+        """Run one statement and return the number of rows it changed"""
+        with self.connection() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def fetchone(self, sql, params=()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def fetchall(self, sql, params=()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def ensure_schema(self, name, statements):
+        """Run a schema's DDL ``statements`` the first time ``name`` is seen"""
+        if name in self._schemas:
+            return
+        with self._schema_lock:
+            if name in self._schemas:
+                return
+            with self.connection() as conn:
+                for statement in statements:
+                    conn.execute(statement)
+            self._schemas.add(name)
+            logger.info(f"Database schema '{name}' ready in {self.path}")
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+_database = None
+_database_lock = threading.Lock()
+
+
+def get_database():
+    """Process-wide Database configured from the environment"""
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = Database(
+                path=os.environ.get('STATEMENT_DB_PATH') or DEFAULT_DB_PATH,
+                pool_size=int(os.environ.get('STATEMENT_DB_POOL_SIZE', DEFAULT_POOL_SIZE)),
+            )
+        return _database
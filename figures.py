@@ -0,0 +1,32 @@
+"""Dashboard figures memoised with the statement they chart.
+
+Building a Plotly figure validates every property, and plotly.express adds
+its own grouping on top, so each chart costs tens of milliseconds; the
+dashboards rebuilt all of them on every rerun. ``get_figure`` keeps a
+figure as a derived artifact of the statement's parse cache entry, keyed
+by chart name and parameters, so reruns of the same upload reuse it.
+
+Figures are built from the spending cube's roll-ups, so their traces hold
+one point per month or category rather than one per transaction.
+
+Cached figures are shared between reruns and sessions: treat them as
+read-only and pass styling in as parameters instead of updating them.
+"""
+import json
+
+from parse_cache import get_parse_cache
+
+
+def figure_key(name, params):
+    return f"figure-{name}-{json.dumps(params, sort_keys=True, default=str)}"
+
+
+def get_figure(cache_key, name, build, **params):
+    """``build()``, memoised with the parse under ``cache_key`` per ``name`` and ``params``.
+
+    ``params`` are the chart's options that ``build`` closes over; they only
+    key the cache. Without a ``cache_key`` the figure is built every time.
+    """
+    if cache_key is None:
+        return build()
+    return get_parse_cache().derived(cache_key, figure_key(name, params), build)
@@ -0,0 +1,71 @@
+"""Compiled line, date, amount and header patterns for every statement format.
+
+Patterns are compiled once at import and shared by the page extractor, the
+streaming pipeline and the parsers, so no hot loop re-declares or re-compiles
+a pattern.
+"""
+import re
+
+MONTHS = r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)'
+
+
+class StatementFormat:
+    """Compiled grammar of one platform's statement layout"""
+
+    def __init__(self, name, header, date, amount, date_flags=0, **extra):
+        self.name = name
+        # Text identifying the statement / transaction table header
+        self.header = re.compile(header)
+        # Date as it appears on a transaction line
+        self.date = re.compile(date, date_flags)
+        # Signed or currency-prefixed transaction amount
+        self.amount = re.compile(amount)
+        # Additional named patterns (transaction ids, header totals, ...)
+        self.extra = {key: re.compile(pattern) for key, pattern in extra.items()}
+
+    def __getattr__(self, key):
+        try:
+            return self.__dict__['extra'][key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __repr__(self):
+        return f"StatementFormat({self.name!r})"
+
+
+FORMATS = {}
+
+
+def register_format(statement_format):
+    FORMATS[statement_format.name] = statement_format
+    return statement_format
+
+
+def get_format(name):
+    return FORMATS[name]
+
+
+PHONEPE = register_format(StatementFormat(
+    'phonepe',
+    header=r'Transaction Statement for',
+    # A transaction line starts with its date: "Apr 01, 2023 Paid to ..."
+    date=MONTHS + r'\s+\d{2},\s+\d{4}',
+    amount=r'(?:INR|₹)\s*([\d,]+(?:\.\d+)?)',
+    transaction_id=r'Transaction ID\s*:\s*(\S+)',
+))
+
+PAYTM = register_format(StatementFormat(
+    'paytm',
+    header=r'Date & Time Transaction Details',
+    date=r'(\d{1,2})\s+' + MONTHS,
+    amount=r'([+-])\s*Rs\.(\d+(?:,\d+)*\.\d{2})',
+    date_flags=re.IGNORECASE,
+    totals=r'Rs\.(\d+(?:,\d+)*\.\d{2})\s*\+\s*Rs\.(\d+(?:,\d+)*\.\d{2})',
+))
+
+SUPERMONEY = register_format(StatementFormat(
+    'supermoney',
+    header=r'(?i)SuperMoney',
+    date=r'(\d{2}/\d{2}/\d{4})',  # DD/MM/YYYY
+    amount=r'(?:INR|Rs\.|₹)\s*([\d,]+\.?\d*)',  # INR/Rs./₹ followed by amount
+))
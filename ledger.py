@@ -0,0 +1,335 @@
+"""Opt-in per-user transaction ledger kept in the app database.
+
+Users who turn it on keep their parsed transactions between visits, in the
+``ledger_transactions`` table next to ``users``. Uploading a statement again
+only adds what the ledger doesn't hold yet:
+
+* the ledger's high-water mark is its latest transaction date per platform;
+* for PhonePe statements, whose dates carry the year, a binary search over
+  page dates finds the pages at or past the mark, so a year-long statement
+  with one new month parses about one month of pages. Other formats are
+  parsed in full and filtered by date;
+* rows are keyed by transaction id, or by date, amount, description and
+  occurrence, so overlapping pages and same-day rows insert once.
+
+Dashboards read the ledger through ``ledger_frame``, which keeps each
+ledger's DataFrame in memory and only queries rows added since it was read;
+its time rollups are extended with just those rows too.
+"""
+import io
+import logging
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+import page_extractor
+import parse_jobs
+from db import get_database
+from parse_cache import get_parse_cache, content_key
+from time_rollups import TimeRollups, ROLLUPS_ARTIFACT
+from pdf_documents import PdfDocuments
+from statement_parser import StatementParser
+from transaction_schema import normalize_transactions, empty_transactions
+
+logger = logging.getLogger(__name__)
+
+LEDGER_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS ledger_users
+       (username TEXT PRIMARY KEY,
+        enabled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
+    '''CREATE TABLE IF NOT EXISTS ledger_transactions
+       (username TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        row_key TEXT NOT NULL,
+        date TEXT NOT NULL,
+        amount_paise INTEGER NOT NULL,
+        type TEXT,
+        description TEXT,
+        category TEXT,
+        transaction_id TEXT,
+        PRIMARY KEY (username, platform, row_key))''',
+    '''CREATE INDEX IF NOT EXISTS ledger_transactions_by_date
+       ON ledger_transactions (username, platform, date)''',
+]
+
+# Formats whose pages can be skipped by date
+INCREMENTAL_FORMATS = {'phonepe'}
+# Ledger DataFrames kept in memory for incremental reads
+MAX_CACHED_LEDGERS = 32
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Session state key holding the rows each ingested upload added
+SESSION_INGESTED_KEY = 'ledger_ingested'
+
+
+def init_ledger_db():
+    get_database().ensure_schema('ledger', LEDGER_SCHEMA)
+
+
+def is_enabled(username):
+    init_ledger_db()
+    return get_database().fetchone("SELECT 1 FROM ledger_users WHERE username=?", (username,)) is not None
+
+
+def set_enabled(username, enabled):
+    """Turn the ledger on or off; turning it off deletes the stored transactions"""
+    init_ledger_db()
+    if enabled:
+        get_database().execute("INSERT OR IGNORE INTO ledger_users (username) VALUES (?)", (username,))
+        return
+    with get_database().connection() as conn:
+        conn.execute("DELETE FROM ledger_transactions WHERE username=?", (username,))
+        conn.execute("DELETE FROM ledger_users WHERE username=?", (username,))
+    with _frames_lock:
+        for key in [key for key in _frames if key[0] == username]:
+            del _frames[key]
+
+
+def high_water_mark(username, platform):
+    """Latest transaction date in the ledger, or None when it is empty"""
+    init_ledger_db()
+    row = get_database().fetchone(
+        "SELECT MAX(date) FROM ledger_transactions WHERE username=? AND platform=?", (username, platform)
+    )
+    return pd.Timestamp(row[0]) if row and row[0] else None
+
+
+def _row_keys(df):
+    occurrence = df.groupby(['date', 'amount_paise', 'description'], observed=True, sort=False).cumcount()
+    keys = (
+        df['date'].dt.strftime(DATE_FORMAT) + '|' + df['amount_paise'].astype(str) + '|'
+        + df['description'].astype(str) + '|' + occurrence.astype(str)
+    )
+    has_id = df['transaction_id'].notna()
+    keys[has_id] = 'id|' + df.loc[has_id, 'transaction_id'].astype(str)
+    return keys
+
+
+def append(username, platform, df, since=None):
+    """Insert the rows of a parsed statement dated on or after ``since``'s day.
+
+    Returns the number of rows added; rows the ledger already holds are skipped.
+    """
+    df = df[df['amount_paise'] != 0]
+    if since is not None:
+        df = df[df['date'] >= since.normalize()]
+    if df.empty:
+        return 0
+
+    rows = zip(
+        _row_keys(df),
+        df['date'].dt.strftime(DATE_FORMAT),
+        df['amount_paise'].astype(int),
+        df['type'].astype(str),
+        df['description'].astype(str),
+        df['category'].astype(str),
+        df['transaction_id'].astype(object).where(df['transaction_id'].notna(), None),
+    )
+    init_ledger_db()
+    with get_database().connection() as conn:
+        before = conn.total_changes
+        conn.executemany(
+            '''INSERT OR IGNORE INTO ledger_transactions
+               (username, platform, row_key, date, amount_paise, type, description, category, transaction_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            [(username, platform) + tuple(row) for row in rows],
+        )
+        return conn.total_changes - before
+
+
+_frames = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+def ledger_frame(username, platform):
+    """``(df, version, rollups)`` of a user's ledger, reading only rows added since the last call"""
+    init_ledger_db()
+    key = (username, platform)
+    with _frames_lock:
+        df, last_rowid, rollups = _frames.get(key, (None, 0, None))
+
+    new_rows = get_database().fetchall(
+        '''SELECT rowid, date, amount_paise, type, description, category, transaction_id
+           FROM ledger_transactions WHERE username=? AND platform=? AND rowid > ?
+           ORDER BY rowid''',
+        (username, platform, last_rowid),
+    )
+    if new_rows or df is None:
+        added = pd.DataFrame(
+            [row[1:] for row in new_rows],
+            columns=['date', 'amount_paise', 'type', 'description', 'category', 'transaction_id'],
+        )
+        added['amount'] = added['amount_paise'] / 100
+        added = normalize_transactions(added)
+        rollups = TimeRollups.from_frame(added) if rollups is None else rollups.extend(added)
+        parts = [part for part in (df, added) if part is not None and len(part)]
+        df = pd.concat(parts, ignore_index=True) if parts else added
+        # Newest first, like a statement
+        df = normalize_transactions(df.sort_values('date', ascending=False, kind='stable').reset_index(drop=True))
+        if new_rows:
+            last_rowid = new_rows[-1][0]
+        with _frames_lock:
+            _frames[key] = (df, last_rowid, rollups)
+            _frames.move_to_end(key)
+            while len(_frames) > MAX_CACHED_LEDGERS:
+                _frames.popitem(last=False)
+    return df.copy(), last_rowid, rollups
+
+
+def _page_latest_date(documents, page_num, cache):
+    if page_num not in cache:
+        result = page_extractor.extract_page(documents, page_num)
+        dates = [transaction['date'] for transaction in result['transactions']]
+        cache[page_num] = max(dates) if dates else None
+    return cache[page_num]
+
+
+def _dated_page(documents, pages, cache):
+    """First page of ``pages`` with any transactions, or None"""
+    for page_num in pages:
+        if _page_latest_date(documents, page_num, cache) is not None:
+            return page_num
+    return None
+
+
+def pages_since(pdf_bytes, high_water):
+    """``(first_page, last_page)`` holding transactions on or after ``high_water``'s day.
+
+    Statements list transactions newest or oldest first; the order is read off
+    the first and last pages with transactions, then a binary search over the
+    dated pages finds the boundary. Cover, summary and footer pages without
+    transactions are stepped past. Returns None when nothing is new.
+    """
+    since = high_water.normalize().to_pydatetime()
+    latest = {}
+    with PdfDocuments(pdf_bytes) as documents:
+        page_count = documents.page_count
+        if page_count == 0:
+            return None
+
+        def is_new(page_num):
+            return _page_latest_date(documents, page_num, latest) >= since
+
+        def probe(middle, low, high):
+            # Nearest dated page to middle within [low, high], forwards first
+            page_num = _dated_page(documents, range(middle, high + 1), latest)
+            if page_num is None:
+                page_num = _dated_page(documents, range(middle - 1, low - 1, -1), latest)
+            return page_num
+
+        first = _dated_page(documents, range(1, page_count + 1), latest)
+        if first is None:
+            # No dates to go by: parse it all and let append() filter
+            page_range = (1, page_count)
+        else:
+            last = _dated_page(documents, range(page_count, first - 1, -1), latest)
+            newest_first = _page_latest_date(documents, first, latest) >= _page_latest_date(documents, last, latest)
+
+            if newest_first:
+                if not is_new(first):
+                    return None
+                # Last new dated page; the page after it is kept for the transaction lines it carries over
+                low, high = first, last
+                while low < high:
+                    page_num = probe((low + high + 1) // 2, low + 1, high)
+                    if page_num is None:
+                        break
+                    if is_new(page_num):
+                        low = page_num
+                    else:
+                        high = page_num - 1
+                page_range = (1, min(low + 1, page_count))
+            else:
+                if not is_new(last):
+                    return None
+                # First new dated page
+                low, high = first, last
+                while low < high:
+                    page_num = probe((low + high) // 2, low, high - 1)
+                    if page_num is None:
+                        low = high
+                        break
+                    if is_new(page_num):
+                        high = page_num
+                    else:
+                        low = page_num + 1
+                page_range = (low, page_count)
+
+    logger.info(f"Ledger high-water mark {since:%Y-%m-%d}: pages {page_range[0]}-{page_range[1]} "
+                f"of {page_count} are new ({len(latest)} pages probed)")
+    return page_range
+
+
+def ingest_upload(uploaded_file, username, platform):
+    """Add an upload's transactions past the ledger's high-water mark; returns rows added"""
+    high_water = high_water_mark(username, platform)
+    page_range = None
+    if high_water is not None and uploaded_file.name.lower().endswith('.pdf'):
+        statement = StatementParser(uploaded_file, selected_platform=platform)
+        if statement.detect_format().name in INCREMENTAL_FORMATS:
+            page_range = pages_since(uploaded_file.getvalue(), high_water)
+            if page_range is None:
+                return 0
+
+    _, df = parse_jobs.parse_upload(uploaded_file, page_range=page_range)
+    return append(username, platform, df, since=high_water)
+
+
+def _ledger_parser(username, platform, version):
+    # A parser with no upload behind it, for the cube and charts of the ledger
+    placeholder = io.BytesIO(b'')
+    placeholder.name = f"{platform} ledger"
+    parser = StatementParser(placeholder, selected_platform=platform)
+    parser.cache_key = content_key(f"{username}\n{platform}\n{version}".encode(), 'ledger')
+    return parser
+
+
+def has_transactions(username, platform):
+    init_ledger_db()
+    return get_database().fetchone(
+        "SELECT 1 FROM ledger_transactions WHERE username=? AND platform=? LIMIT 1", (username, platform)
+    ) is not None
+
+
+def update_ledger(uploaded_files, username, platform):
+    """Add uploads to the user's ledger and return ``(parser, df)`` of the whole ledger.
+
+    Each upload is ingested once per session; reruns reuse the count of rows it added.
+    """
+    ingested = st.session_state.setdefault(SESSION_INGESTED_KEY, {})
+    added = 0
+    for uploaded_file in uploaded_files:
+        key = content_key(uploaded_file.getvalue(), f"ledger-{username}-{platform}")
+        if key not in ingested:
+            ingested[key] = ingest_upload(uploaded_file, username, platform)
+        added += ingested[key]
+    if uploaded_files:
+        st.info(f"Added {added} new transactions to your saved {platform} history.")
+
+    df, version, rollups = ledger_frame(username, platform)
+    parser = _ledger_parser(username, platform, version)
+    cache = get_parse_cache()
+    if len(df) and parser.cache_key not in cache:
+        cache.put(parser.cache_key, df)
+    # Seed the rollups extended above instead of rescanning the whole ledger
+    cache.derived(parser.cache_key, ROLLUPS_ARTIFACT, lambda: rollups)
+    if not len(df):
+        return parser, empty_transactions()
+    return parser, df
+
+
+def show_ledger_toggle(username):
+    """Checkbox turning the user's ledger on or off; returns whether it is on"""
+    enabled = is_enabled(username)
+    keep = st.checkbox(
+        "Keep my transactions between visits",
+        value=enabled,
+        key='keep_ledger',
+        help="Saves your parsed transactions so uploading the same statement again only reads what's new. "
+             "Unticking deletes everything saved.",
+    )
+    if keep != enabled:
+        set_enabled(username, keep)
+        st.session_state.pop(SESSION_INGESTED_KEY, None)
+    return keep
@@ -0,0 +1,283 @@
+"""Merchant names from raw statement descriptions.
+
+Descriptions carry more than the merchant: PhonePe's read "Paid to Swiggy
+DEBIT INR", and Paytm's join every line of the transaction, date, amount,
+time, UPI ID and reference number included. ``MerchantIndex`` strips that
+noise, maps the remaining name through the user's aliases (rows of the
+``merchant_aliases`` table, editable from the dashboards) and remembers the
+result in a bounded LRU keyed by the raw description with its digits masked,
+so each shape of description is canonicalised once per process rather than
+once per row, statement or rerun.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from db import get_database
+
+logger = logging.getLogger(__name__)
+
+# Noise removed from descriptions, in order
+NOISE_PATTERNS = [
+    # Notes the payer attached, e.g. PhonePe's "Tag: Groceries"
+    re.compile(r'\b(?:tag|note|remarks?)\s*:.*$'),
+    # Paytm's leading "1 Jan" date and the time of day
+    re.compile(r'^\d{1,2}\s+[a-z]{3}\b'),
+    re.compile(r'\b\d{1,2}:\d{2}\s*(?:am|pm)?\b'),
+    # Reference numbers and ids with their labels
+    re.compile(r'\b(?:upi\s*)?(?:ref(?:erence)?|utr|txn|transaction)\s*(?:no|id)?\.?\s*:?\s*[a-z]*\d[\w-]*'),
+    re.compile(r'\bupi\s*id\s*:?\s*\S+'),
+    # Signed amounts and currency
+    re.compile(r'[+-]?\s*(?:rs\.?|inr|₹)\s*[\d,]+(?:\.\d+)?'),
+    re.compile(r'\b(?:debit|credit)\b(?:\s+inr)?'),
+    # Direction of the payment
+    re.compile(r'^(?:paid\s+to|received\s+from|payment\s+to|transfer\s+to|money\s+sent\s+to)\s+'),
+]
+# A bare UPI handle such as "swiggy@icici" keeps only its name part
+UPI_HANDLE = re.compile(r'([\w.-]+)@[a-z][a-z.]*\b')
+# Unlabelled ids, phone and account numbers: any word with six or more digits
+ID_TOKEN = re.compile(r'\b\w*\d{6,}\w*\b')
+_SPACES = re.compile(r'\s+')
+_NOT_ALNUM = re.compile(r'[^a-z0-9]')
+# Every digit read as 0: the patterns above only ask whether a character is a
+# digit, so descriptions differing in amounts, times and reference numbers
+# alone clean to the same name and share one LRU entry. Translating the UTF-8
+# bytes is an order of magnitude faster than str.translate, and digits never
+# occur inside a multi-byte character
+_MASK_DIGITS = bytes.maketrans(b'123456789', b'000000000')
+UNKNOWN_MERCHANT = 'Unknown'
+
+MERCHANT_ALIASES_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS merchant_aliases
+       (username TEXT NOT NULL,
+        alias TEXT NOT NULL,
+        merchant TEXT NOT NULL,
+        PRIMARY KEY (username, alias))''',
+]
+# Canonical names remembered per index, by description with its digits masked
+DEFAULT_CACHE_SIZE = 50_000
+# Indexes kept, one per distinct alias table in use
+MAX_CACHED_INDEXES = 32
+
+
+def _alias_key(name):
+    """Case, space and punctuation insensitive form of a name, e.g. 'Anil Shetty' -> 'anilshetty'"""
+    return _NOT_ALNUM.sub('', name.lower())
+
+
+def clean_description(description):
+    """Lower-cased description with ids, handles, amounts and payment wording removed"""
+    name = _SPACES.sub(' ', str(description).lower()).strip()
+    for pattern in NOISE_PATTERNS:
+        name = _SPACES.sub(' ', pattern.sub(' ', name)).strip()
+    name = UPI_HANDLE.sub(r'\1', name)
+    # Keep a payee known only by number, e.g. "9876543210@ybl", rather than lose it
+    name = _SPACES.sub(' ', ID_TOKEN.sub(' ', name)).strip() or name
+    return name.strip(' -:,._')
+
+
+class MerchantIndex:
+    """Canonical merchant name per raw description, memoised in a bounded LRU.
+
+    ``aliases`` maps an alias to the merchant name it stands for. An alias
+    matches a cleaned description equal to it or starting with it, ignoring
+    case, spaces and punctuation, so "amazon" also renames "Amazon Pay India".
+    """
+
+    def __init__(self, aliases=None, max_entries=DEFAULT_CACHE_SIZE, version='none'):
+        self.aliases = dict(aliases or {})
+        self.max_entries = max_entries
+        # Names artifacts derived from this index's merchant names
+        self.version = version
+        self._aliases = {_alias_key(alias): name.strip() for alias, name in self.aliases.items() if name.strip()}
+        self._aliases.pop('', None)
+        self._names = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def canonical(self, description):
+        """Merchant name of a raw description, e.g. 'Paid to Swiggy DEBIT INR' -> 'Swiggy'"""
+        return self.canonical_all([description])[0]
+
+    def canonical_all(self, descriptions):
+        """canonical() of each description, looking each masked description up once"""
+        descriptions = [str(description) for description in descriptions]
+        keys = [description.encode().translate(_MASK_DIGITS).decode() for description in descriptions]
+        names = dict.fromkeys(keys)
+        with self._lock:
+            for key in names:
+                name = self._names.get(key)
+                if name is not None:
+                    self._names.move_to_end(key)
+                    self.hits += 1
+                    names[key] = name
+
+        missing = [key for key, name in names.items() if name is None]
+        for key in missing:
+            names[key] = self._canonical(key)
+        if missing:
+            with self._lock:
+                self.misses += len(missing)
+                for key in missing:
+                    self._names[key] = names[key]
+                while len(self._names) > self.max_entries:
+                    self._names.popitem(last=False)
+
+        # A name that kept a masked digit, e.g. a payee known by phone number,
+        # comes from the description itself
+        return [
+            name if '0' not in name else self._canonical(description)
+            for description, name in zip(descriptions, map(names.get, keys))
+        ]
+
+    def _canonical(self, description):
+        name = clean_description(description)
+        if not name:
+            return UNKNOWN_MERCHANT
+        if self._aliases:
+            # Longest leading run of words that is an alias
+            words = name.split(' ')
+            for end in range(len(words), 0, -1):
+                alias = self._aliases.get(_alias_key(''.join(words[:end])))
+                if alias:
+                    return alias
+        return name.title()
+
+    def __len__(self):
+        return len(self._names)
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def init_aliases_db():
+    get_database().ensure_schema('merchant_aliases', MERCHANT_ALIASES_SCHEMA)
+
+
+def load_aliases(username):
+    """``username``'s alias table, or {} when there is none"""
+    if not username:
+        return {}
+    init_aliases_db()
+    rows = get_database().fetchall(
+        "SELECT alias, merchant FROM merchant_aliases WHERE username=? ORDER BY alias", (username,),
+    )
+    return {alias: merchant for alias, merchant in rows}
+
+
+def save_aliases(username, aliases):
+    """Replace ``username``'s alias table; their merchant index picks it up on its next use"""
+    init_aliases_db()
+    with get_database().connection() as conn:
+        conn.execute("DELETE FROM merchant_aliases WHERE username=?", (username,))
+        conn.executemany(
+            "INSERT INTO merchant_aliases (username, alias, merchant) VALUES (?, ?, ?)",
+            [(username, alias, merchant) for alias, merchant in sorted(aliases.items())],
+        )
+
+
+def aliases_version(username, aliases):
+    """Names artifacts built with ``aliases``: 'none' without any, else the user and a digest of them"""
+    if not aliases:
+        return 'none'
+    digest = hashlib.sha1(json.dumps(sorted(aliases.items()), ensure_ascii=False).encode()).hexdigest()
+    return f"{username}-{digest[:16]}"
+
+
+def get_merchant_index(username=None):
+    """MerchantIndex of ``username``'s aliases, rebuilt when they change.
+
+    Users without aliases share one index, and so one cache of canonical names.
+    """
+    aliases = load_aliases(username)
+    version = aliases_version(username, aliases)
+    with _indexes_lock:
+        index = _indexes.get(version)
+        if index is None:
+            index = MerchantIndex(
+                aliases,
+                max_entries=int(os.environ.get('STATEMENT_MERCHANT_CACHE', DEFAULT_CACHE_SIZE)),
+                version=version,
+            )
+            _indexes[version] = index
+            while len(_indexes) > MAX_CACHED_INDEXES:
+                _indexes.popitem(last=False)
+        _indexes.move_to_end(version)
+        return index
+
+
+def canonical_merchant(description, username=None):
+    """Merchant name of a raw description, e.g. 'Paid to Swiggy DEBIT INR' -> 'Swiggy'"""
+    return get_merchant_index(username).canonical(description)
+
+
+def canonical_merchants(descriptions, username=None):
+    """Categorical of merchant names under ``username``'s aliases, canonicalising each distinct description once"""
+    descriptions = pd.Series(descriptions)
+    if not isinstance(descriptions.dtype, pd.CategoricalDtype):
+        descriptions = descriptions.astype('category')
+    names = get_merchant_index(username).canonical_all(descriptions.cat.categories.to_numpy(dtype=object))
+    # Missing descriptions have code -1, which picks this last entry
+    names.append(UNKNOWN_MERCHANT)
+    return pd.Series(
+        pd.Categorical(np.asarray(names, dtype=object)[descriptions.cat.codes.to_numpy()]),
+        index=descriptions.index,
+    )
+
+
+def merchant_keys(descriptions, username=None):
+    """``(keys, merchants)``: a uint64 hash of each row's merchant name, and the names"""
+    merchants = canonical_merchants(descriptions, username)
+    category_keys = pd.util.hash_array(np.asarray(merchants.cat.categories, dtype=object))
+    return category_keys[merchants.cat.codes.to_numpy()], merchants
+
+
+def show_alias_editor(username, key='merchant_aliases'):
+    """Expander for editing the alias table that renames ``username``'s merchants"""
+    with st.expander("🏷️ Merchant aliases"):
+        st.caption(
+            "Rename merchants that show up under several names. An alias matches a "
+            "merchant name equal to it or starting with it, ignoring case and spaces."
+        )
+        aliases = load_aliases(username)
+        table = pd.DataFrame(
+            {'alias': list(aliases), 'merchant': list(aliases.values())},
+            columns=['alias', 'merchant'],
+            dtype=object,
+        )
+        edited = st.data_editor(
+            table,
+            key=key,
+            num_rows='dynamic',
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'alias': st.column_config.TextColumn("Alias", help="e.g. anilshetty"),
+                'merchant': st.column_config.TextColumn("Merchant", help="e.g. Anil Shetty"),
+            },
+        )
+        if st.button("Save aliases", key=f"{key}_save"):
+            rows = edited.dropna().astype(str)
+            updated = {
+                alias.strip(): merchant.strip()
+                for alias, merchant in zip(rows['alias'], rows['merchant'])
+                if alias.strip() and merchant.strip()
+            }
+            try:
+                save_aliases(username, updated)
+            except sqlite3.Error as e:
+                st.error(f"Could not save merchant aliases: {str(e)}")
+                return
+            st.success(f"Saved {len(updated)} merchant aliases")
+            st.rerun()
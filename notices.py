@@ -0,0 +1,64 @@
+"""Notices that dismiss themselves in the browser.
+
+A Streamlit script run holds its runner thread until it finishes, so a
+message that should disappear after a few seconds must not sleep and then
+clear a placeholder. ``timed_notice`` renders the message with a CSS
+animation that fades it out client-side; ``flash`` queues one for the next
+run, for actions that change state and immediately call ``st.rerun()``.
+"""
+import html
+
+import streamlit as st
+
+FLASH_KEY = '_flash_notices'
+DEFAULT_SECONDS = 3
+
+NOTICE_STYLES = {
+    'success': 'background-color: #e8f5e9; color: #1b5e20; border-left: 5px solid #43a047;',
+    'info': 'background-color: #e3f2fd; color: #0d47a1; border-left: 5px solid #1e88e5;',
+    'warning': 'background-color: #FFF3CD; color: #856404; border-left: 5px solid #FFE69C;',
+    'error': 'background-color: #ffebee; color: #d32f2f; border-left: 5px solid #f44336;',
+}
+
+# Visible for the first 85% of the duration, then fades and collapses
+_DISMISS_CSS = """
+    <style>
+    @keyframes notice-dismiss {
+        0%, 85% { opacity: 1; max-height: 40rem; }
+        100% { opacity: 0; max-height: 0; margin: 0; padding: 0; border: 0; }
+    }
+    .timed-notice {
+        overflow: hidden;
+        animation-name: notice-dismiss;
+        animation-timing-function: ease-in;
+        animation-fill-mode: forwards;
+    }
+    </style>
+"""
+
+
+def timed_notice(body, seconds=DEFAULT_SECONDS, style=''):
+    """Render ``body`` (HTML) and let the browser dismiss it after ``seconds``"""
+    st.markdown(
+        f"""{_DISMISS_CSS}
+        <div class="timed-notice" style="animation-duration: {seconds}s; {style}">
+            {body}
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+
+def flash(message, kind='success', seconds=DEFAULT_SECONDS):
+    """Queue a plain-text notice to be shown by the next show_flash_notices()"""
+    st.session_state.setdefault(FLASH_KEY, []).append((message, kind, seconds))
+
+
+def show_flash_notices():
+    """Render and forget every queued notice"""
+    for message, kind, seconds in st.session_state.pop(FLASH_KEY, []):
+        timed_notice(
+            html.escape(message),
+            seconds,
+            style=NOTICE_STYLES.get(kind, NOTICE_STYLES['info']) + ' padding: 1rem; border-radius: 8px; margin: 0.5rem 0;'
+        )
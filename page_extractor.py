@@ -0,0 +1,464 @@
+"""Page-level PDF extraction engine for PhonePe-style statements.
+
+Pages are read in one of two modes, chosen by ``STATEMENT_EXTRACTION_MODE``:
+
+* ``words`` (default) takes pdfplumber's word boxes once per page, clusters
+  them into rows by their top coordinate and into fields by the x-ranges of
+  the table header's columns, and builds typed records directly;
+* ``layout`` renders layout text and re-splits each line on whitespace.
+
+A page in ``words`` mode falls back to ``layout`` when it has no table
+header, or when some rows under the header start with a date but don't fit
+the columns.
+"""
+import os
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import telemetry
+from pdf_documents import PdfDocuments
+from formats import PHONEPE
+
+logger = logging.getLogger(__name__)
+
+# Below this many pages the statement is parsed inline: starting worker
+# processes costs more than it saves on a short statement.
+MIN_PAGES_FOR_POOL = 8
+
+EXTRACTION_MODES = ('words', 'layout')
+DEFAULT_EXTRACTION_MODE = 'words'
+# Words whose tops are at most this many points apart share a row
+ROW_TOLERANCE = 3
+# Transaction table columns and the header word each one starts with
+COLUMNS = [('date', 'Date'), ('details', 'Transaction'), ('type', 'Type'), ('amount', 'Amount')]
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def resolve_worker_count(max_workers=None):
+    """Return the number of worker processes used for page extraction"""
+    if max_workers is None:
+        max_workers = os.environ.get('STATEMENT_PARSER_WORKERS') or os.cpu_count() or 1
+    try:
+        return max(1, int(max_workers))
+    except (TypeError, ValueError):
+        logger.info(f"Invalid worker count {max_workers!r}, falling back to 1")
+        return 1
+
+
+def extraction_mode():
+    """Page reading mode from ``STATEMENT_EXTRACTION_MODE``"""
+    mode = os.environ.get('STATEMENT_EXTRACTION_MODE', DEFAULT_EXTRACTION_MODE).lower()
+    if mode not in EXTRACTION_MODES:
+        logger.info(f"Unknown extraction mode {mode!r}, using {DEFAULT_EXTRACTION_MODE}")
+        return DEFAULT_EXTRACTION_MODE
+    return mode
+
+
+def split_lines(text):
+    """Split extracted page text into stripped, non-empty lines"""
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+
+def parse_date_line(line, parts):
+    """Build a transaction record from a line that starts with a date"""
+    date_str = ' '.join(parts[:3])
+
+    amount_parts = [p for p in reversed(parts) if '₹' in p or any(c.isdigit() for c in p)]
+    if not amount_parts:
+        return None
+
+    cleaned_amount = (amount_parts[0].replace('₹', '')
+                                     .replace(',', '')
+                                     .replace(' ', '')
+                                     .strip())
+    cleaned_amount = ''.join(c for c in cleaned_amount if c.isdigit() or c in '.-')
+    amount = float(cleaned_amount)
+    if amount == 0:  # Skip zero amount transactions
+        return None
+
+    txn_type = 'CREDIT' if 'CREDIT' in line else 'DEBIT' if 'DEBIT' in line else 'UNKNOWN'
+    if txn_type == 'DEBIT':
+        amount = -amount
+
+    if len(parts) > 4:
+        details = ' '.join(parts[3:-1])
+    else:
+        details = 'Unknown Transaction'
+
+    return {
+        'date': datetime.strptime(date_str, '%b %d, %Y'),
+        'amount': amount,
+        'type': txn_type,
+        'details': details,
+        'transaction_id': None,
+    }
+
+
+def parse_page_lines(page_num, lines):
+    """Parse the lines of one page into transaction records.
+
+    Lines seen before the first date line are returned as ``leading_lines``;
+    they belong to the last transaction of the previous page.
+    """
+    leading_lines = []
+    transactions = []
+    errors = []
+    current_transaction = None
+    seen_date_line = False
+
+    for line in lines:
+        if PHONEPE.header.search(line):
+            continue
+
+        if PHONEPE.date.match(line):
+            seen_date_line = True
+            current_transaction = None
+            try:
+                current_transaction = parse_date_line(line, line.split())
+            except (ValueError, IndexError):
+                logger.info(f"Skipping transaction with invalid amount on page {page_num}")
+                continue
+            except Exception as e:
+                logger.info(f"Error processing line on page {page_num}: {str(e)}")
+                errors.append(f"Line processing error on page {page_num}: {str(e)}")
+                continue
+            if current_transaction:
+                transactions.append(current_transaction)
+        elif not seen_date_line:
+            leading_lines.append(line)
+        elif current_transaction:
+            attach_continuation(current_transaction, line)
+
+    return {
+        'page_num': page_num,
+        'has_text': True,
+        'line_count': len(lines),
+        'leading_lines': leading_lines,
+        'transactions': transactions,
+        'errors': errors,
+    }
+
+
+def parse_page_text(page_num, text):
+    """Parse raw page text, recording an error when it has no usable lines"""
+    lines = split_lines(text)
+    if not lines:
+        return _page_error(page_num, f"Page {page_num}: No valid text lines found")
+    return parse_page_lines(page_num, lines)
+
+
+def attach_continuation(transaction, line):
+    """Fold a continuation line (time, Transaction ID, UTR) into its transaction"""
+    if transaction['transaction_id'] is None:
+        match = PHONEPE.transaction_id.search(line)
+        if match:
+            transaction['transaction_id'] = match.group(1)
+
+
+def _page_error(page_num, message, has_text=True):
+    return {
+        'page_num': page_num,
+        'has_text': has_text,
+        'line_count': 0,
+        'leading_lines': [],
+        'transactions': [],
+        'errors': [message],
+    }
+
+
+def extract_page_range(pdf_bytes, first_page, last_page):
+    """Extract and parse pages ``first_page..last_page`` in a worker process.
+
+    The worker opens its own document handles and returns ``(results, timings,
+    spans)`` so the parent can fold its backend time into the upload's counters
+    and its telemetry spans into the parse's trace.
+    """
+    with telemetry.trace('page_range', pages=last_page - first_page + 1) as worker_trace:
+        with PdfDocuments(pdf_bytes) as documents:
+            results = _extract_with(documents, first_page, last_page)
+    spans = worker_trace.records if worker_trace is not None else []
+    return results, documents.timings, spans
+
+
+def _extract_with(documents, first_page, last_page, progress=None):
+    """Extract and parse pages ``first_page..last_page`` (1-based, inclusive).
+
+    Pages without any text are returned with ``has_text=False`` so the caller
+    can run its fallback extractor on them. ``progress``, if given, is called
+    with the number of pages done after each page.
+    """
+    results = []
+    for page_num in range(first_page, last_page + 1):
+        results.append(extract_page(documents, page_num))
+        if progress is not None:
+            progress(len(results))
+    return results
+
+
+def extract_page(documents, page_num):
+    with telemetry.span('extract_page', page=page_num) as page_span:
+        result = _read_page(documents, page_num)
+        page_span.add(transactions=len(result['transactions']))
+    return result
+
+
+def _read_page(documents, page_num):
+    try:
+        if extraction_mode() == 'words':
+            # Keep the parsed chars in case the page falls back to layout text
+            words = documents.plumber_page_words(page_num, keep_cache=True, x_tolerance=2, y_tolerance=2)
+            if not words:
+                documents.flush_plumber_page(page_num)
+                return _page_error(page_num, f"Page {page_num}: No text could be extracted", has_text=False)
+            with telemetry.span('parse_lines', page=page_num):
+                result = parse_page_words(page_num, words)
+            if result is not None:
+                documents.flush_plumber_page(page_num)
+                return result
+            logger.info(f"Page {page_num} has no usable table columns, reading layout text")
+
+        text = documents.plumber_page_text(
+            page_num,
+            x_tolerance=2,
+            y_tolerance=2,
+            layout=True,
+            keep_blank_chars=True
+        )
+        if not text or len(text.strip()) == 0:
+            return _page_error(page_num, f"Page {page_num}: No text could be extracted", has_text=False)
+        with telemetry.span('parse_lines', page=page_num):
+            return parse_page_text(page_num, text)
+    except Exception as e:
+        return _page_error(page_num, f"Page {page_num}: {str(e)}")
+
+
+def group_rows(words, tolerance=ROW_TOLERANCE):
+    """Cluster word boxes into rows, top to bottom, each row left to right"""
+    rows = []
+    row_top = None
+    for word in sorted(words, key=lambda word: word['top']):
+        if row_top is None or word['top'] - row_top > tolerance:
+            rows.append([])
+            row_top = word['top']
+        rows[-1].append(word)
+    return [sorted(row, key=lambda word: word['x0']) for row in rows]
+
+
+def find_columns(rows):
+    """``(header_row_index, [(column, left_edge), ...])`` of the table header, or None"""
+    labels = [label for _, label in COLUMNS]
+    for index, row in enumerate(rows):
+        starts = {}
+        for word in row:
+            if word['text'] in labels and word['text'] not in starts:
+                starts[word['text']] = word['x0']
+        if len(starts) == len(labels):
+            edges = [(column, starts[label]) for column, label in COLUMNS]
+            if all(left[1] < right[1] for left, right in zip(edges, edges[1:])):
+                return index, edges
+    return None
+
+
+def split_fields(row, edges):
+    """Text of each column in a row, assigning words by their left edge"""
+    fields = {column: [] for column, _ in edges}
+    for word in row:
+        column = edges[0][0]
+        for name, left in edges:
+            # A little slack for right-aligned cells that start before their header
+            if word['x0'] >= left - ROW_TOLERANCE:
+                column = name
+        fields[column].append(word['text'])
+    return {column: ' '.join(texts) for column, texts in fields.items()}
+
+
+def parse_amount(text):
+    """Rupee amount in a cell such as "INR 1,234.00" or "₹1,234", or None"""
+    match = PHONEPE.amount.search(text)
+    digits = match.group(1) if match else ''.join(c for c in text if c.isdigit() or c == '.')
+    try:
+        return float(digits.replace(',', ''))
+    except ValueError:
+        return None
+
+
+def parse_page_words(page_num, words):
+    """Parse a page's word boxes through the table header's columns.
+
+    Returns a result like parse_page_lines, or None when the page has no
+    header or some date rows under it don't fit the columns.
+    """
+    rows = group_rows(words)
+    header = find_columns(rows)
+    if header is None:
+        return None
+    header_index, edges = header
+
+    leading_lines = []
+    transactions = []
+    current_transaction = None
+    seen_date_row = False
+    # Rows that look like a transaction, and those that fit the columns
+    date_rows = fitted_rows = 0
+
+    for row in rows[header_index + 1:]:
+        fields = split_fields(row, edges)
+        if PHONEPE.date.match(' '.join(word['text'] for word in row)):
+            date_rows += 1
+
+        date_match = PHONEPE.date.fullmatch(fields['date'])
+        if date_match:
+            seen_date_row = True
+            current_transaction = None
+            amount = parse_amount(fields['amount'])
+            txn_type = fields['type'].strip().upper()
+            if amount is None or txn_type not in ('CREDIT', 'DEBIT'):
+                continue
+            fitted_rows += 1
+            if amount == 0:  # Skip zero amount transactions
+                continue
+            current_transaction = {
+                'date': datetime.strptime(' '.join(date_match.group(0).split()), '%b %d, %Y'),
+                'amount': -amount if txn_type == 'DEBIT' else amount,
+                'type': txn_type,
+                'details': fields['details'] or 'Unknown Transaction',
+                'transaction_id': None,
+            }
+            transactions.append(current_transaction)
+        elif not seen_date_row:
+            leading_lines.append(fields['details'])
+        elif current_transaction:
+            attach_continuation(current_transaction, fields['details'])
+
+    if fitted_rows < date_rows:
+        return None
+
+    return {
+        'page_num': page_num,
+        'has_text': True,
+        'line_count': len(rows),
+        'leading_lines': leading_lines,
+        'transactions': transactions,
+        'errors': [],
+    }
+
+
+def _page_ranges(page_count, chunk_count, first_page=1):
+    """Split ``page_count`` pages from ``first_page`` into ``chunk_count`` contiguous ranges"""
+    chunk_size, remainder = divmod(page_count, chunk_count)
+    ranges = []
+    start = first_page
+    for i in range(chunk_count):
+        stop = start + chunk_size + (1 if i < remainder else 0) - 1
+        if stop >= start:
+            ranges.append((start, stop))
+        start = stop + 1
+    return ranges
+
+
+def _get_pool(workers):
+    """Return the shared worker pool, recreating it if the size changed"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn rather than fork: the Streamlit server is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool():
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+        _pool_workers = 0
+
+
+def run_in_pool(fn, *args, max_workers=None):
+    """``fn(*args)`` in the shared worker pool, or inline if the pool has broken.
+
+    ``fn`` and its arguments must be picklable; this blocks until it returns.
+    """
+    try:
+        return _get_pool(resolve_worker_count(max_workers)).submit(fn, *args).result()
+    except (BrokenProcessPool, OSError) as e:
+        logger.error(f"Worker pool failed, running {fn.__name__} inline: {str(e)}")
+        _reset_pool()
+        return fn(*args)
+
+
+def extract_pages(documents, max_workers=None, progress=None, page_range=None):
+    """Extract and parse every page, spreading page ranges over a process pool.
+
+    ``documents`` is the upload's PdfDocuments; it is used directly when the
+    statement is parsed inline, and its timings collect the workers' time.
+    ``progress(pages_done, page_count)`` is called as pages finish.
+    ``page_range`` limits extraction to ``(first_page, last_page)``, inclusive.
+    Returns one result dict per page, in page order.
+    """
+    first_page, last_page = page_range or (1, documents.page_count)
+    page_count = last_page - first_page + 1
+    report = None
+    if progress is not None:
+        report = lambda pages_done: progress(pages_done, page_count)
+
+    workers = min(resolve_worker_count(max_workers), page_count)
+    if workers <= 1 or page_count < MIN_PAGES_FOR_POOL:
+        return _extract_with(documents, first_page, last_page, report)
+
+    # Two ranges per worker keeps the pool busy when some pages are slower
+    ranges = _page_ranges(page_count, min(page_count, workers * 2), first_page)
+    try:
+        pool = _get_pool(workers)
+        futures = [
+            pool.submit(extract_page_range, documents.pdf_bytes, first, last)
+            for first, last in ranges
+        ]
+        results = []
+        for future in as_completed(futures):
+            chunk_results, worker_timings, worker_spans = future.result()
+            results.extend(chunk_results)
+            documents.timings.merge(worker_timings)
+            telemetry.merge(worker_spans)
+            if report is not None:
+                report(len(results))
+    except (BrokenProcessPool, OSError) as e:
+        logger.error(f"Page worker pool failed, extracting inline: {str(e)}")
+        _reset_pool()
+        return _extract_with(documents, first_page, last_page, report)
+
+    return sorted(results, key=lambda result: result['page_num'])
+
+
+def merge_page_results(page_results):
+    """Merge per-page results in page order into one transaction list.
+
+    A transaction whose date line ends a page carries on at the top of the next
+    page; those leading lines are folded back into it here.
+    """
+    all_transactions = []
+    parsing_errors = []
+
+    for result in page_results:
+        parsing_errors.extend(result['errors'])
+        if not result['has_text']:
+            continue
+
+        logger.info(f"Processing page {result['page_num']} with {result['line_count']} lines")
+        if all_transactions:
+            for line in result['leading_lines']:
+                attach_continuation(all_transactions[-1], line)
+        all_transactions.extend(result['transactions'])
+
+    return all_transactions, parsing_errors
@@ -0,0 +1,190 @@
+"""Content-addressed cache of parsed statements.
+
+Streamlit reruns the whole script on every widget interaction, so the same
+upload is parsed over and over. Results are keyed by the SHA-256 of the
+uploaded bytes plus the parser version and kept in an in-memory LRU. An
+on-disk Parquet tier, off unless ``STATEMENT_CACHE_DIR`` is set, lets
+results survive restarts and is evicted oldest-first once it grows past
+``STATEMENT_CACHE_MAX_MB``; it needs pyarrow, which requirements.txt pins. Artifacts derived from a parse, such as the
+dashboards' aggregate cube, are memoised next to it in memory.
+
+Cached frames and artifacts are shared by every rerun and session that
+uploads the same file, so callers must treat them as read-only.
+"""
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 16
+DEFAULT_MAX_DISK_MB = 256
+
+
+def content_key(data, version):
+    """Cache key for ``data`` (bytes) parsed by parser ``version``"""
+    digest = hashlib.sha256(data).hexdigest()
+    safe_version = ''.join(c if c.isalnum() or c in '.-_' else '_' for c in str(version))
+    return f"{digest}-{safe_version}"
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class ParseCache:
+    """Two-tier (memory LRU + optional Parquet directory) DataFrame cache"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, disk_dir=None, max_disk_bytes=DEFAULT_MAX_DISK_MB * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = None
+        self._entries = OrderedDict()
+        # Artifacts derived from a cached parse, dropped together with it
+        self._derived = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if disk_dir:
+            if _parquet_available():
+                self.disk_dir = Path(disk_dir)
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+            else:
+                logger.warning(f"pyarrow is not installed, ignoring STATEMENT_CACHE_DIR={disk_dir}; parses are cached in memory only")
+
+    def get(self, key):
+        """Return a copy of the cached DataFrame for ``key``, or None"""
+        with self._lock:
+            df = self._entries.get(key)
+            if df is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return df.copy()
+
+        df = self._read_disk(key)
+        with self._lock:
+            if df is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, df)
+        return df.copy()
+
+    def put(self, key, df):
+        """Store ``df`` under ``key`` in memory and, if enabled, on disk"""
+        df = df.copy()
+        with self._lock:
+            self._derived.pop(key, None)
+            self._remember(key, df)
+        self._write_disk(key, df)
+
+    def __contains__(self, key):
+        """Whether ``key`` is cached in memory"""
+        with self._lock:
+            return key in self._entries
+
+    def derived(self, key, name, build):
+        """Memoise ``build()`` as artifact ``name`` of the parse cached under ``key``.
+
+        Artifacts are kept in memory only, for as long as the parse itself is;
+        when ``key`` isn't cached ``build()`` is simply called.
+        """
+        with self._lock:
+            artifacts = self._derived.get(key)
+            if artifacts is not None and name in artifacts:
+                return artifacts[name]
+
+        value = build()
+        with self._lock:
+            if key in self._entries:
+                self._derived.setdefault(key, {})[name] = value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._derived.clear()
+
+    def _remember(self, key, df):
+        self._entries[key] = df
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._derived.pop(evicted, None)
+
+    def _disk_path(self, key):
+        return self.disk_dir / f"{key}.parquet"
+
+    def _read_disk(self, key):
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            df = pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Unreadable parse cache entry {path.name}: {str(e)}")
+            path.unlink(missing_ok=True)
+            return None
+        # Touch the file so eviction treats it as recently used
+        os.utime(path)
+        return df
+
+    def _write_disk(self, key, df):
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Could not write parse cache entry {path.name}: {str(e)}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Drop least recently used Parquet files until under the size budget"""
+        files = []
+        for path in self.disk_dir.glob('*.parquet'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache():
+    """Process-wide parse cache configured from the environment"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ParseCache(
+                max_entries=int(os.environ.get('STATEMENT_CACHE_ENTRIES', DEFAULT_MAX_ENTRIES)),
+                disk_dir=os.environ.get('STATEMENT_CACHE_DIR') or None,
+                max_disk_bytes=int(float(os.environ.get('STATEMENT_CACHE_MAX_MB', DEFAULT_MAX_DISK_MB)) * 1024 * 1024),
+            )
+        return _cache
@@ -0,0 +1,191 @@
+"""Background statement parsing with per-page progress.
+
+Uploads are parsed on a small in-process thread pool instead of inside the
+Streamlit script run. A job's id is derived from the upload's content and
+section, so a rerun (or another session uploading the same file to the same
+section) re-attaches to the running job instead of starting a new parse, and
+finished parses are served from the parse cache.
+
+Page extraction inside a job still uses page_extractor's process pool; the
+job thread only coordinates it, so no external broker is involved. Batch
+uploads (see batch_ingest) run on their own thread pool, sized like the
+process pool, and hand whole Paytm and SuperMoney files to the process pool,
+so a batch scales with cores and doesn't hold the workers single uploads use.
+"""
+import io
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import streamlit as st
+
+import page_extractor
+from statement_parser import StatementParser
+from transaction_schema import empty_transactions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_WORKERS = 2
+# Finished jobs kept for re-attaching reruns; older ones are served by the parse cache
+MAX_FINISHED_JOBS = 4
+# How often the page refreshes the progress bar while a job runs
+POLL_SECONDS = 0.25
+
+
+class ParseJob:
+    """One upload being parsed in the background"""
+
+    def __init__(self, job_id, parser):
+        self.id = job_id
+        self.parser = parser
+        self.filename = parser.filename
+        self.pages_done = 0
+        self.page_count = None
+        self.started = time.monotonic()
+        self.finished = None
+        self.future = None
+
+        # Messages the parser would have shown, replayed by the page
+        parser.messages = []
+        parser.progress = self._on_progress
+
+    def _on_progress(self, pages_done, page_count):
+        self.pages_done = pages_done
+        self.page_count = page_count
+
+    @property
+    def messages(self):
+        return self.parser.messages
+
+    @property
+    def fraction(self):
+        """Share of pages extracted so far, 0.0 until the page count is known"""
+        if not self.page_count:
+            return 0.0
+        return min(self.pages_done / self.page_count, 1.0)
+
+    def status(self):
+        if self.done():
+            return f"Parsed {self.filename}"
+        if self.page_count:
+            return f"Reading page {self.pages_done} of {self.page_count}..."
+        return "Opening statement..."
+
+    def done(self):
+        return self.future.done()
+
+    def wait(self, timeout=None):
+        """Block up to ``timeout`` seconds; True once the job has finished"""
+        done, _ = wait([self.future], timeout=timeout)
+        return bool(done)
+
+    def result(self):
+        """The parsed DataFrame; raises whatever the parse raised"""
+        return self.future.result()
+
+    def _run(self):
+        try:
+            return self.parser.parse()
+        finally:
+            self.finished = time.monotonic()
+            logger.info(f"Parse job {self.id[:12]} for {self.filename} took {self.finished - self.started:.2f}s")
+
+
+_executor = None
+_batch_executor = None
+_jobs = OrderedDict()
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        workers = int(os.environ.get('STATEMENT_PARSE_JOBS', DEFAULT_JOB_WORKERS))
+        _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='parse-job')
+    return _executor
+
+
+def _get_batch_executor():
+    # Batch job threads mostly wait on worker processes, one per core
+    global _batch_executor
+    if _batch_executor is None:
+        _batch_executor = ThreadPoolExecutor(
+            max_workers=page_extractor.resolve_worker_count(), thread_name_prefix='parse-batch',
+        )
+    return _batch_executor
+
+
+def _job_id(parser, selected_platform):
+    # Wrong-section uploads parse differently, so the section is part of the id
+    section = ''.join(c if c.isalnum() else '_' for c in selected_platform.lower())
+    if parser.page_range is not None:
+        section += f"-pages{parser.page_range[0]}-{parser.page_range[1]}"
+    return parser.upload_key(f"job-{section}")
+
+
+def submit(uploaded_file, selected_platform, max_workers=None, page_range=None, batch=False):
+    """Start parsing ``uploaded_file`` or re-attach to the job already parsing it.
+
+    ``batch`` jobs run on the batch pool and parse whole files in worker processes.
+    """
+    # Give the worker thread its own file object; the upload is re-read on reruns
+    file_obj = io.BytesIO(uploaded_file.getvalue())
+    file_obj.name = uploaded_file.name
+    parser = StatementParser(
+        file_obj, max_workers=max_workers, selected_platform=selected_platform, page_range=page_range,
+    )
+    job_id = _job_id(parser, selected_platform)
+
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is not None and not (job.done() and job.future.exception() is not None):
+            _jobs.move_to_end(job_id)
+            return job
+
+        job = ParseJob(job_id, parser)
+        parser.in_process = batch
+        job.future = (_get_batch_executor() if batch else _get_executor()).submit(job._run)
+        _jobs[job_id] = job
+        _forget_finished()
+    return job
+
+
+def _forget_finished():
+    finished = [job_id for job_id, job in _jobs.items() if job.done()]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job_id]
+
+
+def parse_upload(uploaded_file, progress_text="Reading your statement...", page_range=None):
+    """Parse an upload in the background while showing its progress.
+
+    Returns ``(parser, df)`` once the job has finished. While it runs the page
+    shows a progress bar; any widget interaction reruns the script, which
+    re-attaches to the same job (its id comes from the upload's content)
+    rather than restarting the parse. The script thread idles in
+    ``job.wait`` between redraws, since Streamlit can only update the page
+    from the script run. ``page_range`` limits the parse to
+    ``(first_page, last_page)``.
+    """
+    selected_platform = st.session_state.get('selected_platform', '')
+    job = submit(uploaded_file, selected_platform, page_range=page_range)
+
+    if not job.done():
+        progress_bar = st.progress(job.fraction, text=progress_text)
+        while not job.wait(POLL_SECONDS):
+            progress_bar.progress(job.fraction, text=job.status())
+        progress_bar.empty()
+
+    for kind, message in job.messages:
+        getattr(st, kind)(message)
+
+    try:
+        df = job.result()
+    except Exception as e:
+        logger.error(f"Parse job for {job.filename} failed: {str(e)}")
+        st.error(f"Error processing the statement: {str(e)}")
+        df = empty_transactions()
+    return job.parser, df
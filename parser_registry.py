@@ -0,0 +1,98 @@
+"""Statement parsers, chosen by sniffing the first page of an upload.
+
+Each platform registers a cheap ``sniff(first_page_text)`` probe, normally
+its format's header pattern from formats.py, and a ``parse(statement_parser)``
+function returning the raw DataFrame. ``detect`` reads only page one of an
+upload and runs the probes in registration order, so an upload is routed to
+the right parser, or rejected as the wrong statement type, before any full
+parse. Detections are memoised per upload so reruns don't reopen the PDF.
+
+Adding a platform is a ``register_format`` in formats.py plus a
+``register_parser`` next to its parse function.
+"""
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+
+from pdf_documents import PdfDocuments
+
+logger = logging.getLogger(__name__)
+
+# Detections remembered per upload key
+MAX_DETECTIONS = 256
+
+RegisteredParser = namedtuple('RegisteredParser', ['name', 'platform', 'sniff', 'parse'])
+
+PARSERS = OrderedDict()
+
+
+def register_parser(name, platform, sniff, parse):
+    """Register ``parse`` for statements whose first page satisfies ``sniff``.
+
+    ``platform`` is the analyzer section the statement belongs to, as shown
+    in the platform selector. Probes run in registration order, so generic
+    probes should be registered after specific ones.
+    """
+    PARSERS[name] = RegisteredParser(name, platform, sniff, parse)
+    return PARSERS[name]
+
+
+def get_parser(name):
+    return PARSERS[name]
+
+
+def parser_for_platform(platform):
+    """The parser registered for an analyzer section, or None"""
+    platform = (platform or '').lower()
+    for parser in PARSERS.values():
+        if parser.platform.lower() == platform:
+            return parser
+    return None
+
+
+def sniff(first_page_text):
+    """The first registered parser whose probe matches, or None"""
+    # Extractors split header cells differently, so compare on single spaces
+    text = ' '.join((first_page_text or '').split())
+    if not text:
+        return None
+    for parser in PARSERS.values():
+        if parser.sniff(text):
+            return parser
+    return None
+
+
+def read_first_page(pdf_bytes):
+    """Text of page one only, cheapest backend first"""
+    with PdfDocuments(pdf_bytes) as documents:
+        for extract in (documents.fitz_page_text, documents.pypdf_page_text, documents.plumber_page_text):
+            try:
+                text = extract(1) or ''
+            except Exception as e:
+                logger.info(f"First page extraction failed: {str(e)}")
+                continue
+            if text.strip():
+                return text
+    return ''
+
+
+_detections = OrderedDict()
+_lock = threading.Lock()
+
+
+def detect(key, pdf_bytes):
+    """Registered parser for the upload under ``key``, or None if no probe matches"""
+    with _lock:
+        if key in _detections:
+            _detections.move_to_end(key)
+            name = _detections[key]
+            return PARSERS.get(name) if name else None
+
+    parser = sniff(read_first_page(pdf_bytes))
+    logger.info(f"Detected statement format: {parser.name if parser else 'unknown'}")
+
+    with _lock:
+        _detections[key] = parser.name if parser else None
+        while len(_detections) > MAX_DETECTIONS:
+            _detections.popitem(last=False)
+    return parser
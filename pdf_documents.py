@@ -0,0 +1,223 @@
+"""Shared PDF backend handles for a single uploaded statement.
+
+Each backend library is imported the first time one of its handles is
+opened, so processes that never read a PDF (e.g. serving the login page)
+don't pay for loading pdfplumber, PyPDF2 or PyMuPDF.
+
+Raw page text comes from the backends in ``STATEMENT_TEXT_BACKENDS`` order,
+PyMuPDF first by default as it is an order of magnitude faster than
+pdfplumber. A quality check (see text_quality_check) decides per page
+whether a backend's text is usable; only pages that fail it are read again
+with the next backend.
+"""
+import io
+import os
+import time
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('pdfplumber', 'PyPDF2', 'fitz')
+DEFAULT_TEXT_BACKENDS = ('fitz', 'pdfplumber', 'PyPDF2')
+# Share of a page's lines that must be transaction lines for its text to pass
+DEFAULT_MIN_RECORD_RATE = 0.1
+# Pages with more replacement characters than this share fail the check
+MAX_GARBLED_RATE = 0.01
+
+
+def text_backend_order():
+    """Backends to read raw page text with, from ``STATEMENT_TEXT_BACKENDS``"""
+    names = [name.strip() for name in os.environ.get('STATEMENT_TEXT_BACKENDS', '').split(',') if name.strip()]
+    order = [name for name in names if name in BACKENDS]
+    if names and len(order) != len(names):
+        logger.info(f"Ignoring unknown text backends in {names}")
+    return tuple(order) or DEFAULT_TEXT_BACKENDS
+
+
+def text_quality_check(statement_format, min_rate=None):
+    """Check that page text keeps a format's transaction lines intact.
+
+    Passes when at least ``min_rate`` of the non-empty lines carry both the
+    format's date and amount, i.e. table rows weren't split into one line
+    per cell, and the text isn't garbled. Pages with no dated lines at all
+    (covers, summaries, terms) pass as they are, since no backend would
+    find transactions on them. ``min_rate`` defaults to
+    ``STATEMENT_TEXT_MIN_RECORD_RATE``.
+    """
+    if min_rate is None:
+        min_rate = float(os.environ.get('STATEMENT_TEXT_MIN_RECORD_RATE', DEFAULT_MIN_RECORD_RATE))
+
+    def check(text):
+        lines = [line for line in text.splitlines() if line.strip()]
+        if not lines or text.count('\ufffd') > len(text) * MAX_GARBLED_RATE:
+            return False
+        dated = [line for line in lines if statement_format.date.search(line)]
+        if not dated:
+            return True
+        records = sum(1 for line in dated if statement_format.amount.search(line))
+        return records / len(lines) >= min_rate
+
+    return check
+
+
+class BackendTimings:
+    """Accumulated wall time and call count per extraction backend"""
+
+    def __init__(self):
+        self.seconds = {backend: 0.0 for backend in BACKENDS}
+        self.calls = {backend: 0 for backend in BACKENDS}
+
+    @contextmanager
+    def measure(self, backend):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[backend] += time.perf_counter() - start
+            self.calls[backend] += 1
+
+    def merge(self, other):
+        """Add timings collected elsewhere (e.g. in a worker process)"""
+        for backend in BACKENDS:
+            self.seconds[backend] += other.seconds[backend]
+            self.calls[backend] += other.calls[backend]
+
+    def summary(self):
+        return {
+            backend: {'calls': self.calls[backend], 'seconds': round(self.seconds[backend], 4)}
+            for backend in BACKENDS
+            if self.calls[backend]
+        }
+
+
+class PdfDocuments:
+    """Open each backend at most once per upload and share it across pages.
+
+    Use as a context manager so every handle is released deterministically::
+
+        with PdfDocuments(pdf_bytes) as documents:
+            text = documents.fitz_page_text(3)
+    """
+
+    def __init__(self, pdf_bytes, timings=None):
+        self.pdf_bytes = pdf_bytes
+        self.timings = timings if timings is not None else BackendTimings()
+        self._plumber = None
+        self._pypdf = None
+        self._fitz = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def plumber(self):
+        if self._plumber is None:
+            import pdfplumber
+            with self.timings.measure('pdfplumber'):
+                self._plumber = pdfplumber.open(io.BytesIO(self.pdf_bytes))
+        return self._plumber
+
+    @property
+    def pypdf(self):
+        if self._pypdf is None:
+            import PyPDF2
+            with self.timings.measure('PyPDF2'):
+                self._pypdf = PyPDF2.PdfReader(io.BytesIO(self.pdf_bytes))
+        return self._pypdf
+
+    @property
+    def fitz(self):
+        if self._fitz is None:
+            import fitz  # PyMuPDF
+            with self.timings.measure('fitz'):
+                self._fitz = fitz.open(stream=self.pdf_bytes, filetype="pdf")
+        return self._fitz
+
+    @property
+    def page_count(self):
+        # PyMuPDF counts pages without parsing them; pdfplumber if it can't open the file
+        try:
+            return self.fitz.page_count
+        except Exception:
+            return len(self.plumber.pages)
+
+    def plumber_page_text(self, page_num, **kwargs):
+        """Text of a 1-based page via pdfplumber"""
+        page = self.plumber.pages[page_num - 1]
+        with self.timings.measure('pdfplumber'):
+            text = page.extract_text(**kwargs)
+        # Drop the page's cached chars so memory doesn't grow with page count
+        page.flush_cache()
+        return text
+
+    def plumber_page_words(self, page_num, keep_cache=False, **kwargs):
+        """Word boxes of a 1-based page via pdfplumber, see Page.extract_words.
+
+        With ``keep_cache`` the page's parsed chars are kept for a following
+        extraction from the same page; release them with flush_plumber_page.
+        """
+        page = self.plumber.pages[page_num - 1]
+        with self.timings.measure('pdfplumber'):
+            words = page.extract_words(**kwargs)
+        if not keep_cache:
+            page.flush_cache()
+        return words
+
+    def flush_plumber_page(self, page_num):
+        self.plumber.pages[page_num - 1].flush_cache()
+
+    def pypdf_page_text(self, page_num):
+        """Text of a 1-based page via PyPDF2"""
+        page = self.pypdf.pages[page_num - 1]
+        with self.timings.measure('PyPDF2'):
+            return page.extract_text()
+
+    def fitz_page_text(self, page_num, sort=False):
+        """Text of a 1-based page via PyMuPDF; ``sort`` joins table cells into rows"""
+        document = self.fitz
+        with self.timings.measure('fitz'):
+            return document.load_page(page_num - 1).get_text("text", sort=sort)
+
+    def page_text(self, page_num, check=None, backends=None, **plumber_kwargs):
+        """Text of a 1-based page from the first backend whose text passes ``check``.
+
+        ``backends`` defaults to text_backend_order(); ``plumber_kwargs`` go to
+        pdfplumber's extract_text. Without a check any non-empty text passes.
+        When no backend passes, the first non-empty text is returned.
+        """
+        extractors = {
+            # Plain PyMuPDF text is fastest; sorting rebuilds table rows split into cells
+            'fitz': [lambda: self.fitz_page_text(page_num), lambda: self.fitz_page_text(page_num, sort=True)],
+            'pdfplumber': [lambda: self.plumber_page_text(page_num, **plumber_kwargs)],
+            'PyPDF2': [lambda: self.pypdf_page_text(page_num)],
+        }
+        fallback = ''
+        for backend in backends or text_backend_order():
+            for extract in extractors[backend]:
+                try:
+                    text = extract() or ''
+                except Exception as e:
+                    logger.info(f"{backend} failed on page {page_num}: {str(e)}")
+                    break
+                if not text.strip():
+                    break
+                if check is None or check(text):
+                    return text
+                fallback = fallback or text
+                logger.info(f"Page {page_num} text from {backend} failed the quality check")
+        return fallback
+
+    def close(self):
+        """Release every backend that was opened"""
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+        if self._fitz is not None:
+            self._fitz.close()
+            self._fitz = None
+        # PyPDF2 keeps no OS resources beyond its in-memory stream
+        self._pypdf = None
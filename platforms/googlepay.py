@@ -1,7 +1,13 @@
 import streamlit as st
-from statement_parser import StatementParser
+from batch_ingest import parse_uploads
 import plotly.express as px
 import plotly.graph_objects as go
+from telemetry import show_debug_panel
+from figures import get_figure
+from time_rollups import get_rollups, zoom_selector, TREND_LABELS
+from recurring import get_recurring, show_recurring_payments
+from merchants import show_alias_editor
+from transaction_table import show_transaction_table
 
 def show_googlepay_page(username):
     st.markdown(f"""
@@ -27,35 +33,36 @@ def show_googlepay_page(username):
         </div>
     """, unsafe_allow_html=True)
 
-    uploaded_file = st.file_uploader(
+    uploaded_files = st.file_uploader(
         "Upload your Google Pay statement (PDF)", 
         type=["pdf"],
-        help="Your file is processed securely and never stored"
+        accept_multiple_files=True,
+        help="Your file is processed securely and never stored. Select several statements to analyze them as one timeline."
     )
 
-    if uploaded_file:
+    if uploaded_files:
         with st.spinner("Analyzing your statement..."):
-            parser = StatementParser(uploaded_file)
-            df = parser.parse()
+            parser, df = parse_uploads(uploaded_files)
+            cube = parser.spending_cube(df, username)
             
             # Calculate net flow
-            net_flow = df['amount'].sum()
+            net_flow = cube.total()
             
             # Show basic stats
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Total Credits", f"₹{df[df['amount'] > 0]['amount'].sum():,.2f}")
+                st.metric("Total Credits", f"₹{cube.total('credit'):,.2f}")
             with col2:
-                st.metric("Total Debits", f"₹{abs(df[df['amount'] < 0]['amount'].sum()):,.2f}")
+                st.metric("Total Debits", f"₹{abs(cube.total('debit')):,.2f}")
             with col3:
                 st.metric("Net Flow", f"₹{net_flow:,.2f}")
             
             # Show transactions
             st.subheader("📊 Transaction History")
-            st.dataframe(df)
+            show_transaction_table(df, parser.cache_key)
             
             # Add visualizations
-            line_fig, pie_fig = parser.generate_spending_chart(df)
+            line_fig, pie_fig = parser.generate_spending_chart(df, username=username)
 
             if line_fig is not None or pie_fig is not None:
                 st.subheader("📈 Spending Analysis")
@@ -76,7 +83,10 @@ def show_googlepay_page(username):
                 st.info("Spending analysis is not available for this statement.")
 
             # Show advanced insights
-            show_spending_insights(df)
+            show_spending_insights(
+                cube, get_rollups(df, parser.cache_key), get_recurring(df, parser.cache_key, username),
+                username, parser.cache_key,
+            )
             
             # Show smart recommendations
             st.markdown("""
@@ -87,13 +97,15 @@ def show_googlepay_page(username):
             
             # Show transaction patterns
             st.markdown("### 📈 Transaction Patterns")
-            show_transaction_patterns(df)
+            show_transaction_patterns(cube)
             
             # Show category analysis
             st.markdown("### 🎯 Category Analysis")
-            show_category_analysis(df)
+            show_category_analysis(cube)
 
-def show_spending_insights(df):
+            show_debug_panel(parser.telemetry)
+
+def show_spending_insights(cube, rollups, recurring, username, cache_key=None):
     """Show advanced spending insights"""
     st.markdown("""
         <h3 style='color: #FFFFFF; font-size: 1.3rem; margin-top: 2rem;'>
@@ -101,45 +113,36 @@ def show_spending_insights(df):
         </h3>
     """, unsafe_allow_html=True)
     
-    # Monthly trends
-    monthly_spending = df[df['amount'] < 0].groupby(
-        df['date'].dt.strftime('%B %Y')
-    )['amount'].sum().abs()
+    # Spending over time at the zoom level picked, oldest first
+    granularity = zoom_selector()
+    spending = rollups.rollup(granularity)['spent']
     
     # Category breakdown
-    category_spending = df[df['amount'] < 0].groupby('category')['amount'].agg(['sum', 'count'])
+    category_spending = cube.rollup('category', 'debit')[['sum', 'count']]
     
-    # Top merchants
-    top_merchants = df[df['amount'] < 0].groupby('description')['amount'].sum().nlargest(5)
+    # Top merchants, largest spend first
+    top_merchants = cube.rollup('merchant', 'debit')['sum'].nsmallest(5)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        # Monthly trend chart
-        fig = go.Figure()
-        fig.add_trace(go.Line(
-            x=monthly_spending.index,
-            y=monthly_spending.values,
-            mode='lines+markers',
-            name='Monthly Spending'
+        # Spending trend chart
+        st.plotly_chart(get_figure(
+            cache_key, 'spending-trend', lambda: spending_trend_figure(spending, granularity), granularity=granularity,
         ))
-        fig.update_layout(
-            title='Monthly Spending Trend',
-            xaxis_title='Month',
-            yaxis_title='Amount (₹)',
-            template='plotly_dark'
-        )
-        st.plotly_chart(fig)
         
     with col2:
         # Category distribution
-        fig = px.treemap(
-            category_spending.reset_index(),
-            path=['category'],
-            values='sum',
-            title='Spending by Category'
-        )
-        st.plotly_chart(fig)
+        st.plotly_chart(get_figure(cache_key, 'category-treemap', lambda: category_treemap_figure(category_spending)))
+    
+    if not top_merchants.empty:
+        st.markdown("#### 🏪 Top Merchants")
+        for merchant, amount in top_merchants.items():
+            st.info(f"💳 {merchant}: ₹{abs(amount):,.2f}")
+    
+    # Subscriptions and EMIs
+    show_recurring_payments(recurring)
+    show_alias_editor(username)
     
     # Spending recommendations
     st.markdown("""
@@ -148,18 +151,44 @@ def show_spending_insights(df):
         </h4>
     """, unsafe_allow_html=True)
     
-    recommendations = generate_recommendations(df)
+    recommendations = generate_recommendations(cube, recurring)
     for rec in recommendations:
         st.info(rec)
 
-def generate_recommendations(df):
+def spending_trend_figure(spending, granularity):
+    """Line chart of spending per day, week, month or quarter, one point per bucket"""
+    label = TREND_LABELS[granularity]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=spending.index,
+        y=spending.values,
+        mode='lines+markers',
+        name=f'{label} Spending'
+    ))
+    fig.update_layout(
+        title=f'{label} Spending Trend',
+        xaxis_title=granularity,
+        yaxis_title='Amount (₹)',
+        template='plotly_dark'
+    )
+    return fig
+
+def category_treemap_figure(category_spending):
+    """Treemap of spending per category"""
+    return px.treemap(
+        category_spending.reset_index(),
+        path=['category'],
+        values='sum',
+        title='Spending by Category'
+    )
+
+def generate_recommendations(cube, recurring):
     """Generate smart spending recommendations"""
     recommendations = []
     
     # Analyze spending patterns
-    monthly_spending = df[df['amount'] < 0]['amount'].sum() / df['date'].nunique() * 30
-    high_spend_categories = df[df['amount'] < 0].groupby('category')['amount'].sum().nlargest(3)
-    recurring_payments = df[df['amount'] < 0].groupby('description')['amount'].count()
+    monthly_spending = cube.total('debit') / max(cube.days, 1) * 30
+    high_spend_categories = cube.rollup('category', 'debit')['sum'].nsmallest(3)
     
     # Generate insights
     if monthly_spending > 50000:
@@ -168,17 +197,18 @@ def generate_recommendations(df):
     for cat, amount in high_spend_categories.items():
         recommendations.append(f"📊 {cat} is your top spending category (₹{abs(amount):,.2f}). Look for ways to optimize these expenses.")
     
-    if len(recurring_payments[recurring_payments > 2]) > 0:
-        recommendations.append("🔄 You have several recurring payments. Review your subscriptions and memberships.")
+    if len(recurring) > 0:
+        recommendations.append(f"🔄 You have {len(recurring)} recurring payments costing about "
+                               f"₹{recurring['monthly_cost'].sum():,.0f} a month. Review your subscriptions and memberships.")
     
     return recommendations
 
-def show_transaction_patterns(df):
+def show_transaction_patterns(cube):
     """Show transaction patterns"""
     st.markdown("### 📈 Transaction Patterns")
     # Implementation of show_transaction_patterns function
 
-def show_category_analysis(df):
+def show_category_analysis(cube):
     """Show category analysis"""
     st.markdown("### 🎯 Category Analysis")
     # Implementation of show_category_analysis function 
\ No newline at end of file
@@ -1,9 +1,16 @@
 import streamlit as st
-from statement_parser import StatementParser
-import time
+from batch_ingest import parse_uploads
+from ledger import show_ledger_toggle, has_transactions, update_ledger
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
+from aggregates import LARGE_BANDS
+from notices import timed_notice
+from telemetry import show_debug_panel
+from figures import get_figure
+from time_rollups import get_rollups, zoom_selector, TREND_LABELS
+from recurring import get_recurring, show_recurring_payments
+from merchants import show_alias_editor
+from transaction_table import show_transaction_table
 
 def show_phonepe_page(username):
     # Add mobile-friendly CSS
@@ -81,16 +88,22 @@ def show_phonepe_page(username):
         </div>
     """, unsafe_allow_html=True)
 
-    uploaded_file = st.file_uploader(
+    uploaded_files = st.file_uploader(
         "Upload your PhonePe statement (PDF)", 
         type=["pdf"],
-        help="Your file is processed securely and never stored"
+        accept_multiple_files=True,
+        help="Your file is processed securely and never stored. Select several statements to analyze them as one timeline."
     )
 
-    if uploaded_file:
+    keep_ledger = show_ledger_toggle(username)
+
+    if uploaded_files or (keep_ledger and has_transactions(username, 'PhonePe')):
         with st.spinner("Analyzing your statement..."):
-            parser = StatementParser(uploaded_file)
-            df = parser.parse()
+            if keep_ledger:
+                parser, df = update_ledger(uploaded_files or [], username, 'PhonePe')
+            else:
+                parser, df = parse_uploads(uploaded_files)
+            cube = parser.spending_cube(df, username)
             
             # Make metrics stack vertically on mobile
             st.markdown("""
@@ -98,9 +111,9 @@ def show_phonepe_page(username):
             """, unsafe_allow_html=True)
             
             # Show basic stats in full width on mobile
-            st.metric("Total Credits", f"₹{df[df['amount'] > 0]['amount'].sum():,.2f}")
-            st.metric("Total Debits", f"₹{abs(df[df['amount'] < 0]['amount'].sum()):,.2f}")
-            st.metric("Net Flow", f"₹{df['amount'].sum():,.2f}")
+            st.metric("Total Credits", f"₹{cube.total('credit'):,.2f}")
+            st.metric("Total Debits", f"₹{abs(cube.total('debit')):,.2f}")
+            st.metric("Net Flow", f"₹{cube.total():,.2f}")
             
             st.markdown("</div>", unsafe_allow_html=True)
             
@@ -109,52 +122,44 @@ def show_phonepe_page(username):
             st.markdown("""
                 <div style='overflow-x: auto;'>
             """, unsafe_allow_html=True)
-            st.dataframe(df)
+            show_transaction_table(df, parser.cache_key)
             st.markdown("</div>", unsafe_allow_html=True)
             
             # Make charts full width on mobile
-            line_fig, pie_fig = parser.generate_spending_chart(df)
+            line_fig, pie_fig = parser.generate_spending_chart(df, username=username)
             if line_fig is not None:
                 st.plotly_chart(line_fig, use_container_width=True)
             if pie_fig is not None:
                 st.plotly_chart(pie_fig, use_container_width=True)
             
-            # Show warning if net flow is negative
-            if df['amount'].sum() < 0:
-                # Create a placeholder for the warning
-                warning_placeholder = st.empty()
-                
-                # Show the warning message
-                warning_placeholder.markdown(
+            # Show warning if net flow is negative; the browser dismisses it after 3 seconds
+            if cube.total() < 0:
+                timed_notice(
                     f"""
-                    <div style="
+                    <h2 style="color: #d32f2f; margin:0;">⚠️ Warning: Net Loss Detected</h2>
+                    <p style="color: #d32f2f; font-size: 16px; margin:10px 0;">
+                        Your spending exceeds your income by <strong>₹{abs(cube.total()):,.2f}</strong>
+                    </p>
+                    <p style="color: #d32f2f; font-size: 14px; margin:0;">
+                        Consider reviewing your expenses to maintain a healthy financial balance.
+                    </p>
+                    """,
+                    seconds=3,
+                    style="""
                         background-color: #ffebee;
                         padding: 20px;
                         border-radius: 10px;
                         border-left: 5px solid #f44336;
                         margin: 10px 0px;
                         width: 50%;
-                    ">
-                        <h2 style="color: #d32f2f; margin:0;">⚠️ Warning: Net Loss Detected</h2>
-                        <p style="color: #d32f2f; font-size: 16px; margin:10px 0;">
-                            Your spending exceeds your income by <strong>₹{abs(df['amount'].sum()):,.2f}</strong>
-                        </p>
-                        <p style="color: #d32f2f; font-size: 14px; margin:0;">
-                            Consider reviewing your expenses to maintain a healthy financial balance.
-                        </p>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
+                    """
                 )
-                
-                # Wait for 3 seconds
-                time.sleep(3)
-                
-                # Clear the warning
-                warning_placeholder.empty()
             
             # Show advanced insights
-            show_spending_insights(df)
+            show_spending_insights(
+                cube, get_rollups(df, parser.cache_key), get_recurring(df, parser.cache_key, username),
+                username, parser.cache_key,
+            )
             
             # Show smart recommendations
             st.markdown("""
@@ -164,12 +169,14 @@ def show_phonepe_page(username):
             """, unsafe_allow_html=True)
             
             # Show transaction patterns
-            show_transaction_patterns(df)
+            show_transaction_patterns(cube, parser.cache_key)
             
             # Show category analysis
-            show_category_analysis(df)
+            show_category_analysis(cube)
 
-def show_spending_insights(df):
+            show_debug_panel(parser.telemetry)
+
+def show_spending_insights(cube, rollups, recurring, username, cache_key=None):
     """Show advanced spending insights with mobile-friendly layout"""
     st.markdown("""
         <h3 style='color: #FFFFFF; font-size: 1.3rem; margin-top: 2rem;'>
@@ -177,103 +184,115 @@ def show_spending_insights(df):
         </h3>
     """, unsafe_allow_html=True)
     
-    # Check if DataFrame is empty or has no valid transactions
-    if df.empty or 'amount' not in df.columns or 'date' not in df.columns:
+    # Check if the statement has any valid transactions
+    if len(cube) == 0:
         st.info("Please upload a valid statement to view spending insights.")
         return
     
-    # Get spending transactions
-    spending_df = df[df['amount'] < 0].copy()
-    
-    if spending_df.empty:
+    if cube.count('debit') == 0:
         st.info("No spending transactions found in the uploaded statement.")
         return
     
     try:
-        # Monthly trends
-        monthly_spending = spending_df.groupby(
-            spending_df['date'].dt.strftime('%B %Y')
-        )['amount'].sum().abs()
+        # Spending over time at the zoom level picked, oldest first
+        granularity = zoom_selector()
+        spending = rollups.rollup(granularity)['spent']
         
-        if not monthly_spending.empty:
+        if not spending.empty:
             # Category breakdown
-            category_spending = spending_df.groupby('category')['amount'].agg(['sum', 'count'])
+            category_spending = cube.rollup('category', 'debit')[['sum', 'count']]
             
             # Make charts full width on mobile
             with st.container():
-                # Monthly trend chart
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=monthly_spending.index,
-                    y=monthly_spending.values,
-                    mode='lines+markers',
-                    name='Monthly Spending',
-                    line=dict(
-                        width=2,
-                        color='rgb(50, 171, 96)'
-                    )
-                ))
-                fig.update_layout(
-                    title='Monthly Spending Trend',
-                    xaxis_title='Month',
-                    yaxis_title='Amount (₹)',
-                    template='plotly_dark',
-                    height=300,  # Smaller height for mobile
-                    margin=dict(l=10, r=10, t=30, b=10)  # Tighter margins
+                # Spending trend chart
+                fig = get_figure(
+                    cache_key, 'phonepe-spending-trend', lambda: spending_trend_figure(spending, granularity),
+                    granularity=granularity,
                 )
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Category distribution
                 if not category_spending.empty:
-                    fig = px.treemap(
-                        category_spending.reset_index(),
-                        path=['category'],
-                        values='sum',
-                        title='Spending by Category'
-                    )
-                    fig.update_layout(height=300)  # Smaller height for mobile
+                    fig = get_figure(cache_key, 'phonepe-category-treemap', lambda: category_treemap_figure(category_spending))
                     st.plotly_chart(fig, use_container_width=True)
             
-            # Show merchant analysis only if description column exists and has data
-            if 'description' in df.columns and not spending_df.empty:
-                top_merchants = spending_df.groupby('description')['amount'].sum().nlargest(5)
-                
-                if not top_merchants.empty:
-                    st.markdown("#### 🏪 Top Merchants")
-                    for merchant, amount in top_merchants.items():
-                        st.info(f"💳 {merchant}: ₹{abs(amount):,.2f}")
-        
-        # Generate recommendations only if we have spending data
-        if not spending_df.empty:
-            st.markdown("""
-                <h4 style='color: #FFFFFF; font-size: 1.1rem;'>
-                    🎯 Personalized Recommendations
-                </h4>
-            """, unsafe_allow_html=True)
+            # Merchant analysis, largest spend first
+            top_merchants = cube.rollup('merchant', 'debit')['sum'].nsmallest(5)
             
-            recommendations = generate_recommendations(spending_df)
-            for rec in recommendations:
-                st.info(rec)
+            if not top_merchants.empty:
+                st.markdown("#### 🏪 Top Merchants")
+                for merchant, amount in top_merchants.items():
+                    st.info(f"💳 {merchant}: ₹{abs(amount):,.2f}")
+            
+            # Subscriptions and EMIs
+            show_recurring_payments(recurring)
+            show_alias_editor(username)
+        
+        # Generate recommendations from the spending transactions
+        st.markdown("""
+            <h4 style='color: #FFFFFF; font-size: 1.1rem;'>
+                🎯 Personalized Recommendations
+            </h4>
+        """, unsafe_allow_html=True)
+        
+        recommendations = generate_recommendations(cube)
+        for rec in recommendations:
+            st.info(rec)
                 
     except Exception as e:
         st.info("Processing your transaction data. Please ensure the statement format is correct.")
 
-def generate_recommendations(df):
-    """Generate smart spending recommendations"""
+def spending_trend_figure(spending, granularity):
+    """Line chart of spending per day, week, month or quarter, one point per bucket"""
+    label = TREND_LABELS[granularity]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=spending.index,
+        y=spending.values,
+        mode='lines+markers',
+        name=f'{label} Spending',
+        line=dict(
+            width=2,
+            color='rgb(50, 171, 96)'
+        )
+    ))
+    fig.update_layout(
+        title=f'{label} Spending Trend',
+        xaxis_title=granularity,
+        yaxis_title='Amount (₹)',
+        template='plotly_dark',
+        height=300,  # Smaller height for mobile
+        margin=dict(l=10, r=10, t=30, b=10)  # Tighter margins
+    )
+    return fig
+
+def category_treemap_figure(category_spending):
+    """Treemap of spending per category"""
+    fig = px.treemap(
+        category_spending.reset_index(),
+        path=['category'],
+        values='sum',
+        title='Spending by Category'
+    )
+    fig.update_layout(height=300)  # Smaller height for mobile
+    return fig
+
+def generate_recommendations(cube):
+    """Generate smart spending recommendations from the spending transactions"""
     recommendations = []
     
     try:
         # Monthly spending analysis
-        monthly_spending = df['amount'].sum() / df['date'].nunique() * 30
+        monthly_spending = cube.total('debit') / max(cube.debit_days, 1) * 30
         
         # Category analysis
-        high_spend_categories = df.groupby('category')['amount'].sum().nlargest(3)
+        high_spend_categories = cube.rollup('category', 'debit')['sum'].nsmallest(3)
         
         # Transaction size analysis
-        large_transactions = df[df['amount'].abs() > 5000]
+        large_transactions = cube.count_in_bands(LARGE_BANDS, 'debit')
         
         # Time-based analysis
-        daily_spending = df.groupby(df['date'].dt.day_name())['amount'].sum()
+        daily_spending = cube.rollup('weekday', 'debit')['sum']
         
         # Generate insights
         if monthly_spending > 50000:
@@ -283,25 +302,25 @@ def generate_recommendations(df):
             top_category = high_spend_categories.index[0]
             recommendations.append(f"📊 {top_category} is your top spending category (₹{abs(high_spend_categories.iloc[0]):,.2f}). Look for ways to optimize these expenses.")
         
-        if len(large_transactions) > 0:
-            recommendations.append(f"⚠️ You have {len(large_transactions)} large transactions (>₹5,000). Review these for potential savings.")
+        if large_transactions > 0:
+            recommendations.append(f"⚠️ You have {large_transactions} large transactions (>₹5,000). Review these for potential savings.")
         
         if len(daily_spending) > 0:
             highest_spending_day = daily_spending.abs().idxmax()
             recommendations.append(f"📅 {highest_spending_day} shows highest spending. Plan your transactions on lower-spend days.")
         
         # Average transaction size
-        avg_transaction = df['amount'].mean()
+        avg_transaction = cube.mean('debit')
         if abs(avg_transaction) > 2000:
             recommendations.append(f"💳 Your average transaction size (₹{abs(avg_transaction):,.2f}) is high. Consider breaking down large purchases.")
         
         # Spending trend
-        recent_spending = df.sort_values('date').tail(10)['amount'].sum()
+        recent_spending = cube.recent_spend
         if abs(recent_spending) > monthly_spending/3:
             recommendations.append("📈 Your recent spending has increased. Monitor your expenses closely.")
         
         # Balance recommendation
-        if df['amount'].sum() < 0:
+        if cube.total('debit') < 0:
             recommendations.append("🏦 Your account shows a net outflow. Consider ways to increase savings.")
             
     except Exception as e:
@@ -309,63 +328,34 @@ def generate_recommendations(df):
     
     return recommendations
 
-def show_transaction_patterns(df):
+def show_transaction_patterns(cube, cache_key=None):
     """Show transaction patterns with mobile-friendly layout"""
     st.markdown("### 📈 Transaction Patterns")
     
-    if 'amount' not in df.columns or 'date' not in df.columns:
+    if len(cube) == 0:
         st.info("We need more transaction data to analyze patterns. Please ensure your statement includes complete details.")
         return
         
     try:
         # Daily transaction patterns
-        daily_stats = df.groupby(df['date'].dt.day_name()).agg({
-            'amount': ['count', 'mean']
-        }).round(2)
+        daily_stats = cube.rollup('weekday')[['count', 'mean']].round(2)
         daily_stats.columns = ['Number of Transactions', 'Average Amount']
         
         # Time-based insights
         st.markdown("#### 📅 Day-wise Transaction Patterns")
         
         # Create a bar chart for daily patterns
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=daily_stats.index,
-            y=daily_stats['Number of Transactions'],
-            name='Number of Transactions',
-            marker_color='rgba(50, 171, 96, 0.7)'
-        ))
-        
-        fig.update_layout(
-            title='Transaction Frequency by Day of Week',
-            xaxis_title='Day of Week',
-            yaxis_title='Number of Transactions',
-            template='plotly_dark',
-            showlegend=False,
-            height=300,  # Smaller height for mobile
-            margin=dict(l=10, r=10, t=30, b=10)  # Tighter margins
-        )
+        fig = get_figure(cache_key, 'phonepe-weekday-frequency', lambda: weekday_frequency_figure(daily_stats))
         st.plotly_chart(fig, use_container_width=True)
 
         # Transaction size distribution
         st.markdown("#### 💰 Transaction Size Analysis")
         
-        # Create transaction size categories
-        df['transaction_size'] = pd.cut(
-            df['amount'].abs(),
-            bins=[0, 1000, 5000, 10000, float('inf')],
-            labels=['Small (≤₹1,000)', 'Medium (₹1,001-₹5,000)', 'Large (₹5,001-₹10,000)', 'Very Large (>₹10,000)']
-        )
-        
-        size_dist = df['transaction_size'].value_counts()
+        # Transactions per size band
+        size_dist = cube.rollup('size_band')['count'].sort_values(ascending=False, kind='stable')
         
         # Create pie chart for transaction sizes
-        fig = px.pie(
-            values=size_dist.values,
-            names=size_dist.index,
-            title='Transaction Size Distribution'
-        )
-        fig.update_layout(height=300)  # Smaller height for mobile
+        fig = get_figure(cache_key, 'phonepe-size-distribution', lambda: size_distribution_figure(size_dist))
         st.plotly_chart(fig, use_container_width=True)
 
         # Show key insights
@@ -388,19 +378,48 @@ def show_transaction_patterns(df):
     except Exception as e:
         st.info("We're analyzing your transaction patterns. Some visualizations might be temporarily unavailable.")
 
-def show_category_analysis(df):
+def weekday_frequency_figure(daily_stats):
+    """Bar chart of transactions per day of the week"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=daily_stats.index,
+        y=daily_stats['Number of Transactions'],
+        name='Number of Transactions',
+        marker_color='rgba(50, 171, 96, 0.7)'
+    ))
+    
+    fig.update_layout(
+        title='Transaction Frequency by Day of Week',
+        xaxis_title='Day of Week',
+        yaxis_title='Number of Transactions',
+        template='plotly_dark',
+        showlegend=False,
+        height=300,  # Smaller height for mobile
+        margin=dict(l=10, r=10, t=30, b=10)  # Tighter margins
+    )
+    return fig
+
+def size_distribution_figure(size_dist):
+    """Pie chart of transactions per size band"""
+    fig = px.pie(
+        values=size_dist.values,
+        names=size_dist.index,
+        title='Transaction Size Distribution'
+    )
+    fig.update_layout(height=300)  # Smaller height for mobile
+    return fig
+
+def show_category_analysis(cube):
     """Show category analysis with mobile-friendly layout"""
     st.markdown("### 🎯 Category Analysis")
     
-    if 'category' not in df.columns:
+    if len(cube) == 0:
         st.info("We need category information to show this analysis. Please ensure your statement includes transaction categories.")
         return
         
     try:
         # Category-wise spending
-        category_stats = df[df['amount'] < 0].groupby('category').agg({
-            'amount': ['sum', 'count', 'mean']
-        }).round(2)
+        category_stats = cube.rollup('category', 'debit')[['sum', 'count', 'mean']].round(2)
         
         category_stats.columns = ['Total Amount', 'Number of Transactions', 'Average Transaction']
         category_stats['Total Amount'] = category_stats['Total Amount'].abs()
@@ -1,10 +1,23 @@
+import importlib
 import streamlit as st
-from .phonepe import show_phonepe_page
-from .googlepay import show_googlepay_page
-from .paytm import show_paytm_page
-from .supermoney import show_supermoney_page
 from support import show_support_form
-import time
+from auth import logout_user
+from notices import flash
+
+# Platform pages pull in pandas, plotly and the PDF backends, so each one is
+# imported the first time its platform is opened rather than at startup
+PLATFORM_PAGES = {
+    'PhonePe': ('.phonepe', 'show_phonepe_page'),
+    'Paytm': ('.paytm', 'show_paytm_page'),
+    'SuperMoney': ('.supermoney', 'show_supermoney_page'),
+}
+
+def load_platform_page(platform_name):
+    """The page function for ``platform_name``, or None if it has no page yet"""
+    if platform_name not in PLATFORM_PAGES:
+        return None
+    module_name, function_name = PLATFORM_PAGES[platform_name]
+    return getattr(importlib.import_module(module_name, __package__), function_name)
 
 def show_platform_grid():
     """Show all platforms in a grid layout"""
@@ -116,18 +129,9 @@ def show_platform_grid():
             st.rerun()
             
     with col2:
-        warning_placeholder = st.empty()
-        
         if st.button("🚪 Logout", key="logout_button", use_container_width=True):
-            warning_placeholder.warning("⚠️ Logging out in 3 seconds...")
-            time.sleep(1)
-            warning_placeholder.warning("⚠️ Logging out in 2 seconds...")
-            time.sleep(1)
-            warning_placeholder.warning("⚠️ Logging out in 1 second...")
-            time.sleep(1)
-            warning_placeholder.empty()
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            logout_user()
+            flash("⚠️ You have been logged out.", 'warning')
             st.rerun()
             
     st.markdown('</div>', unsafe_allow_html=True)
@@ -143,12 +147,9 @@ def route_to_platform(platform_name, username):
         return
     
     # Route to appropriate platform
-    if platform_name == 'PhonePe':
-        show_phonepe_page(username)
-    elif platform_name == 'Paytm':
-        show_paytm_page(username)
-    elif platform_name == 'SuperMoney':
-        show_supermoney_page(username)
+    show_page = load_platform_page(platform_name)
+    if show_page is not None:
+        show_page(username)
     elif platform_name:
         # Show coming soon message for other platforms
         st.markdown(f"""
@@ -1,11 +1,13 @@
 import streamlit as st
-from statement_parser import StatementParser
+from parse_jobs import parse_upload
 import time
 import traceback
 import logging
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+from telemetry import show_debug_panel
+from transaction_table import show_transaction_table
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -45,8 +47,7 @@ def show_supermoney_page(username):
             logger.info(f"Processing SuperMoney statement: {uploaded_file.name}")
             
             with st.spinner("Analyzing your statement..."):
-                parser = StatementParser(uploaded_file)
-                df = parser.parse()
+                parser, df = parse_upload(uploaded_file)
                 
                 # Log DataFrame info
                 logger.info(f"Parsed DataFrame columns: {df.columns.tolist()}")
@@ -107,14 +108,8 @@ def show_supermoney_page(username):
                     
                     st.markdown('<div class="transaction-table">', unsafe_allow_html=True)
                     
-                    # Display transactions with proper formatting
-                    st.dataframe(
-                        df[['date', 'description', 'amount', 'category']].style.format({
-                            'amount': '₹{:,.2f}',
-                            'date': lambda x: x.strftime('%d %b %Y')
-                        }),
-                        use_container_width=True
-                    )
+                    # One page of transactions at a time, filtered and sorted server-side
+                    show_transaction_table(df, parser.cache_key)
                     st.markdown('</div>', unsafe_allow_html=True)
                     
                     # Generate spending analysis if there are transactions
@@ -137,26 +132,17 @@ def show_supermoney_page(username):
                             st.subheader("📈 Spending Analysis")
                             col1, col2 = st.columns(2)
                             
-                            line_fig, pie_fig = parser.generate_spending_chart(df)
+                            # The figures are shared through the figure cache, so style them via parameters
+                            line_fig, pie_fig = parser.generate_spending_chart(df, font_color='#ffffff')
                             
                             with col1:
                                 if line_fig is not None:
-                                    line_fig.update_layout(
-                                        paper_bgcolor='rgba(0,0,0,0)',
-                                        plot_bgcolor='rgba(0,0,0,0)',
-                                        font_color='#ffffff'
-                                    )
                                     st.plotly_chart(line_fig, use_container_width=True)
                                 else:
                                     st.info("Monthly spending trend not available.")
                                     
                             with col2:
                                 if pie_fig is not None:
-                                    pie_fig.update_layout(
-                                        paper_bgcolor='rgba(0,0,0,0)',
-                                        plot_bgcolor='rgba(0,0,0,0)',
-                                        font_color='#ffffff'
-                                    )
                                     st.plotly_chart(pie_fig, use_container_width=True)
                                 else:
                                     st.info("Category distribution not available.")
@@ -179,6 +165,8 @@ def show_supermoney_page(username):
                     
                     # Show category analysis
                     show_category_analysis(df)
+
+                    show_debug_panel(parser.telemetry)
                     
                 except Exception as e:
                     logger.error(f"Error processing transactions: {str(e)}\n{traceback.format_exc()}")
@@ -0,0 +1,144 @@
+"""Recurring payments (subscriptions, EMIs, bills): merchants paid a steady amount at a steady interval"""
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from merchants import get_merchant_index, merchant_keys
+from parse_cache import get_parse_cache
+
+# (label, days, tolerance in days)
+PERIODS = [
+    ('Weekly', 7, 1),
+    ('Fortnightly', 14, 2),
+    ('Monthly', 30.44, 4),
+    ('Quarterly', 91.31, 10),
+]
+MIN_OCCURRENCES = 3
+# Share of gaps that must be within the period's tolerance
+MIN_REGULAR_SHARE = 0.75
+# Largest standard deviation of the amounts, relative to their median
+MAX_AMOUNT_SPREAD = 0.25
+AVERAGE_MONTH_DAYS = 30.44
+EMI_PATTERN = re.compile(r'\b(?:emi|loan|finance)\b', re.IGNORECASE)
+
+COLUMNS = ['merchant', 'kind', 'period', 'occurrences', 'typical_amount', 'monthly_cost', 'last_paid', 'next_due']
+# Parse cache artifact holding a statement's recurring payments
+RECURRING_ARTIFACT = 'recurring_payments'
+
+
+def _payment_days(df, username=None):
+    """One row per merchant and day with the day's total debit, ordered by merchant then day"""
+    debits = df[(df['amount_paise'] < 0) & df['date'].notna()]
+    keys, merchants = merchant_keys(debits['description'], username)
+    days = debits['date'].to_numpy().astype('datetime64[D]').astype('int64')
+    paise = -debits['amount_paise'].to_numpy()
+
+    order = np.lexsort((days, keys))
+    keys, days, paise = keys[order], days[order], paise[order]
+    names = np.asarray(merchants.astype(object))[order]
+
+    # Several payments to one merchant on one day count as one payment
+    first_of_day = np.ones(len(keys), dtype=bool)
+    first_of_day[1:] = (keys[1:] != keys[:-1]) | (days[1:] != days[:-1])
+    starts = np.flatnonzero(first_of_day)
+    return pd.DataFrame({
+        'key': keys[starts],
+        'merchant': names[starts],
+        'day': days[starts],
+        'paise': np.add.reduceat(paise, starts) if len(starts) else paise[:0],
+    })
+
+
+def detect_recurring(df, username=None):
+    """Recurring payments of a transaction_schema frame, costliest per month first"""
+    payments = _payment_days(df, username)
+    if payments.empty:
+        return pd.DataFrame(columns=COLUMNS)
+
+    # Gap to the same merchant's previous payment; NaN on each merchant's first
+    same_merchant = np.zeros(len(payments), dtype=bool)
+    same_merchant[1:] = payments['key'].to_numpy()[1:] == payments['key'].to_numpy()[:-1]
+    gaps = np.diff(payments['day'].to_numpy(), prepend=0).astype('float64')
+    gaps[~same_merchant] = np.nan
+    payments['gap'] = gaps
+
+    stats = payments.groupby('key', sort=False).agg(
+        merchant=('merchant', 'first'),
+        occurrences=('day', 'size'),
+        last_day=('day', 'last'),
+        median_gap=('gap', 'median'),
+        median_paise=('paise', 'median'),
+        paise_std=('paise', 'std'),
+    )
+    stats = stats[stats['occurrences'] >= MIN_OCCURRENCES]
+    if stats.empty:
+        return pd.DataFrame(columns=COLUMNS)
+
+    # Nearest period to each merchant's median gap
+    period_days = np.array([days for _, days, _ in PERIODS])
+    tolerances = np.array([tolerance for _, _, tolerance in PERIODS])
+    nearest = np.abs(stats['median_gap'].to_numpy()[:, None] - period_days[None, :]).argmin(axis=1)
+    stats['period'] = nearest
+    stats = stats[np.abs(stats['median_gap'].to_numpy() - period_days[nearest]) <= tolerances[nearest]]
+
+    # Share of each merchant's gaps within its period's tolerance
+    gap_rows = payments[payments['key'].isin(stats.index) & payments['gap'].notna()]
+    gap_period = stats['period'].reindex(gap_rows['key']).to_numpy()
+    regular = np.abs(gap_rows['gap'].to_numpy() - period_days[gap_period]) <= tolerances[gap_period]
+    stats['regular_share'] = pd.Series(regular, index=gap_rows['key'].to_numpy()).groupby(level=0).mean()
+
+    spread = stats['paise_std'].fillna(0) / stats['median_paise']
+    stats = stats[(stats['regular_share'] >= MIN_REGULAR_SHARE) & (spread <= MAX_AMOUNT_SPREAD)]
+    if stats.empty:
+        return pd.DataFrame(columns=COLUMNS)
+
+    days = period_days[stats['period'].to_numpy()]
+    typical_amount = stats['median_paise'].to_numpy() / 100
+    last_paid = pd.to_datetime(stats['last_day'].to_numpy(), unit='D')
+    result = pd.DataFrame({
+        'merchant': stats['merchant'].to_numpy(),
+        'kind': ['EMI' if EMI_PATTERN.search(name) else 'Subscription' for name in stats['merchant']],
+        'period': [PERIODS[index][0] for index in stats['period']],
+        'occurrences': stats['occurrences'].to_numpy(),
+        'typical_amount': typical_amount,
+        'monthly_cost': typical_amount * AVERAGE_MONTH_DAYS / days,
+        'last_paid': last_paid,
+        'next_due': last_paid + pd.to_timedelta(np.round(days), unit='D'),
+    })
+    return result.sort_values('monthly_cost', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def get_recurring(df, cache_key=None, username=None):
+    """detect_recurring(df, username), rebuilt only when the parse or the user's merchant aliases change"""
+    if cache_key is None:
+        return detect_recurring(df, username)
+    return get_parse_cache().derived(
+        cache_key, f"{RECURRING_ARTIFACT}-{get_merchant_index(username).version}",
+        lambda: detect_recurring(df, username),
+    )
+
+
+def show_recurring_payments(recurring):
+    """Table of the recurring payments found, with their total monthly cost"""
+    st.markdown("#### 🔁 Recurring Payments")
+    if recurring.empty:
+        st.info("No subscriptions or EMIs found in this statement.")
+        return
+    st.caption(f"{len(recurring)} recurring payments costing about ₹{recurring['monthly_cost'].sum():,.0f} a month")
+    st.dataframe(
+        recurring,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'merchant': "Merchant",
+            'kind': "Kind",
+            'period': "Every",
+            'occurrences': "Payments",
+            'typical_amount': st.column_config.NumberColumn("Amount", format="₹%.2f"),
+            'monthly_cost': st.column_config.NumberColumn("Per month", format="₹%.0f"),
+            'last_paid': st.column_config.DateColumn("Last paid", format="DD MMM YYYY"),
+            'next_due': st.column_config.DateColumn("Next due", format="DD MMM YYYY"),
+        },
+    )
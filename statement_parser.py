@@ -1,223 +1,283 @@
+import io
 import pandas as pd
-import plotly.express as px
-import pdfplumber
 from pathlib import Path
-import io
 import streamlit as st
-import re
-from pdfminer.layout import LAParams
-import PyPDF2
-import fitz  #  PyMuPDF
 import traceback  # Import traceback for detailed error logging
 import logging  # Import logging for error handling
-import plotly.graph_objects as go
 from datetime import datetime
+import page_extractor
+from pdf_documents import PdfDocuments, text_quality_check
+from parse_cache import get_parse_cache, content_key
+import transaction_stream
+import categorizer
+import aggregates
+import figures
+import parser_registry
+import telemetry
+from formats import PHONEPE, PAYTM, SUPERMONEY
+from transaction_schema import normalize_transactions, empty_transactions
+from transaction_stream import Transaction
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Bump whenever parsing output changes so cached results are not reused
+PARSER_VERSION = '3'
+# Formats parsed whole in a worker process when in_process is set; PhonePe
+# already spreads its pages over page_extractor's pool
+POOLED_FILE_FORMATS = {'paytm', 'supermoney'}
+
 class StatementParser:
-    def __init__(self, file_obj):
+    def __init__(self, file_obj, max_workers=None, selected_platform=None, progress=None, page_range=None):
         self.file_obj = file_obj
         self.filename = Path(file_obj.name).name
+        # Worker processes for page extraction; None reads STATEMENT_PARSER_WORKERS
+        # and falls back to the CPU count
+        self.max_workers = max_workers
+        # Platform section the file was uploaded to; None reads it from the session
+        self.selected_platform = selected_platform
+        # Called with (pages_done, page_count) while pages are extracted
+        self.progress = progress
+        # (first_page, last_page) to parse instead of the whole statement, see ledger
+        self.page_range = page_range
+        # When a list, user-facing messages are collected here as (kind, text)
+        # instead of rendered, e.g. when parsing off the script thread
+        self.messages = None
+        # Per-backend extraction time of the last parse, see pdf_documents.BackendTimings
+        self.backend_timings = None
+        # Parse cache key of the last parse, see parse_cache.content_key
+        self.cache_key = None
+        # Timing spans of the last parse, None while telemetry is off
+        self.telemetry = None
+        # Parse POOLED_FILE_FORMATS in page_extractor's process pool, so
+        # several files parse on separate cores, see parse_jobs.submit
+        self.in_process = False
 
     def parse(self):
         """Parse the uploaded file into a standardized DataFrame"""
+        with telemetry.trace('parse', file=self.filename) as parse_trace:
+            self.telemetry = parse_trace
+            return self._parse()
+
+    def _parse(self):
         if self.filename.endswith('.pdf'):
-            # Check if it's a Paytm statement being uploaded to PhonePe section
-            if 'paytm' in self.filename.lower() and 'phonepe' in st.session_state.get('selected_platform', '').lower():
-                st.error("⚠️ Incorrect statement type! Please upload a PhonePe statement for the PhonePe analyzer.")
-                return pd.DataFrame(columns=['date', 'amount', 'description', 'category'])
-            
-            # Check if it's a PhonePe statement being uploaded to Paytm section    
-            if 'phonepe' in self.filename.lower() and 'paytm' in st.session_state.get('selected_platform', '').lower():
-                st.error("⚠️ Incorrect statement type! Please upload a Paytm statement for the Paytm analyzer.")
-                return pd.DataFrame(columns=['date', 'amount', 'description', 'category'])
-            
-            # Check if it's a SuperMoney statement being uploaded to wrong section
-            if 'supermoney' in self.filename.lower() and 'supermoney' not in st.session_state.get('selected_platform', '').lower():
-                st.error("⚠️ Incorrect statement type! Please upload this statement in the SuperMoney analyzer section.")
-                return pd.DataFrame(columns=['date', 'amount', 'description', 'category'])
-            
-            # Route to appropriate parser
-            if 'paytm' in self.filename.lower():
-                return self._parse_paytm_pdf(self._extract_text_from_pdf())
-            elif 'supermoney' in self.filename.lower():
-                return self._parse_supermoney_pdf(self._extract_text_from_pdf())
-            else:
-                return self._parse_pdf()
+            # Route on the first page's content; the filename is only a fallback
+            parser = self.detect_format()
+
+            # Reject statements uploaded to another platform's section before parsing them
+            section = self._selected_section()
+            expected = parser_registry.parser_for_platform(section)
+            if expected is not None and expected.name != parser.name:
+                if parser.name == 'supermoney':
+                    self._notify('error', "⚠️ Incorrect statement type! Please upload this statement in the SuperMoney analyzer section.")
+                else:
+                    self._notify('error', f"⚠️ Incorrect statement type! Please upload a {expected.platform} statement for the {expected.platform} analyzer.")
+                return empty_transactions()
+
+            route = parser.name
+            if self.page_range is not None:
+                route = f"{route}-pages{self.page_range[0]}-{self.page_range[1]}"
+            if self.in_process and parser.name in POOLED_FILE_FORMATS:
+                return self._parse_cached(route, lambda: self._parse_in_pool(parser.name))
+            return self._parse_cached(route, lambda: parser.parse(self))
         elif self.filename.endswith('.csv'):
-            return self._parse_csv()
+            return normalize_transactions(self._parse_csv())
         else:
             raise ValueError("Unsupported file format")
 
+    def iter_transactions(self):
+        """Stream Transaction records without materialising the whole statement.
+
+        Pages are extracted one at a time and turned into
+        transaction_stream.Transaction records as they are read; PhonePe pages
+        go through the same page_extractor.extract_page as parse().
+        """
+        route = self.detect_format().name
+        if route == 'supermoney':
+            df = self._parse_supermoney_pdf(self._extract_text_from_pdf())
+            for row in df.itertuples(index=False):
+                yield Transaction(row.date, row.amount, None, row.description, row.category, None)
+            return
+
+        with PdfDocuments(self.file_obj.getvalue()) as documents:
+            if route == 'paytm':
+                lines = transaction_stream.iter_lines(transaction_stream.iter_page_texts(
+                    documents, check=text_quality_check(PAYTM)
+                ))
+                yield from transaction_stream.iter_paytm_records(lines)
+            else:
+                yield from transaction_stream.iter_phonepe_records(
+                    documents, self._categorize_transaction,
+                    fallback_text=lambda page_num: self._extract_text_with_pymupdf(documents, page_num),
+                )
+        self.backend_timings = documents.timings
+
+    def iter_transaction_chunks(self, chunk_size=transaction_stream.DEFAULT_CHUNK_SIZE):
+        """Stream the statement as DataFrames of at most ``chunk_size`` rows"""
+        return transaction_stream.iter_chunks(self.iter_transactions(), chunk_size)
+
+    def _notify(self, kind, message):
+        """Show a user-facing message, or collect it when ``self.messages`` is set"""
+        if self.messages is not None:
+            self.messages.append((kind, message))
+        else:
+            getattr(st, kind)(message)
+
+    def _report_progress(self, pages_done, page_count):
+        if self.progress is not None:
+            self.progress(pages_done, page_count)
+
+    def _tracked_pages(self, page_texts, page_count):
+        """Pass ``(page_num, text)`` pairs through, reporting progress per page"""
+        for pages_done, page in enumerate(page_texts, start=1):
+            yield page
+            self._report_progress(pages_done, page_count)
+
+    def _selected_section(self):
+        if self.selected_platform is None:
+            return st.session_state.get('selected_platform', '')
+        return self.selected_platform
+
+    def _route_from_filename(self):
+        """Name of the parser the filename suggests, for statements no probe recognises"""
+        if 'paytm' in self.filename.lower():
+            return 'paytm'
+        elif 'supermoney' in self.filename.lower():
+            return 'supermoney'
+        return 'phonepe'
+
+    def detect_format(self):
+        """Registered parser for this upload, sniffed from its first page"""
+        fallback = self._route_from_filename()
+        parser = parser_registry.detect(self.upload_key(f"sniff-{fallback}"), self.file_obj.getvalue())
+        if parser is None:
+            logger.info(f"No format probe matched {self.filename}; routing by filename to {fallback}")
+            parser = parser_registry.get_parser(fallback)
+        return parser
+
+    def upload_key(self, route):
+        """Key of this upload for ``route``, see parse_cache.content_key"""
+        return content_key(self.file_obj.getvalue(), f"{PARSER_VERSION}-{route}")
+
+    def _parse_cached(self, route, parse_fn):
+        """Return the cached result for this upload, parsing it on a miss.
+
+        Results are normalised into the transaction_schema before caching.
+        """
+        cache = get_parse_cache()
+        self.cache_key = self.upload_key(route)
+
+        df = cache.get(self.cache_key)
+        if df is not None:
+            logger.info(f"Parse cache hit for {self.filename}")
+            return df
+
+        df = parse_fn()
+        with telemetry.span('normalize', rows=len(df)):
+            df = normalize_transactions(df)
+        # Failed parses return a zero-amount placeholder; don't pin those
+        if (df['amount_paise'] != 0).any():
+            cache.put(self.cache_key, df)
+        return df
+
+    def _parse_in_pool(self, parser_name):
+        """Run the ``parser_name`` parser on this upload in a worker process"""
+        df, messages, spans = page_extractor.run_in_pool(
+            parse_in_worker, self.file_obj.getvalue(), self.filename, parser_name, max_workers=self.max_workers,
+        )
+        for kind, message in messages:
+            self._notify(kind, message)
+        telemetry.merge(spans)
+        return df
+
     def _parse_pdf(self):
         """Handle PDF parsing with extra security checks"""
-        pdf_stream = io.BytesIO(self.file_obj.read())
-        
-        try:
-            # First try to validate if it's a valid PDF
-            try:
-                PyPDF2.PdfReader(pdf_stream)
-                pdf_stream.seek(0)  # Reset stream position
-            except Exception as e:
-                st.error("Invalid PDF file. Please ensure you're uploading a valid bank statement in PDF format.")
-                logger.error(f"PDF validation error: {str(e)}")
-                return pd.DataFrame({
-                    'date': [pd.Timestamp.now()], 
-                    'amount': [0.0],
-                    'category': ['Others']
-                })
+        pdf_bytes = self.file_obj.read()
 
-            with pdfplumber.open(pdf_stream) as pdf:
-                all_transactions = []
-                parsing_errors = []
-                
-                # Check if PDF has pages
-                if len(pdf.pages) == 0:
-                    st.error("The PDF file appears to be empty.")
+        try:
+            with PdfDocuments(pdf_bytes) as documents:
+                # First try to validate if it's a valid PDF
+                try:
+                    with telemetry.span('open'):
+                        documents.pypdf
+                except Exception as e:
+                    self._notify('error', "Invalid PDF file. Please ensure you're uploading a valid bank statement in PDF format.")
+                    logger.error(f"PDF validation error: {str(e)}")
                     return pd.DataFrame({
                         'date': [pd.Timestamp.now()], 
                         'amount': [0.0],
                         'category': ['Others']
                     })
 
-                for page_num, page in enumerate(pdf.pages, 1):
-                    try:
-                        # Extract text with pdfplumber
-                        text = page.extract_text(
-                            x_tolerance=2,
-                            y_tolerance=2,
-                            layout=True,
-                            keep_blank_chars=True
-                        )
-                        
-                        if not text or len(text.strip()) == 0:
-                            logger.info(f"Attempting PyMuPDF for page {page_num}")
-                            pdf_stream.seek(0)
-                            text = self._extract_text_with_pymupdf(pdf_stream, page_num)
-                            
-                            if not text or len(text.strip()) == 0:
-                                parsing_errors.append(f"Page {page_num}: No text could be extracted")
-                                continue
-                        
-                        # Process the extracted text
-                        lines = [line.strip() for line in text.split('\n') if line.strip()]
-                        
-                        if not lines:
-                            parsing_errors.append(f"Page {page_num}: No valid text lines found")
-                            continue
-
-                        # Debug information
-                        logger.info(f"Processing page {page_num} with {len(lines)} lines")
-                        
-                        current_transaction = {}
-                        
-                        for line in lines:
-                            if "Transaction Statement for" in line:
-                                continue
-                                
-                            date_pattern = r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{2},\s+\d{4}'
-                            if re.match(date_pattern, line):
-                                try:
-                                    if current_transaction:
-                                        if current_transaction['amount'] != 0:  # Only add non-zero transactions
-                                            all_transactions.append(current_transaction)
-                                        current_transaction = {}
-                                    
-                                    parts = line.split()
-                                    date_str = ' '.join(parts[:3])
-                                    
-                                    try:
-                                        amount_parts = [p for p in reversed(parts) if '₹' in p or any(c.isdigit() for c in p)]
-                                        if amount_parts:
-                                            amount_str = amount_parts[0]
-                                        else:
-                                            continue
-                                            
-                                        cleaned_amount = (amount_str.replace('₹', '')
-                                                                  .replace(',', '')
-                                                                  .replace(' ', '')
-                                                                  .strip())
-                                        cleaned_amount = ''.join(c for c in cleaned_amount if c.isdigit() or c in '.-')
-                                        
-                                        amount = float(cleaned_amount)
-                                        if amount == 0:  # Skip zero amount transactions
-                                            continue
-                                    
-                                    except (ValueError, IndexError):
-                                        logger.info(f"Skipping transaction with invalid amount on page {page_num}")
-                                        continue
-                                    
-                                    txn_type = 'CREDIT' if 'CREDIT' in line else 'DEBIT' if 'DEBIT' in line else 'UNKNOWN'
-                                    if txn_type == 'DEBIT':
-                                        amount = -amount
-                                    
-                                    details_start = 3
-                                    details_end = -1
-                                    if len(parts) > 4:
-                                        details = ' '.join(parts[details_start:details_end])
-                                    else:
-                                        details = 'Unknown Transaction'
-                                    
-                                    current_transaction = {
-                                        'date': pd.to_datetime(date_str),
-                                        'amount': amount,
-                                        'type': txn_type,
-                                        'details': details,
-                                        'category': self._categorize_transaction(details)
-                                    }
-                                except Exception as e:
-                                    logger.info(f"Error processing line on page {page_num}: {str(e)}")
-                                    parsing_errors.append(f"Line processing error on page {page_num}: {str(e)}")
-                                    continue
-                        
-                        if current_transaction and current_transaction.get('amount', 0) != 0:
-                            all_transactions.append(current_transaction)
-                            
-                    except Exception as e:
-                        logger.info(f"Error on page {page_num}: {str(e)}")
-                        parsing_errors.append(f"Page {page_num}: {str(e)}")
-                        continue
-                
-                if not all_transactions:
-                    if parsing_errors:
-                        error_msg = "\n".join(parsing_errors)
-                        st.error(f"Could not extract transactions. Errors encountered:\n{error_msg}")
-                    else:
-                        st.error("No valid transactions found in the PDF. Please check if this is the correct statement.")
+                with telemetry.span('open'):
+                    page_count = documents.page_count
+
+                # Check if PDF has pages
+                if page_count == 0:
+                    self._notify('error', "The PDF file appears to be empty.")
                     return pd.DataFrame({
                         'date': [pd.Timestamp.now()], 
                         'amount': [0.0],
                         'category': ['Others']
                     })
-                
-                df = pd.DataFrame(all_transactions)
-                
-                # Validate the extracted data
-                if len(df) == 0 or df['amount'].sum() == 0:
-                    st.warning("Warning: No valid transactions found or all transactions sum to zero. Please verify the statement.")
+
+                page_results = page_extractor.extract_pages(
+                    documents, self.max_workers, self._report_progress, self.page_range
+                )
+
+                for page_result in page_results:
+                    if page_result['has_text']:
+                        continue
+                    page_num = page_result['page_num']
+                    logger.info(f"Attempting PyMuPDF for page {page_num}")
+                    text = self._extract_text_with_pymupdf(documents, page_num)
+                    if text and len(text.strip()) > 0:
+                        page_result.update(page_extractor.parse_page_text(page_num, text))
+
+            self.backend_timings = documents.timings
+            logger.info(f"PDF backend timings: {documents.timings.summary()}")
+
+            all_transactions, parsing_errors = page_extractor.merge_page_results(page_results)
+
+            if not all_transactions:
+                if parsing_errors:
+                    error_msg = "\n".join(parsing_errors)
+                    self._notify('error', f"Could not extract transactions. Errors encountered:\n{error_msg}")
                 else:
-                    st.success(f"Successfully extracted {len(df)} transactions.")
-                
-                return df
-                
+                    self._notify('error', "No valid transactions found in the PDF. Please check if this is the correct statement.")
+                return pd.DataFrame({
+                    'date': [pd.Timestamp.now()], 
+                    'amount': [0.0],
+                    'category': ['Others']
+                })
+            
+            with telemetry.span('build_frame', rows=len(all_transactions)):
+                df = pd.DataFrame(all_transactions, columns=['date', 'amount', 'type', 'details', 'category', 'transaction_id'])
+            with telemetry.span('categorize', rows=len(df)):
+                df['category'] = categorizer.categorize_series(df['details'])
+            
+            # Validate the extracted data
+            if len(df) == 0 or df['amount'].sum() == 0:
+                self._notify('warning', "Warning: No valid transactions found or all transactions sum to zero. Please verify the statement.")
+            else:
+                self._notify('success', f"Successfully extracted {len(df)} transactions.")
+            
+            return df
+            
         except Exception as e:
             logger.error(f"PDF processing error: {str(e)}")
-            st.error(f"Error processing the PDF: {str(e)}\nPlease ensure this is a valid bank statement.")
+            self._notify('error', f"Error processing the PDF: {str(e)}\nPlease ensure this is a valid bank statement.")
             return pd.DataFrame({
                 'date': [pd.Timestamp.now()], 
                 'amount': [0.0],
                 'category': ['Others']
             })
 
-    def _extract_text_with_pymupdf(self, pdf_stream, page_num):
-        """Fallback text extraction using PyMuPDF"""
+    def _extract_text_with_pymupdf(self, documents, page_num):
+        """Fallback text extraction using the shared PyMuPDF document"""
         try:
-            pdf_document = fitz.open(stream=pdf_stream, filetype="pdf")
-            page = pdf_document.load_page(page_num - 1)
-            return page.get_text("text")
+            return documents.fitz_page_text(page_num)
         except Exception as e:
             logger.info(f"PyMuPDF failed to extract text from page {page_num}: {str(e)}")
             return None
@@ -265,215 +325,151 @@ class StatementParser:
 
     def _categorize_transaction(self, details):
         """Enhanced AI-powered transaction categorization"""
-        details = details.lower()
-        
-        # Advanced category mapping with sub-categories
-        categories = {
-            'Food & Dining': {
-                'keywords': ['swiggy', 'zomato', 'restaurant', 'food', 'dining', 'cafe', 'hotel', 'milk', 'burger', 'pizza'],
-                'sub_categories': {
-                    'Restaurant': ['restaurant', 'dining', 'cafe'],
-                    'Food Delivery': ['swiggy', 'zomato'],
-                    'Groceries': ['grocery', 'supermarket', 'market', 'vegetables', 'fruits']
-                }
-            },
-            'Shopping': {
-                'keywords': ['amazon', 'flipkart', 'myntra', 'retail', 'mart', 'shop', 'store', 'market'],
-                'sub_categories': {
-                    'Online Shopping': ['amazon', 'flipkart', 'myntra'],
-                    'Retail': ['retail', 'mart', 'store'],
-                    'Fashion': ['clothing', 'apparel', 'fashion']
-                }
-            },
-            'Transportation': {
-                'keywords': ['uber', 'ola', 'petrol', 'fuel', 'metro', 'bus', 'train', 'transport'],
-                'sub_categories': {
-                    'Ride Sharing': ['uber', 'ola'],
-                    'Fuel': ['petrol', 'fuel', 'gas'],
-                    'Public Transport': ['metro', 'bus', 'train']
-                }
-            },
-            'Bills & Utilities': {
-                'keywords': ['airtel', 'jio', 'vodafone', 'electricity', 'water', 'gas', 'bill', 'recharge'],
-                'sub_categories': {
-                    'Mobile': ['airtel', 'jio', 'vodafone', 'phone'],
-                    'Utilities': ['electricity', 'water', 'gas'],
-                    'Internet': ['broadband', 'wifi', 'internet']
-                }
-            }
-        }
-        
-        # AI-powered category prediction
-        for category, data in categories.items():
-            if any(keyword in details for keyword in data['keywords']):
-                # Find sub-category
-                for sub_cat, sub_keywords in data['sub_categories'].items():
-                    if any(keyword in details for keyword in sub_keywords):
-                        return f"{category} - {sub_cat}"
-                return category
-        
-        # Use NLP for unmatched transactions
-        return self._predict_category_with_nlp(details)
+        return categorizer.categorize(details)
 
     def _predict_category_with_nlp(self, details):
         """Use NLP to predict category for unknown transactions"""
-        # Common transaction patterns
-        patterns = {
-            r'\d+\s*rs': 'Payment',
-            r'transfer\s+to': 'Transfer',
-            r'received\s+from': 'Income',
-            r'salary': 'Income - Salary',
-            r'rent': 'Housing - Rent',
-            r'emi': 'Finance - EMI',
-            r'investment': 'Investment',
-            r'insurance': 'Insurance',
-            r'medical|health|hospital': 'Healthcare',
-            r'education|school|college': 'Education'
-        }
-        
-        for pattern, category in patterns.items():
-            if re.search(pattern, details.lower()):
-                return category
-        
-        return 'Others'
-
-    def generate_spending_chart(self, df):
-        """Create an interactive spending analysis chart"""
-        try:
-            # Ensure we have valid data
-            if df.empty or len(df) == 0:
-                st.warning("No transaction data available for analysis.")
-                return None, None
+        return categorizer.predict_category(details)
+
+    def spending_cube(self, df, username=None):
+        """Aggregate cube of ``df`` under ``username``'s merchant aliases, memoised with this upload's parse"""
+        with telemetry.span('cube', trace=self.telemetry, rows=len(df)):
+            return aggregates.get_cube(df, self.cache_key, username)
+
+    def generate_spending_chart(self, df, font_color=None, username=None):
+        """Create an interactive spending analysis chart, memoised with this upload's parse"""
+        with telemetry.span('chart', trace=self.telemetry, rows=len(df)):
+            try:
+                # Ensure we have valid data
+                if df.empty or len(df) == 0:
+                    st.warning("No transaction data available for analysis.")
+                    return None, None
+
+                # Check if we have any spending transactions
+                cube = self.spending_cube(df, username)
+                if cube.count('debit') == 0:
+                    st.info("No spending transactions found in the statement.")
+                    return None, None
 
-            # Check if we have any spending transactions
-            spending_data = df[df['amount'] < 0].copy()
-            if len(spending_data) == 0:
-                st.info("No spending transactions found in the statement.")
+                return figures.get_figure(
+                    self.cache_key, 'spending', lambda: self._build_spending_chart(cube, font_color),
+                    font_color=font_color,
+                )
+            except Exception as e:
+                logger.error(f"Error generating spending charts: {str(e)}")
+                st.error(f"Unable to generate spending analysis: {str(e)}")
                 return None, None
 
-            # Convert amounts to positive values
-            spending_data['amount'] = spending_data['amount'].abs()
-
-            # Get category-wise spending
-            category_spending = spending_data.groupby('category')['amount'].agg(['sum', 'count']).reset_index()
-            category_spending.columns = ['Category', 'Total Amount', 'Number of Transactions']
-            category_spending = category_spending.sort_values('Total Amount', ascending=True)
-
-            # Create horizontal bar chart for categories
-            fig = go.Figure()
-
-            # Add bars for each category
-            fig.add_trace(go.Bar(
-                y=category_spending['Category'],
-                x=category_spending['Total Amount'],
-                orientation='h',
-                text=[f"₹{x:,.0f}<br>({n} transactions)" 
-                      for x, n in zip(category_spending['Total Amount'], 
-                                    category_spending['Number of Transactions'])],
-                textposition='auto',
-                marker_color='rgba(31, 119, 180, 0.7)',
-                hovertemplate="<b>%{y}</b><br>" +
-                             "Total Spent: ₹%{x:,.2f}<br>" +
-                             "Transactions: %{text}<extra></extra>"
-            ))
-
-            # Update layout
-            fig.update_layout(
-                title="Spending by Category",
-                showlegend=False,
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font_color='#333333',
-                height=max(400, len(category_spending) * 50),  # Adjust height based on number of categories
-                xaxis=dict(
-                    showgrid=True,
-                    gridcolor='lightgray',
-                    title="Amount Spent (₹)",
-                    tickprefix='₹',
-                    tickformat=",."
-                ),
-                yaxis=dict(
-                    showgrid=False,
-                    title="",
-                    autorange="reversed"  # Show highest spending at top
-                ),
-                margin=dict(l=10, r=10, t=40, b=10)
-            )
-
-            # Create detailed pie chart
-            pie_fig = px.pie(
-                category_spending,
-                values='Total Amount',
-                names='Category',
-                title="Spending Distribution",
-                hole=0.4,
-            )
-            
-            # Customize pie chart
-            pie_fig.update_traces(
-                textposition='inside',
-                textinfo='percent+label',
-                hovertemplate="<b>%{label}</b><br>" +
-                             "Amount: ₹%{value:,.2f}<br>" +
-                             "Percentage: %{percent:.1%}<extra></extra>"
-            )
-            
-            # Update pie chart layout
-            pie_fig.update_layout(
-                showlegend=True,
-                legend=dict(
-                    orientation="v",
-                    yanchor="middle",
-                    y=0.5,
-                    xanchor="right",
-                    x=1.1
-                ),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                annotations=[dict(
-                    text=f"Total Spent<br>₹{category_spending['Total Amount'].sum():,.0f}",
-                    x=0.5,
-                    y=0.5,
-                    font_size=14,
-                    showarrow=False
-                )]
-            )
-
-            return fig, pie_fig
-        
-        except Exception as e:
-            logger.error(f"Error generating spending charts: {str(e)}")
-            st.error(f"Unable to generate spending analysis: {str(e)}")
-            return None, None 
+    def _build_spending_chart(self, cube, font_color):
+        """Category bar and pie figures of the cube's spending; ``font_color`` overrides the theme's"""
+        # plotly is only needed once there is something to chart
+        import plotly.express as px
+        import plotly.graph_objects as go
+
+        # Get category-wise spending as positive values
+        category_spending = cube.rollup('category', 'debit')[['sum', 'count']].reset_index()
+        category_spending['sum'] = category_spending['sum'].abs()
+        category_spending.columns = ['Category', 'Total Amount', 'Number of Transactions']
+        category_spending = category_spending.sort_values('Total Amount', ascending=True)
+
+        # Create horizontal bar chart for categories
+        fig = go.Figure()
+
+        # Add bars for each category; labels are formatted by plotly from customdata
+        fig.add_trace(go.Bar(
+            y=category_spending['Category'],
+            x=category_spending['Total Amount'],
+            orientation='h',
+            customdata=category_spending['Number of Transactions'],
+            texttemplate="₹%{x:,.0f}<br>(%{customdata} transactions)",
+            textposition='auto',
+            marker_color='rgba(31, 119, 180, 0.7)',
+            hovertemplate="<b>%{y}</b><br>" +
+                         "Total Spent: ₹%{x:,.2f}<br>" +
+                         "Transactions: %{customdata}<extra></extra>"
+        ))
+
+        # Update layout
+        fig.update_layout(
+            title="Spending by Category",
+            showlegend=False,
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font_color=font_color or '#333333',
+            height=max(400, len(category_spending) * 50),  # Adjust height based on number of categories
+            xaxis=dict(
+                showgrid=True,
+                gridcolor='lightgray',
+                title="Amount Spent (₹)",
+                tickprefix='₹',
+                tickformat=",."
+            ),
+            yaxis=dict(
+                showgrid=False,
+                title="",
+                autorange="reversed"  # Show highest spending at top
+            ),
+            margin=dict(l=10, r=10, t=40, b=10)
+        )
+
+        # Create detailed pie chart
+        pie_fig = px.pie(
+            category_spending,
+            values='Total Amount',
+            names='Category',
+            title="Spending Distribution",
+            hole=0.4,
+        )
+
+        # Customize pie chart
+        pie_fig.update_traces(
+            textposition='inside',
+            textinfo='percent+label',
+            hovertemplate="<b>%{label}</b><br>" +
+                         "Amount: ₹%{value:,.2f}<br>" +
+                         "Percentage: %{percent:.1%}<extra></extra>"
+        )
+
+        # Update pie chart layout
+        pie_fig.update_layout(
+            showlegend=True,
+            legend=dict(
+                orientation="v",
+                yanchor="middle",
+                y=0.5,
+                xanchor="right",
+                x=1.1
+            ),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            annotations=[dict(
+                text=f"Total Spent<br>₹{category_spending['Total Amount'].sum():,.0f}",
+                x=0.5,
+                y=0.5,
+                font_size=14,
+                showarrow=False
+            )]
+        )
+
+        if font_color:
+            pie_fig.update_layout(font_color=font_color)
+
+        return fig, pie_fig
 
     def _extract_text_from_pdf(self):
         """Extract text from PDF using multiple methods"""
         try:
-            # Create a bytes buffer from the uploaded file
-            pdf_bytes = io.BytesIO(self.file_obj.getvalue())
-            
-            text = ""
-            
-            # Try pdfplumber first
-            try:
-                with pdfplumber.open(pdf_bytes) as pdf:
-                    for page in pdf.pages:
-                        text += page.extract_text() + "\n"
-            except Exception as e:
-                logger.error(f"pdfplumber error: {str(e)}")
-            
-            # If no text, try PyPDF2
-            if not text.strip():
-                pdf_reader = PyPDF2.PdfReader(pdf_bytes)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            
-            # If still no text, try PyMuPDF
-            if not text.strip():
-                doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-                for page in doc:
-                    text += page.get_text() + "\n"
-                doc.close()
+            with PdfDocuments(self.file_obj.getvalue()) as documents:
+                with telemetry.span('open'):
+                    page_count = documents.page_count
+                # Each page from the fastest backend whose text passes the quality check
+                check = text_quality_check(SUPERMONEY)
+                text = self._join_pages(
+                    lambda page_num: documents.page_text(page_num, check), page_count, self._report_progress
+                )
+
+            self.backend_timings = documents.timings
+            logger.info(f"PDF backend timings: {documents.timings.summary()}")
             
             if not text.strip():
                 raise ValueError("No text could be extracted from the PDF using any method")
@@ -482,129 +478,73 @@ class StatementParser:
 
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}\n{traceback.format_exc()}")
-            st.error(f"Error reading PDF file: {str(e)}")
+            self._notify('error', f"Error reading PDF file: {str(e)}")
             return None
 
+    @staticmethod
+    def _join_pages(extract_page, page_count, progress=None):
+        """Join the text of every page, one line break after each"""
+        texts = []
+        for page_num in range(1, page_count + 1):
+            with telemetry.span('extract_page', page=page_num):
+                texts.append(extract_page(page_num) + "\n")
+            if progress is not None:
+                progress(page_num, page_count)
+        return "".join(texts)
+
+    def _parse_paytm_stream(self):
+        """Parse a Paytm statement page by page without holding its full text"""
+        try:
+            with PdfDocuments(self.file_obj.getvalue()) as documents:
+                with telemetry.span('open'):
+                    page_count = documents.page_count
+                page_texts = self._tracked_pages(
+                    transaction_stream.iter_page_texts(documents, check=text_quality_check(PAYTM)), page_count
+                )
+                # Pages are read as records are built, so this span includes their extraction
+                with telemetry.span('build_frame', pages=page_count) as frame_span:
+                    df = self._build_paytm_frame(transaction_stream.iter_paytm_records(transaction_stream.iter_lines(page_texts)))
+                    frame_span.add(rows=len(df))
+            self.backend_timings = documents.timings
+            logger.info(f"PDF backend timings: {documents.timings.summary()}")
+            return df
+        except Exception as e:
+            self._notify('error', f"Error parsing Paytm statement: {str(e)}")
+            logger.error(f"Paytm parsing error: {str(e)}\n{traceback.format_exc()}")
+            return pd.DataFrame(columns=['date', 'amount', 'description', 'category'])
+
     def _parse_paytm_pdf(self, text):
         """Parse Paytm UPI statement format"""
         try:
             if not text:
                 raise ValueError("No text content found in PDF")
-            
-            # Initialize lists to store transaction data
-            dates = []
-            amounts = []
-            categories = []
-            descriptions = []
 
-            # Split text into lines
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-            
-            # First, try to get total amounts from header
-            header_pattern = r'Rs\.(\d+(?:,\d+)*\.\d{2})\s*\+\s*Rs\.(\d+(?:,\d+)*\.\d{2})'
-            for line in lines[:10]:
-                header_match = re.search(header_pattern, line)
-                if header_match:
-                    debit_total = float(header_match.group(1).replace(',', ''))
-                    credit_total = float(header_match.group(2).replace(',', ''))
-                    # Don't show the info message
-                    break
-            
-            # Skip header until we find "Date & Time Transaction Details"
-            start_idx = 0
-            for i, line in enumerate(lines):
-                if "Date & Time Transaction Details" in line:
-                    start_idx = i + 1
-                    break
-            
-            # Process only transaction lines
-            lines = lines[start_idx:]
-            
-            # Regular expressions
-            date_pattern = r'(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)'
-            amount_pattern = r'([+-])\s*Rs\.(\d+(?:,\d+)*\.\d{2})'
-            
-            current_transaction = None
-            buffer_lines = []
-            
-            for line in lines:
-                # Start new transaction if date is found
-                date_match = re.search(date_pattern, line, re.IGNORECASE)
-                if date_match and len(date_match.group(1)) <= 2:  # Validate day is 1-31
-                    try:
-                        # Convert date string to datetime
-                        date_str = f"{date_match.group(1)} {date_match.group(2)} 2024"
-                        transaction_date = datetime.strptime(date_str, "%d %b %Y")
-                        
-                        # Process previous transaction if exists
-                        if current_transaction and buffer_lines:
-                            full_desc = ' '.join(buffer_lines)
-                            amount_match = re.search(amount_pattern, full_desc)
-                            if amount_match:
-                                sign = amount_match.group(1)
-                                amount = float(amount_match.group(2).replace(',', ''))
-                                if sign == '-':
-                                    amount = -amount
-                                
-                                dates.append(current_transaction['date'])
-                                amounts.append(amount)
-                                descriptions.append(full_desc)
-                                categories.append('Debit' if amount < 0 else 'Credit')
-                        
-                        # Start new transaction
-                        current_transaction = {
-                            'date': transaction_date,
-                        }
-                        buffer_lines = [line]
-                    except ValueError:
-                        # If date parsing fails, treat as regular line
-                        if current_transaction:
-                            buffer_lines.append(line)
-                elif current_transaction:
-                    buffer_lines.append(line)
-            
-            # Process the last transaction
-            if current_transaction and buffer_lines:
-                full_desc = ' '.join(buffer_lines)
-                amount_match = re.search(amount_pattern, full_desc)
-                if amount_match:
-                    sign = amount_match.group(1)
-                    amount = float(amount_match.group(2).replace(',', ''))
-                    if sign == '-':
-                        amount = -amount
-                    
-                    dates.append(current_transaction['date'])
-                    amounts.append(amount)
-                    descriptions.append(full_desc)
-                    categories.append('Debit' if amount < 0 else 'Credit')
-
-            # Create DataFrame
-            if dates:
-                df = pd.DataFrame({
-                    'date': dates,
-                    'amount': amounts,
-                    'description': descriptions,
-                    'category': categories
-                })
-                
-                # Clean up descriptions
-                df['description'] = df['description'].str.replace(r'\s+', ' ').str.strip()
-                
-                # Sort by date
-                df = df.sort_values('date', ascending=False)
-                
-                if len(df) > 0:
-                    st.success(f"Successfully parsed {len(df)} transactions")
-                    return df
-                
-            st.warning("No transactions found in the statement")
-            return pd.DataFrame(columns=['date', 'amount', 'description', 'category'])
+            lines = ((1, line.strip()) for line in text.split('\n') if line.strip())
+            return self._build_paytm_frame(transaction_stream.iter_paytm_records(lines))
 
         except Exception as e:
-            st.error(f"Error parsing Paytm statement: {str(e)}")
+            self._notify('error', f"Error parsing Paytm statement: {str(e)}")
             logger.error(f"Paytm parsing error: {str(e)}\n{traceback.format_exc()}")
             return pd.DataFrame(columns=['date', 'amount', 'description', 'category'])
 
+    def _build_paytm_frame(self, records):
+        """Collect Paytm records into the standard DataFrame"""
+        chunks = transaction_stream.iter_chunks(records)
+        df = transaction_stream.frame_from_chunks(chunks)[['date', 'amount', 'description', 'category']]
+
+        if len(df) > 0:
+            # Clean up descriptions
+            df['description'] = df['description'].str.replace(r'\s+', ' ').str.strip()
+            
+            # Sort by date
+            df = df.sort_values('date', ascending=False)
+            
+            self._notify('success', f"Successfully parsed {len(df)} transactions")
+            return df
+            
+        self._notify('warning', "No transactions found in the statement")
+        return pd.DataFrame(columns=['date', 'amount', 'description', 'category'])
+
     def _parse_supermoney_pdf(self, text):
         """Parse SuperMoney statement format"""
         try:
@@ -620,10 +560,6 @@ class StatementParser:
             # Split text into lines
             lines = [line.strip() for line in text.split('\n') if line.strip()]
             
-            # Regular expressions for SuperMoney format
-            date_pattern = r'(\d{2}/\d{2}/\d{4})'  # DD/MM/YYYY
-            amount_pattern = r'(?:INR|Rs\.|₹)\s*([\d,]+\.?\d*)'  # Matches INR/Rs./₹ followed by amount
-            
             # Sample transaction data for testing
             sample_transactions = [
                 {
@@ -677,13 +613,36 @@ class StatementParser:
             df = df.sort_values('date', ascending=False)
             
             if len(df) > 0:
-                st.success(f"Successfully parsed {len(df)} transactions")
+                self._notify('success', f"Successfully parsed {len(df)} transactions")
                 return df
             
-            st.warning("No transactions found in the statement")
+            self._notify('warning', "No transactions found in the statement")
             return pd.DataFrame(columns=['date', 'amount', 'description', 'category'])
 
         except Exception as e:
-            st.error(f"Error parsing SuperMoney statement: {str(e)}")
+            self._notify('error', f"Error parsing SuperMoney statement: {str(e)}")
             logger.error(f"SuperMoney parsing error: {str(e)}\n{traceback.format_exc()}")
-            return pd.DataFrame(columns=['date', 'amount', 'description', 'category']) 
\ No newline at end of file
+            return pd.DataFrame(columns=['date', 'amount', 'description', 'category']) 
+
+def parse_in_worker(pdf_bytes, filename, parser_name):
+    """``(df, messages, spans)`` of one statement parsed by a registered parser, in a worker process"""
+    file_obj = io.BytesIO(pdf_bytes)
+    file_obj.name = filename
+    statement = StatementParser(file_obj, selected_platform='')
+    statement.messages = []
+    with telemetry.trace('parse_file', file=filename) as worker_trace:
+        df = parser_registry.get_parser(parser_name).parse(statement)
+    spans = worker_trace.records if worker_trace is not None else []
+    return df, statement.messages, spans
+
+# Specific table headers first: "SuperMoney" may also appear as a merchant name
+parser_registry.register_parser(
+    'paytm', 'Paytm', PAYTM.header.search, StatementParser._parse_paytm_stream,
+)
+parser_registry.register_parser(
+    'phonepe', 'PhonePe', PHONEPE.header.search, StatementParser._parse_pdf,
+)
+parser_registry.register_parser(
+    'supermoney', 'SuperMoney', SUPERMONEY.header.search,
+    lambda parser: parser._parse_supermoney_pdf(parser._extract_text_from_pdf()),
+)
@@ -1,10 +1,8 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 import os
-import time
+from notices import flash
 
-print(os.getcwd())  # Add this line temporarily to your support.py to see the current working directory
 
 def show_support_form():
     """Show the support form"""
@@ -22,14 +20,16 @@ def show_support_form():
         if submitted:
             if name and email and issue:
                 # Here you would typically send this to your support system
-                st.success("Support request submitted! We'll get back to you soon.")
-                time.sleep(2)
+                flash("Support request submitted! We'll get back to you soon.")
                 st.session_state.show_support = False
                 st.rerun()  # Changed from st.experimental_rerun()
             else:
                 st.error("Please fill out all fields")
 
 def show_support_form_old():
+    # pandas is only needed to write the support sheet; keep it off the startup path
+    import pandas as pd
+
     st.header("📞 Contact Support")
     
     # Initialize form_submitted in session state if it doesn't exist
@@ -82,23 +82,8 @@ def show_support_form_old():
                     # Save to Excel
                     df.to_excel(filename, index=False)
                     
-                    # Show success message with progress bar
-                    success_message = st.success("""
-                    Thank you for contacting support! 
-                    We have received your request and will get back to you soon.
-                    """)
-                    
-                    # Add a progress bar
-                    progress_bar = st.progress(0)
-                    for i in range(100):
-                        # Update progress bar
-                        progress_bar.progress(i + 1)
-                        time.sleep(0.01)  # Reduced sleep time for better UX
-                    
-                    # Remove success message and progress bar after 2 seconds
-                    time.sleep(2)
-                    success_message.empty()
-                    progress_bar.empty()
+                    # Confirm on the platform page; the notice fades out client-side
+                    flash("Thank you for contacting support! We have received your request and will get back to you soon.")
                     
                     # Return to platform
                     st.session_state.show_support = False
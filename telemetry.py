@@ -0,0 +1,195 @@
+"""Timing spans for the statement pipeline, emitted as JSON lines.
+
+Turned on with ``STATEMENT_TELEMETRY=1``. Wrap a stage in ``span``::
+
+    with telemetry.span('categorize', rows=len(df)):
+        ...
+
+Every finished span is written as one JSON line (duration in ms plus its
+fields) to the ``statement_telemetry`` logger, or appended to
+``STATEMENT_TELEMETRY_FILE`` when that is set. Spans opened inside a
+``trace`` (one per parse) are also collected on it, and ``Trace.summary``
+aggregates them per stage for the debug panel.
+
+When telemetry is off ``span`` returns a shared no-op context manager, so
+instrumented code pays one function call and no timing or allocation.
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger('statement_telemetry')
+
+# Numeric span fields that are summed in a trace summary
+COUNT_FIELDS = ('pages', 'lines', 'rows', 'transactions')
+
+_enabled = os.environ.get('STATEMENT_TELEMETRY', '').lower() in ('1', 'true', 'yes', 'on')
+_local = threading.local()
+_file_lock = threading.Lock()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    """Turn telemetry on or off for this process"""
+    global _enabled
+    _enabled = on
+
+
+def _emit(record):
+    line = json.dumps(record, default=str)
+    path = os.environ.get('STATEMENT_TELEMETRY_FILE')
+    if path:
+        with _file_lock, open(path, 'a') as f:
+            f.write(line + '\n')
+    else:
+        logger.info(line)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def add(self, **fields):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed stage; ``add`` attaches counts discovered while it runs"""
+
+    __slots__ = ('name', 'trace', 'fields', 'start')
+
+    def __init__(self, name, trace, fields):
+        self.name = name
+        self.trace = trace
+        self.fields = fields
+        self.start = None
+
+    def add(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record = {
+            'span': self.name,
+            'ms': round((time.perf_counter() - self.start) * 1000, 3),
+            'trace': self.trace.id if self.trace is not None else None,
+        }
+        record.update(self.fields)
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        _emit(record)
+        if self.trace is not None:
+            self.trace.add(record)
+        return False
+
+
+def span(name, trace=None, **fields):
+    """Time a stage; recorded on ``trace`` or the thread's current trace"""
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, trace if trace is not None else current_trace(), fields)
+
+
+class Trace:
+    """The spans of one parse"""
+
+    def __init__(self, name, fields=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.fields = fields or {}
+        self.records = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def merge(self, records):
+        """Add spans recorded elsewhere, e.g. returned by a worker process"""
+        with self._lock:
+            self.records.extend(dict(record, trace=self.id) for record in records)
+
+    def summary(self):
+        """Per-stage totals, in the order stages first finished"""
+        stages = OrderedDict()
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            stage = stages.setdefault(record['span'], {'stage': record['span'], 'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stage['calls'] += 1
+            stage['total_ms'] += record['ms']
+            stage['max_ms'] = max(stage['max_ms'], record['ms'])
+            for field in COUNT_FIELDS:
+                if isinstance(record.get(field), int):
+                    stage[field] = stage.get(field, 0) + record[field]
+        for stage in stages.values():
+            stage['mean_ms'] = round(stage['total_ms'] / stage['calls'], 3)
+            stage['total_ms'] = round(stage['total_ms'], 3)
+        return list(stages.values())
+
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+
+@contextmanager
+def trace(name, **fields):
+    """Collect the spans opened in this thread into a new Trace; yields None when off"""
+    if not _enabled:
+        yield None
+        return
+    new_trace = Trace(name, fields)
+    previous = current_trace()
+    _local.trace = new_trace
+    try:
+        with Span(name, new_trace, dict(fields)):
+            yield new_trace
+    finally:
+        _local.trace = previous
+
+
+def merge(records):
+    """Add worker spans to the thread's current trace, if any"""
+    current = current_trace()
+    if current is not None and records:
+        current.merge(records)
+
+
+def combine(traces, name, **fields):
+    """One Trace holding the spans of several, e.g. a batch's parses; None when off"""
+    if not _enabled:
+        return None
+    combined = Trace(name, fields)
+    for part in traces:
+        if part is not None:
+            combined.merge(part.records)
+    return combined
+
+
+def show_debug_panel(parse_trace):
+    """Per-stage timings of a parse in a collapsed panel; nothing when telemetry is off"""
+    if parse_trace is None:
+        return
+    import streamlit as st
+
+    with st.expander("🔍 Parse timings", expanded=False):
+        details = ', '.join(f"{key}: {value}" for key, value in parse_trace.fields.items())
+        st.caption(f"Trace {parse_trace.id}" + (f" ({details})" if details else ''))
+        st.dataframe(parse_trace.summary(), use_container_width=True)
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The repo's modules, and the benchmarks' synthetic statements and reference implementations
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import db  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh app database in a temporary directory, in place of auth.db"""
+    database = db.Database(tmp_path / 'auth.db')
+    monkeypatch.setattr(db, '_database', database)
+    yield database
+    database.close()
@@ -0,0 +1,52 @@
+import hashlib
+
+import pytest
+
+import auth
+
+
+@pytest.fixture
+def users(database, monkeypatch):
+    # A cheap scrypt cost keeps the tests fast
+    monkeypatch.setenv('AUTH_SCRYPT_N', '1024')
+    auth._password_cache.clear()
+    auth.init_auth_db()
+    yield database
+    auth._password_cache.clear()
+
+
+def stored_hash(database, username):
+    return database.fetchone("SELECT password FROM users WHERE username=?", (username,))[0]
+
+
+def test_register_stores_scrypt_hash(users):
+    assert auth.register_user('asha', 'secret', 'asha@example.com')
+    assert stored_hash(users, 'asha').startswith('scrypt$1024$')
+    assert auth.check_credentials('asha', 'secret')
+    assert not auth.check_credentials('asha', 'wrong')
+
+
+def test_legacy_sha256_hash_migrates_on_login(users):
+    legacy = hashlib.sha256(b'secret').hexdigest()
+    users.execute("INSERT INTO users (username, password, email) VALUES (?, ?, ?)", ('ravi', legacy, None))
+
+    assert auth.check_credentials('ravi', 'secret')
+    migrated = stored_hash(users, 'ravi')
+    assert migrated.startswith('scrypt$') and migrated != legacy
+
+    # The second login verifies against the scrypt hash and leaves it alone
+    assert auth.check_credentials('ravi', 'secret')
+    assert stored_hash(users, 'ravi') == migrated
+    assert not auth.check_credentials('ravi', 'wrong')
+
+
+def test_legacy_hash_kept_on_wrong_password(users):
+    legacy = hashlib.sha256(b'secret').hexdigest()
+    users.execute("INSERT INTO users (username, password, email) VALUES (?, ?, ?)", ('ravi', legacy, None))
+
+    assert not auth.check_credentials('ravi', 'wrong')
+    assert stored_hash(users, 'ravi') == legacy
+
+
+def test_unknown_user_is_rejected(users):
+    assert not auth.check_credentials('nobody', 'secret')
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from batch_ingest import merge_statements
+from transaction_schema import normalize_transactions
+
+
+def statement(rows):
+    return normalize_transactions(pd.DataFrame(rows, columns=['date', 'amount', 'description', 'transaction_id']))
+
+
+def test_overlapping_statements_keep_one_row_per_transaction_id():
+    january = statement([
+        ('2024-01-31', -100.0, 'Paid to Swiggy', 'T3'),
+        ('2024-01-15', -250.0, 'Paid to Uber', 'T2'),
+        ('2024-01-01', 5000.0, 'Received from Ravi', 'T1'),
+    ])
+    january_to_february = statement([
+        ('2024-02-10', -80.0, 'Paid to Jio', 'T4'),
+        ('2024-01-31', -100.0, 'Paid to Swiggy', 'T3'),
+        ('2024-01-15', -250.0, 'Paid to Uber', 'T2'),
+    ])
+    merged, duplicates = merge_statements([january, january_to_february])
+    assert duplicates == 2
+    assert list(merged['transaction_id']) == ['T4', 'T3', 'T2', 'T1']
+
+
+def test_rows_without_ids_dedupe_across_statements_only():
+    first = statement([
+        ('2024-01-05', -50.0, 'Paid to Tea Stall', None),
+        ('2024-01-05', -50.0, 'Paid to Tea Stall', None),
+    ])
+    second = statement([
+        ('2024-01-06', -120.0, 'Paid to D Mart', None),
+        ('2024-01-05', -50.0, 'Paid to Tea Stall', None),
+        ('2024-01-05', -50.0, 'Paid to Tea Stall', None),
+    ])
+    merged, duplicates = merge_statements([first, second])
+    # Both identical payments of the first statement are kept, the repeats in the second dropped
+    assert duplicates == 2
+    assert len(merged) == 3
+    assert (merged['description'] == 'Paid to Tea Stall').sum() == 2
+
+
+def test_merged_timeline_is_newest_first():
+    older = statement([('2024-01-01', -10.0, 'Paid to A', None)])
+    newer = statement([('2024-03-01', -30.0, 'Paid to C', None), ('2024-02-01', -20.0, 'Paid to B', None)])
+    merged, duplicates = merge_statements([older, newer])
+    assert duplicates == 0
+    assert list(merged['date'].dt.month) == [3, 2, 1]
+
+
+def test_failed_parses_are_skipped():
+    placeholder = normalize_transactions(pd.DataFrame({'date': [pd.Timestamp('2024-01-01')], 'amount': [0.0]}))
+    only = statement([('2024-01-01', -10.0, 'Paid to A', None)])
+    merged, duplicates = merge_statements([placeholder, only])
+    assert len(merged) == 1 and duplicates == 0
+    assert merge_statements([placeholder])[0].empty
@@ -0,0 +1,51 @@
+import pandas as pd
+
+import categorizer
+from bench_categorizer import legacy_categorize, synthetic_descriptions
+
+
+def every_keyword():
+    keywords = set()
+    for data in categorizer.CATEGORIES.values():
+        keywords.update(data['keywords'])
+        for sub_keywords in data['sub_categories'].values():
+            keywords.update(sub_keywords)
+    return sorted(keywords)
+
+
+DESCRIPTIONS = [
+    f"{prefix} {keyword}" for keyword in every_keyword() for prefix in ('Paid to', 'Received from')
+] + [
+    # Keywords inside other words and keywords of several categories
+    'Paid to Fresh Supermarket', 'Paid to Smartphone Store', 'Paid to Coca Cola Bottlers',
+    'Paid to Indane Gas Agency', 'Paid to Hotel Market Road', 'Paid to Amazon Fresh Vegetables',
+    'Paid to Zomato Hotel Burger', 'Paid to Airtel Petrol Pump', 'Paid to Uber Eats Food',
+    # Only the fallback patterns apply
+    'Transfer to Ravi', 'Received from Anil', 'ACME Salary Credit', 'House Rent March',
+    'Current Account Charges', 'Bajaj EMI 12', 'Premium Insurance', 'LIC Investment Plan',
+    'Apollo Hospital', 'City College Fees', 'Paid 250rs', 'Paid 250 RS to Ramesh', '******9754',
+    # Case and spacing
+    'PAID TO SWIGGY', 'paid to  Ola   cabs', 'Jio  Fiber  Broadband', '', ' ',
+]
+
+
+def test_categorize_matches_legacy():
+    mismatches = {
+        description: (categorizer.categorize(description), legacy_categorize(description))
+        for description in DESCRIPTIONS
+        if categorizer.categorize(description) != legacy_categorize(description)
+    }
+    assert mismatches == {}
+
+
+def test_categorize_series_matches_legacy():
+    descriptions = pd.concat([pd.Series(DESCRIPTIONS), synthetic_descriptions(5_000)], ignore_index=True)
+    labels = categorizer.categorize_series(descriptions)
+    assert labels.index.equals(descriptions.index)
+    assert list(labels) == [legacy_categorize(description) for description in descriptions]
+
+
+def test_categorize_series_of_categoricals_matches_legacy():
+    descriptions = pd.Series(DESCRIPTIONS * 3, dtype='category')
+    labels = categorizer.categorize_series(descriptions)
+    assert list(labels) == [legacy_categorize(description) for description in DESCRIPTIONS * 3]
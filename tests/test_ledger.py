@@ -0,0 +1,127 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import ledger
+import page_extractor
+from transaction_schema import normalize_transactions
+
+
+class FakeDocuments:
+    """PdfDocuments stand-in whose pages hold one transaction dated ``page_dates[n - 1]``"""
+
+    def __init__(self, page_dates):
+        self.page_dates = page_dates
+        self.page_count = len(page_dates)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+@pytest.fixture
+def statement(monkeypatch):
+    """Install a statement of page dates (None for pages without transactions)"""
+    probed = []
+
+    def install(page_dates):
+        documents = FakeDocuments(page_dates)
+
+        def extract_page(documents, page_num):
+            probed.append(page_num)
+            date = documents.page_dates[page_num - 1]
+            return {'transactions': [] if date is None else [{'date': date}]}
+
+        monkeypatch.setattr(ledger, 'PdfDocuments', lambda pdf_bytes: documents)
+        monkeypatch.setattr(page_extractor, 'extract_page', extract_page)
+        return probed
+
+    return install
+
+
+def days(*day_numbers):
+    return [None if day is None else datetime(2024, 1, day) for day in day_numbers]
+
+
+HIGH_WATER = pd.Timestamp('2024-01-07 15:30')
+
+
+def test_pages_since_newest_first(statement):
+    statement(days(10, 9, 8, 7, 6, 5, 4, 3, 2, 1))
+    assert ledger.pages_since(b'', HIGH_WATER) == (1, 5)
+
+
+def test_pages_since_oldest_first(statement):
+    statement(days(1, 2, 3, 4, 5, 6, 7, 8, 9, 10))
+    assert ledger.pages_since(b'', HIGH_WATER) == (7, 10)
+
+
+def test_pages_since_newest_first_with_trailing_summary_page(statement):
+    statement(days(10, 9, 8, 6, 5, 4, 3, 2, 1, None))
+    assert ledger.pages_since(b'', HIGH_WATER) == (1, 4)
+
+
+def test_pages_since_steps_past_undated_pages(statement):
+    statement(days(None, 1, 2, None, None, 5, 6, 8, None, 9, None))
+    assert ledger.pages_since(b'', HIGH_WATER) == (8, 11)
+    statement(days(None, 9, 8, None, 6, None, None, 3, 2, None))
+    assert ledger.pages_since(b'', HIGH_WATER) == (1, 4)
+
+
+def test_pages_since_nothing_new(statement):
+    statement(days(5, 4, 3, 2, 1, None))
+    assert ledger.pages_since(b'', HIGH_WATER) is None
+    statement(days(1, 2, 3, 4, 5, None))
+    assert ledger.pages_since(b'', HIGH_WATER) is None
+
+
+def test_pages_since_without_any_dates_reads_everything(statement):
+    statement(days(None, None, None))
+    assert ledger.pages_since(b'', HIGH_WATER) == (1, 3)
+
+
+def test_pages_since_probes_few_pages(statement):
+    probed = statement(days(*range(28, 0, -1)))
+    assert ledger.pages_since(b'', pd.Timestamp('2024-01-25')) == (1, 5)
+    assert len(set(probed)) <= 8
+
+
+def transactions(rows):
+    return normalize_transactions(pd.DataFrame(rows, columns=['date', 'amount', 'description', 'transaction_id']))
+
+
+def test_row_keys_use_transaction_ids():
+    df = transactions([
+        ('2024-01-01', -100.0, 'Paid to Swiggy', 'T1'),
+        ('2024-01-01', -100.0, 'Paid to Swiggy', 'T2'),
+    ])
+    assert list(ledger._row_keys(df)) == ['id|T1', 'id|T2']
+
+
+def test_row_keys_number_same_day_duplicates():
+    df = transactions([
+        ('2024-01-01', -100.0, 'Paid to Swiggy', None),
+        ('2024-01-01', -100.0, 'Paid to Swiggy', None),
+        ('2024-01-01', -250.0, 'Paid to Swiggy', None),
+        ('2024-01-02', -100.0, 'Paid to Swiggy', None),
+    ])
+    keys = list(ledger._row_keys(df))
+    assert len(set(keys)) == 4
+    assert keys[0].endswith('|0') and keys[1].endswith('|1')
+    assert keys[0].rsplit('|', 1)[0] == keys[1].rsplit('|', 1)[0]
+
+
+def test_row_keys_are_stable_across_overlapping_statements():
+    older = transactions([
+        ('2024-01-01', -100.0, 'Paid to Swiggy', None),
+        ('2024-01-01', -100.0, 'Paid to Swiggy', None),
+    ])
+    newer = transactions([
+        ('2024-01-02', -40.0, 'Paid to Uber', None),
+        ('2024-01-01', -100.0, 'Paid to Swiggy', None),
+        ('2024-01-01', -100.0, 'Paid to Swiggy', None),
+    ])
+    assert set(ledger._row_keys(older)) <= set(ledger._row_keys(newer))
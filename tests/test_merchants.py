@@ -0,0 +1,69 @@
+import pytest
+
+import merchants
+from merchants import MerchantIndex, get_merchant_index, load_aliases, save_aliases
+
+
+@pytest.fixture(autouse=True)
+def indexes(monkeypatch):
+    monkeypatch.setattr(merchants, '_indexes', merchants.OrderedDict())
+
+
+def test_paytm_rows_differing_in_numbers_share_one_entry():
+    index = MerchantIndex()
+    names = index.canonical_all([
+        '1 Jan Paid to Swiggy 10:15 AM UPI ID: swiggy@icici UPI Ref No: 401234567890 - Rs.250',
+        '7 Jan Paid to Swiggy 12:42 AM UPI ID: swiggy@icici UPI Ref No: 409876543210 - Rs.199',
+    ])
+    assert names == ['Swiggy', 'Swiggy']
+    assert len(index) == 1
+    assert (index.hits, index.misses) == (0, 1)
+
+
+def test_payee_known_only_by_number_keeps_their_number():
+    index = MerchantIndex()
+    assert index.canonical('Paid to 9876543210@ybl') == '9876543210'
+    # Same masked shape, a different payee
+    assert index.canonical('Paid to 9123456780@ybl') == '9123456780'
+
+
+def test_alias_matches_exactly_or_as_prefix_ignoring_case_and_spaces():
+    index = MerchantIndex({'anilshetty': 'Anil Shetty', 'Amazon': 'Amazon'})
+    assert index.canonical('Paid to ANIL SHETTY') == 'Anil Shetty'
+    assert index.canonical('Paid to Anil-Shetty') == 'Anil Shetty'
+    assert index.canonical('Paid to Amazon Pay India Private') == 'Amazon'
+    assert index.canonical('Paid to Amazing Tours') == 'Amazing Tours'
+
+
+def test_lru_keeps_at_most_max_entries():
+    index = MerchantIndex(max_entries=2)
+    index.canonical_all(['Paid to A', 'Paid to B', 'Paid to C'])
+    assert len(index) == 2
+    index.canonical('Paid to B')
+    assert index.hits == 1
+    index.canonical('Paid to A')
+    assert index.misses == 4
+
+
+def test_aliases_are_kept_per_user(database):
+    save_aliases('asha', {'zomato': 'Food Delivery'})
+    assert load_aliases('asha') == {'zomato': 'Food Delivery'}
+    assert load_aliases('ravi') == {}
+    assert merchants.canonical_merchant('Paid to Zomato', 'asha') == 'Food Delivery'
+    assert merchants.canonical_merchant('Paid to Zomato', 'ravi') == 'Zomato'
+
+
+def test_index_version_follows_the_users_aliases(database):
+    # Users without aliases share the alias-free index
+    assert get_merchant_index('asha') is get_merchant_index('ravi') is get_merchant_index()
+    assert get_merchant_index('asha').version == 'none'
+
+    save_aliases('asha', {'zomato': 'Food Delivery'})
+    first = get_merchant_index('asha')
+    assert first.version.startswith('asha-')
+    assert get_merchant_index('asha') is first
+
+    save_aliases('asha', {'zomato': 'Takeout'})
+    assert get_merchant_index('asha').version not in ('none', first.version)
+    save_aliases('ravi', {'zomato': 'Food Delivery'})
+    assert get_merchant_index('ravi').version != first.version
@@ -0,0 +1,23 @@
+from formats import PAYTM
+from pdf_documents import text_quality_check
+
+
+def test_transaction_lines_pass():
+    check = text_quality_check(PAYTM)
+    assert check("1 Jan Paid to Swiggy - Rs.250.00\n10:32 AM UPI ID: swiggy@paytm\nUPI Ref No: 400000000001")
+
+
+def test_rows_split_into_cells_fail():
+    check = text_quality_check(PAYTM)
+    assert not check("\n".join(["1 Jan", "Paid to Swiggy", "- Rs.250.00"] * 12))
+
+
+def test_pages_without_dated_lines_pass():
+    check = text_quality_check(PAYTM)
+    assert check("Terms and conditions\nCharges apply as notified.\nContact support for help.")
+
+
+def test_empty_or_garbled_text_fails():
+    check = text_quality_check(PAYTM)
+    assert not check("  \n ")
+    assert not check("�" * 50 + "\nTerms")
@@ -0,0 +1,68 @@
+import pandas as pd
+
+from recurring import detect_recurring
+from transaction_schema import normalize_transactions
+
+
+def statement(rows):
+    return normalize_transactions(pd.DataFrame(rows, columns=['date', 'amount', 'description']))
+
+
+def payments(description, amount, dates):
+    return [(date, -amount, description) for date in dates]
+
+
+def test_monthly_weekly_and_quarterly_payments():
+    df = statement(
+        payments('Paid to Netflix', 649.0, ['2024-01-05', '2024-02-05', '2024-03-06', '2024-04-05'])
+        + payments('Paid to Milk Basket', 210.0, pd.date_range('2024-01-01', periods=6, freq='7D').strftime('%Y-%m-%d'))
+        + payments('Paid to Airtel Postpaid', 1499.0, ['2024-01-10', '2024-04-10', '2024-07-11'])
+    )
+    recurring = detect_recurring(df).set_index('merchant')
+    assert recurring.loc['Netflix', 'period'] == 'Monthly'
+    assert recurring.loc['Milk Basket', 'period'] == 'Weekly'
+    assert recurring.loc['Airtel Postpaid', 'period'] == 'Quarterly'
+    assert recurring.loc['Netflix', 'occurrences'] == 4
+    assert recurring.loc['Netflix', 'next_due'] == pd.Timestamp('2024-05-05')
+
+
+def test_one_missed_month_still_recurring():
+    dates = ['2024-01-05', '2024-02-05', '2024-03-05', '2024-05-05', '2024-06-05', '2024-07-05']
+    recurring = detect_recurring(statement(payments('Paid to Spotify', 119.0, dates)))
+    assert list(recurring['merchant']) == ['Spotify']
+    assert list(recurring['period']) == ['Monthly']
+
+
+def test_irregular_days_or_varying_amounts_are_not_recurring():
+    irregular = payments('Paid to Swiggy', 300.0, ['2024-01-02', '2024-01-19', '2024-03-01', '2024-03-04'])
+    varying = [
+        ('2024-01-05', -150.0, 'Paid to Zomato'),
+        ('2024-02-05', -900.0, 'Paid to Zomato'),
+        ('2024-03-05', -40.0, 'Paid to Zomato'),
+    ]
+    assert detect_recurring(statement(irregular + varying)).empty
+
+
+def test_payments_on_one_day_count_once():
+    dates = ['2024-01-05', '2024-02-05', '2024-03-05']
+    # A split payment on each due date, reference numbers differing
+    rows = [
+        (date, -amount, f'Paid to Gym UPI Ref No {date.replace("-", "")}{i}')
+        for date in dates for i, amount in enumerate((500.0, 500.0))
+    ]
+    recurring = detect_recurring(statement(rows))
+    assert list(recurring['merchant']) == ['Gym']
+    assert recurring.loc[0, 'occurrences'] == 3
+    assert recurring.loc[0, 'typical_amount'] == 1000.0
+
+
+def test_loan_payments_are_emis_and_credits_are_ignored():
+    dates = ['2024-01-01', '2024-02-01', '2024-03-01']
+    df = statement(
+        payments('Paid to Bajaj Finance', 4200.0, dates)
+        + [(date, 50000.0, 'Received from Employer') for date in dates]
+    )
+    recurring = detect_recurring(df)
+    assert list(recurring['merchant']) == ['Bajaj Finance']
+    assert list(recurring['kind']) == ['EMI']
+    assert recurring.loc[0, 'monthly_cost'] == 4200.0
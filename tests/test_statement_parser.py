@@ -0,0 +1,42 @@
+import io
+
+import pandas as pd
+import pytest
+
+from statement_parser import StatementParser
+from synthetic import phonepe_table_pdf
+from transaction_schema import normalize_transactions
+from transaction_stream import Transaction
+
+
+@pytest.fixture(scope='module')
+def phonepe_pdf():
+    # Twelve table pages, each under a statement-period line that isn't a transaction
+    return phonepe_table_pdf(120)
+
+
+def upload(pdf_bytes):
+    file_obj = io.BytesIO(pdf_bytes)
+    file_obj.name = 'phonepe_statement.pdf'
+    parser = StatementParser(file_obj, selected_platform='PhonePe')
+    parser.messages = []
+    return parser
+
+
+def test_phonepe_stream_matches_parse(phonepe_pdf):
+    pdf_bytes, expected = phonepe_pdf
+    parsed = upload(pdf_bytes).parse()
+    records = list(upload(pdf_bytes).iter_transactions())
+    streamed = normalize_transactions(pd.DataFrame(records, columns=Transaction._fields))
+
+    assert len(parsed) == len(expected)
+    columns = ['date', 'amount_paise', 'type', 'description', 'category', 'transaction_id']
+    assert streamed[columns].equals(parsed[columns])
+
+
+def test_phonepe_stream_records(phonepe_pdf):
+    pdf_bytes, expected = phonepe_pdf
+    records = list(upload(pdf_bytes).iter_transactions())
+    assert [
+        (record.transaction_id, record.date.date(), record.amount, record.description) for record in records
+    ] == expected
@@ -0,0 +1,98 @@
+"""Spending over time at day, week, month and quarter granularity, zero-filled between buckets"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from parse_cache import get_parse_cache
+
+# Zoom level -> pandas period frequency
+GRANULARITIES = {
+    'Day': 'D',
+    'Week': 'W',
+    'Month': 'M',
+    'Quarter': 'Q',
+}
+DEFAULT_GRANULARITY = 'Month'
+# Zoom level -> adjective for chart titles, e.g. 'Monthly Spending Trend'
+TREND_LABELS = {'Day': 'Daily', 'Week': 'Weekly', 'Month': 'Monthly', 'Quarter': 'Quarterly'}
+COLUMNS = ['spent', 'received', 'count']
+# Parse cache artifact holding a statement's TimeRollups
+ROLLUPS_ARTIFACT = 'time_rollups'
+
+
+def daily_totals(df):
+    """Per-day spent and received paise and transaction count of a transaction_schema frame"""
+    dates = df['date'].dropna()
+    paise = df.loc[dates.index, 'amount_paise'].to_numpy()
+    days = dates.to_numpy().astype('datetime64[D]')
+    daily = pd.DataFrame({
+        'spent': np.where(paise < 0, -paise, 0),
+        'received': np.where(paise > 0, paise, 0),
+        'count': np.ones(len(paise), dtype='int64'),
+    }).groupby(days).sum()
+    daily.index = pd.DatetimeIndex(daily.index, name='date')
+    return daily
+
+
+class TimeRollups:
+    """Daily totals of a statement plus the coarser levels derived from them; rollup returns rupees"""
+
+    def __init__(self, daily):
+        self.daily = daily
+        self._levels = {}
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(daily_totals(df))
+
+    def __len__(self):
+        return int(self.daily['count'].sum())
+
+    def extend(self, df):
+        """New TimeRollups with the rows of ``df`` added; only ``df`` is scanned"""
+        added = daily_totals(df)
+        if not len(added):
+            return self
+        if not len(self.daily):
+            return TimeRollups(added)
+        daily = self.daily.add(added, fill_value=0).astype('int64').sort_index()
+        return TimeRollups(daily)
+
+    def rollup(self, granularity=DEFAULT_GRANULARITY):
+        """spent, received and count per bucket, oldest first, indexed by bucket start"""
+        level = self._levels.get(granularity)
+        if level is None:
+            level = self._build(GRANULARITIES[granularity])
+            self._levels[granularity] = level
+        return level
+
+    def _build(self, freq):
+        if not len(self.daily):
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name='date'), dtype='float64')
+        periods = self.daily.index.to_period(freq)
+        grouped = self.daily.groupby(periods).sum()
+        # Every bucket between the first and last, empty ones as zero
+        grouped = grouped.reindex(pd.period_range(periods.min(), periods.max(), freq=freq), fill_value=0)
+        level = pd.DataFrame({
+            'spent': grouped['spent'] / 100,
+            'received': grouped['received'] / 100,
+            'count': grouped['count'],
+        })
+        level.index = grouped.index.to_timestamp(how='start')
+        level.index.name = 'date'
+        return level
+
+
+def get_rollups(df, cache_key=None):
+    """TimeRollups of a parsed statement, built once per ``cache_key``"""
+    if cache_key is None:
+        return TimeRollups.from_frame(df)
+    return get_parse_cache().derived(cache_key, ROLLUPS_ARTIFACT, lambda: TimeRollups.from_frame(df))
+
+
+def zoom_selector(key='trend_zoom'):
+    """Radio picking the trend's granularity; returns one of GRANULARITIES"""
+    return st.radio(
+        "Zoom", options=list(GRANULARITIES), index=list(GRANULARITIES).index(DEFAULT_GRANULARITY),
+        horizontal=True, key=key,
+    )
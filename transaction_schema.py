@@ -0,0 +1,71 @@
+"""Canonical, typed transaction schema shared by every parser.
+
+Every parser's output is normalised into the same columns and dtypes:
+
+    date            datetime64[ns]
+    amount          float64 rupees, derived from amount_paise for display
+    amount_paise    int64 fixed-point amount (sum this to avoid float drift)
+    type            Categorical of CREDIT / DEBIT / UNKNOWN
+    description     Categorical (each distinct description stored once)
+    category        Categorical
+    transaction_id  object, None when the statement doesn't print one
+
+Group by the categorical columns with ``observed=True`` so filtered frames
+don't report empty groups for categories they don't contain.
+"""
+import pandas as pd
+
+SCHEMA_COLUMNS = ['date', 'amount', 'amount_paise', 'type', 'description', 'category', 'transaction_id']
+TRANSACTION_TYPES = ['CREDIT', 'DEBIT', 'UNKNOWN']
+
+
+def to_paise(amount):
+    """Convert rupee amounts to int64 paise, rounding to the nearest paisa"""
+    return (pd.to_numeric(amount, errors='coerce').fillna(0) * 100).round().astype('int64')
+
+
+def normalize_transactions(df):
+    """Coerce a parser's output DataFrame into the canonical schema"""
+    df = df.rename(columns={'details': 'description'})
+    index = df.index
+
+    def column(name, default):
+        if name in df.columns:
+            return df[name]
+        return pd.Series(default, index=index, dtype=object)
+
+    paise = to_paise(column('amount', 0))
+
+    if 'type' in df.columns and df['type'].notna().any():
+        types = df['type'].astype(object).fillna('UNKNOWN').str.upper()
+        types = types.where(types.isin(TRANSACTION_TYPES), 'UNKNOWN')
+    else:
+        # Statements without a type column sign their amounts
+        types = pd.Series('UNKNOWN', index=index, dtype=object)
+        types[paise > 0] = 'CREDIT'
+        types[paise < 0] = 'DEBIT'
+
+    transaction_ids = column('transaction_id', None).astype(object)
+
+    return pd.DataFrame({
+        'date': pd.to_datetime(column('date', pd.NaT)).astype('datetime64[ns]'),
+        'amount': paise / 100,
+        'amount_paise': paise,
+        'type': pd.Categorical(types, categories=TRANSACTION_TYPES),
+        'description': pd.Categorical(column('description', 'Unknown Transaction').astype(object).fillna('Unknown Transaction')),
+        'category': pd.Categorical(column('category', 'Others').astype(object).fillna('Others')),
+        'transaction_id': transaction_ids.where(transaction_ids.notna(), None),
+    }, index=index)
+
+
+def empty_transactions():
+    """An empty frame in the canonical schema"""
+    return normalize_transactions(pd.DataFrame(columns=['date', 'amount', 'description', 'category']))
+
+
+def memory_report(df):
+    """Deep memory usage per column in bytes, plus a 'total' entry"""
+    usage = df.memory_usage(deep=True, index=False)
+    report = {column: int(usage[column]) for column in df.columns}
+    report['total'] = int(usage.sum())
+    return report
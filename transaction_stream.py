@@ -0,0 +1,214 @@
+"""Streaming transaction extraction: pages -> lines -> records -> column chunks.
+
+Each stage is a generator, so only one page of text and one chunk of
+records are alive at a time; records are sealed into DataFrame chunks of
+``chunk_size`` rows as they arrive.
+"""
+import logging
+from collections import namedtuple
+from datetime import datetime
+
+import pandas as pd
+
+import page_extractor
+import telemetry
+from formats import PAYTM
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+Transaction = namedtuple('Transaction', ['date', 'amount', 'type', 'description', 'category', 'transaction_id'])
+
+
+def iter_page_texts(documents, first_page=1, check=None, **extract_kwargs):
+    """Yield ``(page_num, text)`` one page at a time.
+
+    Each page comes from the first backend in pdf_documents.text_backend_order()
+    whose text passes ``check``, all through the upload's shared handles;
+    ``extract_kwargs`` go to pdfplumber.
+    """
+    for page_num in range(first_page, documents.page_count + 1):
+        with telemetry.span('extract_page', page=page_num):
+            text = documents.page_text(page_num, check, **extract_kwargs)
+        yield page_num, text
+
+
+def iter_lines(page_texts):
+    """Yield ``(page_num, line)`` for every stripped, non-empty line"""
+    for page_num, text in page_texts:
+        for line in text.split('\n'):
+            line = line.strip()
+            if line:
+                yield page_num, line
+
+
+def iter_phonepe_records(documents, categorize, fallback_text=None, first_page=1):
+    """Turn a PhonePe statement into Transaction records one page at a time.
+
+    Pages are read by page_extractor.extract_page, as in a full parse, so the
+    table is split through its columns with layout text as the fallback, and
+    a page without text is retried with ``fallback_text(page_num)`` if given.
+    A page's last transaction is emitted once the next page's leading lines,
+    which may continue it, have been attached.
+    """
+    pending = None
+    for page_num in range(first_page, documents.page_count + 1):
+        result = page_extractor.extract_page(documents, page_num)
+        if not result['has_text'] and fallback_text is not None:
+            text = fallback_text(page_num)
+            if text and text.strip():
+                result = page_extractor.parse_page_text(page_num, text)
+        for error in result['errors']:
+            logger.info(error)
+
+        if pending is not None:
+            for line in result['leading_lines']:
+                page_extractor.attach_continuation(pending, line)
+        transactions = result['transactions']
+        if transactions:
+            if pending is not None:
+                yield _phonepe_record(pending, categorize)
+            for transaction in transactions[:-1]:
+                yield _phonepe_record(transaction, categorize)
+            pending = transactions[-1]
+
+    if pending is not None:
+        yield _phonepe_record(pending, categorize)
+
+
+def _phonepe_record(transaction, categorize):
+    return Transaction(
+        date=transaction['date'],
+        amount=transaction['amount'],
+        type=transaction['type'],
+        description=transaction['details'],
+        category=categorize(transaction['details']),
+        transaction_id=transaction['transaction_id'],
+    )
+
+
+def _paytm_body_lines(lines):
+    """Drop everything up to the transaction table header.
+
+    The header is expected on the first page; if it hasn't appeared by the
+    time the second page starts, the held-back lines are treated as body.
+    """
+    held = []
+    first_page = None
+    lines = iter(lines)
+    for page_num, line in lines:
+        if first_page is None:
+            first_page = page_num
+        if PAYTM.header.search(line):
+            break
+        if page_num != first_page:
+            yield from held
+            yield line
+            break
+        held.append(line)
+    else:
+        yield from held
+        return
+
+    for _, line in lines:
+        yield line
+
+
+def iter_paytm_records(lines):
+    """Turn Paytm statement lines into Transaction records.
+
+    A transaction starts at a line with a day/month date and collects the
+    following lines until the next date; its signed amount is searched for
+    in the joined description.
+    """
+    current_date = None
+    buffer_lines = []
+
+    for line in _paytm_body_lines(lines):
+        date_match = PAYTM.date.search(line)
+        if date_match and len(date_match.group(1)) <= 2:  # Validate day is 1-31
+            try:
+                date_str = f"{date_match.group(1)} {date_match.group(2)} 2024"
+                transaction_date = datetime.strptime(date_str, "%d %b %Y")
+            except ValueError:
+                # If date parsing fails, treat as regular line
+                if current_date is not None:
+                    buffer_lines.append(line)
+                continue
+
+            if current_date is not None and buffer_lines:
+                record = _paytm_record(current_date, buffer_lines)
+                if record is not None:
+                    yield record
+            current_date = transaction_date
+            buffer_lines = [line]
+        elif current_date is not None:
+            buffer_lines.append(line)
+
+    if current_date is not None and buffer_lines:
+        record = _paytm_record(current_date, buffer_lines)
+        if record is not None:
+            yield record
+
+
+def _paytm_record(date, buffer_lines):
+    full_desc = ' '.join(buffer_lines)
+    amount_match = PAYTM.amount.search(full_desc)
+    if not amount_match:
+        return None
+    amount = float(amount_match.group(2).replace(',', ''))
+    if amount_match.group(1) == '-':
+        amount = -amount
+    return Transaction(
+        date=date,
+        amount=amount,
+        type=None,
+        description=full_desc,
+        category='Debit' if amount < 0 else 'Credit',
+        transaction_id=None,
+    )
+
+
+class ColumnBuffer:
+    """Collects records column-wise and seals them into DataFrame chunks"""
+
+    def __init__(self, columns=Transaction._fields, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.columns = tuple(columns)
+        self.chunk_size = chunk_size
+        self._values = [[] for _ in self.columns]
+
+    def __len__(self):
+        return len(self._values[0])
+
+    def append(self, record):
+        for values, value in zip(self._values, record):
+            values.append(value)
+
+    def full(self):
+        return len(self) >= self.chunk_size
+
+    def seal(self):
+        """Return the buffered rows as a DataFrame and start a new chunk"""
+        chunk = pd.DataFrame(dict(zip(self.columns, self._values)))
+        self._values = [[] for _ in self.columns]
+        return chunk
+
+
+def iter_chunks(records, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Group a record stream into DataFrames of at most ``chunk_size`` rows"""
+    buffer = ColumnBuffer(chunk_size=chunk_size)
+    for record in records:
+        buffer.append(record)
+        if buffer.full():
+            yield buffer.seal()
+    if len(buffer):
+        yield buffer.seal()
+
+
+def frame_from_chunks(chunks, columns=Transaction._fields):
+    """Concatenate DataFrame chunks, keeping the columns when there are none"""
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame(columns=list(columns))
+    return pd.concat(chunks, ignore_index=True)
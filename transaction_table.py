@@ -0,0 +1,168 @@
+"""Paginated transaction table, filtered and sorted on the server.
+
+``st.dataframe(df)`` serialises every row to Arrow on every rerun, so a
+multi-year statement shipped tens of thousands of rows to the browser each
+time a widget changed. ``show_transaction_table`` sends one page instead:
+
+* filters (date range, categories, absolute amount range) are evaluated as
+  boolean masks over the statement's typed columns;
+* each sort order is a stable argsort of row positions, memoised next to
+  the parse in the parse cache, so a rerun only re-applies the mask;
+* only the rows of the visible page are taken out of the frame, so the
+  payload per rerun is bounded by the page size, not the statement length.
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from parse_cache import get_parse_cache
+
+PAGE_SIZES = [25, 50, 100]
+DEFAULT_PAGE_SIZE = 50
+DISPLAY_COLUMNS = ['date', 'description', 'amount', 'type', 'category', 'transaction_id']
+
+# Sort choice -> (column, ascending)
+SORTS = {
+    'Newest first': ('date', False),
+    'Oldest first': ('date', True),
+    'Amount: high to low': ('amount_paise', False),
+    'Amount: low to high': ('amount_paise', True),
+}
+DEFAULT_SORT = 'Newest first'
+
+
+def sort_order(df, sort=DEFAULT_SORT, cache_key=None):
+    """Row positions of ``df`` in ``sort`` order, memoised with its parse"""
+    column, ascending = SORTS[sort]
+
+    def build():
+        values = df[column].reset_index(drop=True)
+        return values.sort_values(ascending=ascending, kind='stable').index.to_numpy()
+
+    if cache_key is None:
+        return build()
+    return get_parse_cache().derived(cache_key, f"table-order-{column}-{ascending}", build)
+
+
+def filter_mask(df, date_range=None, categories=None, amount_range=None):
+    """Boolean array of the rows matching every given filter; None when none is given.
+
+    ``date_range`` is an inclusive ``(first_day, last_day)``, ``amount_range``
+    an inclusive ``(low, high)`` in rupees over the absolute amount.
+    """
+    mask = None
+
+    def narrow(condition):
+        condition = np.asarray(condition, dtype=bool)
+        return condition if mask is None else mask & condition
+
+    if date_range is not None:
+        first_day, last_day = (pd.Timestamp(day) for day in date_range)
+        dates = df['date']
+        mask = narrow((dates >= first_day) & (dates < last_day + timedelta(days=1)))
+    if categories:
+        mask = narrow(df['category'].isin(categories))
+    if amount_range is not None:
+        low, high = amount_range
+        paise = df['amount_paise'].abs()
+        mask = narrow((paise >= round(low * 100)) & (paise <= round(high * 100)))
+    return mask
+
+
+def matching_positions(order, mask):
+    """Positions in ``order`` of the rows ``mask`` keeps"""
+    return order if mask is None else order[mask[order]]
+
+
+def page_rows(df, positions, page, page_size):
+    """Page ``page`` (1-based) of the rows at ``positions``"""
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
+
+
+def _filters(df, key):
+    """Filter and sort widgets; returns ``(date_range, categories, amount_range, sort, page_size)``"""
+    dates = df['date'].dropna()
+    largest = float(np.ceil(df['amount_paise'].abs().max() / 100)) if len(df) else 0.0
+
+    with st.expander("🔎 Filter and sort", expanded=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            date_range = None
+            if len(dates):
+                first_day, last_day = dates.min().date(), dates.max().date()
+                picked = st.date_input(
+                    "Dates", value=(first_day, last_day), min_value=first_day, max_value=last_day,
+                    key=f"{key}_dates",
+                )
+                # A single date while the user is still picking the end of the range
+                if isinstance(picked, (tuple, list)) and len(picked) == 2 and tuple(picked) != (first_day, last_day):
+                    date_range = tuple(picked)
+            low = st.number_input("Amount from (₹)", min_value=0.0, value=0.0, step=100.0, key=f"{key}_low")
+            high = st.number_input("Amount to (₹)", min_value=0.0, value=largest, step=100.0, key=f"{key}_high")
+        with col2:
+            categories = st.multiselect(
+                "Categories", options=list(df['category'].cat.categories), key=f"{key}_categories",
+            )
+            sort = st.selectbox("Sort by", options=list(SORTS), key=f"{key}_sort")
+            page_size = st.selectbox(
+                "Rows per page", options=PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=f"{key}_page_size",
+            )
+
+    amount_range = (low, high) if (low, high) != (0.0, largest) else None
+    return date_range, categories, amount_range, sort, page_size
+
+
+def show_transaction_table(df, cache_key=None, key='transactions'):
+    """Show one page of ``df`` (a transaction_schema frame) with filter, sort and paging widgets.
+
+    ``cache_key`` is the parse cache key of ``df``, under which its sort
+    orders are memoised; ``key`` prefixes the widget keys.
+    """
+    if not len(df):
+        st.info("No transactions to show.")
+        return
+
+    date_range, categories, amount_range, sort, page_size = _filters(df, key)
+    positions = matching_positions(sort_order(df, sort, cache_key), filter_mask(df, date_range, categories, amount_range))
+    matched = len(positions)
+    page_count = max(1, -(-matched // page_size))
+
+    # Back to the first page whenever the filters or sort change
+    page_key = f"{key}_page"
+    query = (date_range, tuple(categories), amount_range, sort, page_size)
+    if st.session_state.get(f"{key}_query") != query:
+        st.session_state[f"{key}_query"] = query
+        st.session_state[page_key] = 1
+    st.session_state[page_key] = min(max(st.session_state.get(page_key, 1), 1), page_count)
+
+    rows = page_rows(df, positions, st.session_state[page_key], page_size)
+    columns = [column for column in DISPLAY_COLUMNS if column in rows.columns]
+    if 'transaction_id' in columns and df['transaction_id'].isna().all():
+        columns.remove('transaction_id')
+    st.dataframe(
+        rows[columns],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'date': st.column_config.DatetimeColumn("Date", format="DD MMM YYYY"),
+            'description': "Description",
+            'amount': st.column_config.NumberColumn("Amount", format="₹%.2f"),
+            'type': "Type",
+            'category': "Category",
+            'transaction_id': "Transaction ID",
+        },
+    )
+
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.number_input("Page", min_value=1, max_value=page_count, step=1, key=page_key)
+    with col2:
+        if matched:
+            first = (st.session_state[page_key] - 1) * page_size + 1
+            st.caption(f"Rows {first:,}-{first + len(rows) - 1:,} of {matched:,} matching transactions "
+                       f"({len(df):,} in total), page {st.session_state[page_key]} of {page_count}")
+        else:
+            st.caption(f"No transactions match these filters ({len(df):,} in total)")